@@ -1,3 +1,5 @@
+import logging
+
 from django.contrib import admin
 
 from clubs.forms import TeamMembershipForm
@@ -12,9 +14,17 @@ from clubs.models import (
     Team,
     TeamMembership,
 )
-from clubs.serializers import ClubCsvSerializer, ClubMembershipCsvSerializer
+from clubs.serializers import (
+    ClubCsvSerializer,
+    ClubMembershipCsvSerializer,
+    ClubRoleCsvSerializer,
+    EventAttendanceCsvSerializer,
+    EventCsvSerializer,
+)
 from clubs.services import ClubService
 from core.abstracts.admin import ModelAdminBase
+from querycsv.models import QueryCsvBundleJob
+from querycsv.signals import send_process_bundle_job_signal
 
 
 class ClubMembershipInlineAdmin(admin.StackedInline):
@@ -47,9 +57,47 @@ class ClubAdmin(ModelAdminBase):
         "created_at",
     )
 
+    actions = ("export_handoff_bundle",)
+
     def members_count(self, obj):
         return obj.memberships.count()
 
+    @admin.action(description="Export handoff bundle")
+    def export_handoff_bundle(self, request, queryset):
+        """Export clubs with their members, roles, events, and attendance as one workbook."""
+
+        job = QueryCsvBundleJob.objects.create(
+            name="club_handoff",
+            sheets=[
+                ("Clubs", ClubCsvSerializer, queryset),
+                (
+                    "Memberships",
+                    ClubMembershipCsvSerializer,
+                    ClubMembership.objects.filter(club__in=queryset),
+                ),
+                (
+                    "Roles",
+                    ClubRoleCsvSerializer,
+                    ClubRole.objects.filter(club__in=queryset),
+                ),
+                ("Events", EventCsvSerializer, Event.objects.filter(club__in=queryset)),
+                (
+                    "Attendance",
+                    EventAttendanceCsvSerializer,
+                    EventAttendance.objects.filter(event__club__in=queryset),
+                ),
+            ],
+            notify_email=request.user.email,
+        )
+        send_process_bundle_job_signal(job)
+
+        self.message_user(
+            request,
+            f"Exporting {queryset.count()} clubs in the background, "
+            f"a download link will be emailed to {request.user.email}.",
+            logging.INFO,
+        )
+
 
 class RecurringEventAdmin(admin.ModelAdmin):
 
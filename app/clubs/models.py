@@ -136,8 +136,7 @@ class ClubMembershipManager(ManagerBase["ClubMembership"]):
             default_role = club.roles.get(default=True)
             roles.append(default_role)
 
-        for role in roles:
-            membership.roles.add(role)
+        membership.roles.add(*roles)
 
         return membership
 
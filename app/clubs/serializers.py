@@ -1,9 +1,13 @@
 from rest_framework import serializers
 from rest_framework.fields import empty
 
-from clubs.models import Club, ClubMembership, ClubRole
+from clubs.models import Club, ClubMembership, ClubRole, Event, EventAttendance
 from core.abstracts.serializers import ModelSerializerBase
-from querycsv.serializers import CsvModelSerializer, WritableSlugRelatedField
+from querycsv.serializers import (
+    CsvModelSerializer,
+    SlugLookupCache,
+    WritableSlugRelatedField,
+)
 from users.models import User
 
 
@@ -90,22 +94,32 @@ class ClubMembershipCsvSerializer(CsvModelSerializer, ClubMembershipSerializer):
         required=False,
     )
 
+    # First and last name are read from the user's profile
+    export_related_fields = ("user__profile",)
+
     def __init__(self, instance=None, data=empty, **kwargs):
         super(ClubMembershipCsvSerializer, self).__init__(instance, data, **kwargs)
         self.club = None
 
-        if instance is not None:
+        if isinstance(instance, ClubMembership):
+            # Lists of instances are passed to the child when many=True
             self.club = instance.club
 
         elif data is not empty:
             self.club = data.get("club", None)
 
+        if isinstance(self.club, int) or isinstance(self.club, str):
+            lookup_cache = self.context.get(SlugLookupCache.context_key, None)
+
+            # Rows in an upload usually share a club, only fetch it once
+            if lookup_cache is not None:
+                self.club = lookup_cache.get_by_pk(Club.objects.all(), self.club)
+            else:
+                self.club = Club.objects.get(id=self.club)
+
         if self.club is None:
             return
 
-        if isinstance(self.club, int) or isinstance(self.club, str):
-            self.club = Club.objects.get(id=self.club)
-
         # Restrict roles queryset to only include current club
         self.fields["roles"].child_relation.queryset = ClubRole.objects.filter(
             club__id=self.club.id
@@ -114,6 +128,16 @@ class ClubMembershipCsvSerializer(CsvModelSerializer, ClubMembershipSerializer):
         # Used to get or create a new role
         self.fields["roles"].child_relation.extra_kwargs = {"club": self.club}
 
+    def create(self, validated_data):
+        roles = validated_data.get("roles", None)
+
+        if not roles:
+            return super().create(validated_data)
+
+        # Add the row's roles instead of the default role
+        validated_data.pop("roles")
+        return ClubMembership.objects.create(roles=list(roles), **validated_data)
+
     class Meta:
         model = ClubMembership
         fields = [
@@ -128,16 +152,26 @@ class ClubMembershipCsvSerializer(CsvModelSerializer, ClubMembershipSerializer):
             "user_last_name",
         ]
 
-    def create(self, validated_data):
-        # Manually create an roles if necessary
-        roles = validated_data.pop("roles", [])
-        club = validated_data.get("club")
-        validated_data["roles"] = []
-
-        for role in roles:
-            if not ClubRole.objects.filter(name=role, club=club).exists():
-                validated_data["roles"].append(
-                    ClubRole.objects.create(name=role, club=club)
-                )
-
-        return super().create(validated_data)
+
+class ClubRoleCsvSerializer(CsvModelSerializer):
+    """Represents club roles in csvs."""
+
+    class Meta:
+        model = ClubRole
+        fields = "__all__"
+
+
+class EventCsvSerializer(CsvModelSerializer):
+    """Represents club events in csvs."""
+
+    class Meta:
+        model = Event
+        fields = "__all__"
+
+
+class EventAttendanceCsvSerializer(CsvModelSerializer):
+    """Represents event attendance in csvs."""
+
+    class Meta:
+        model = EventAttendance
+        fields = "__all__"
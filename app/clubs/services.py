@@ -1,9 +1,11 @@
-from datetime import datetime, time, timedelta, timezone
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
 from typing import Optional
 
 from django.core import exceptions
-from django.db import models
+from django.db import transaction
 from django.urls import reverse
+from django.utils import timezone
 
 from clubs.models import (
     Club,
@@ -14,6 +16,7 @@ from clubs.models import (
     EventAttendance,
     RecurringEvent,
 )
+from clubs.tasks import create_event_links_task
 from core.abstracts.services import ServiceBase
 from users.models import User
 
@@ -156,67 +159,128 @@ class ClubService(ServiceBase[Club]):
         return reverse("clubs:join-event", event_id=event.id)
 
     @classmethod
-    def sync_recurring_event(cls, rec_ev: RecurringEvent):
+    def get_recurring_event_dates(cls, rec_ev: RecurringEvent) -> list[date]:
         """
-        Sync all events for recurring event template.
-
-        Will remove all excess events outside of start/end dates,
-        and will create events if missing on a certain day.
+        Get each date a recurring event occurs on, between its start and end dates.
 
-        Date filter docs:
-        https://docs.djangoproject.com/en/dev/ref/models/querysets/#week-day
+        Without an end date, events occur until today.
         """
-        event_count = rec_ev.expected_event_count + 2  # Buffer before/after
 
-        # Remove extra events
-        # Get all dates assigned to recurring,
-        # delete if they don't overlap with the start/end dates
-        range_start = datetime.combine(rec_ev.start_date, rec_ev.event_start_time)
-        range_end = datetime.combine(rec_ev.end_date, rec_ev.event_start_time)
+        start_date, end_date = rec_ev.start_date, rec_ev.end_date or timezone.now()
 
-        # Django filter starts at Sun=1, python starts Mon=0
-        query_day = rec_ev.day + 2 if rec_ev.day > 0 else 6
+        # Dates may be datetimes before the model is reloaded
+        if isinstance(start_date, datetime):
+            start_date = start_date.date()
+        if isinstance(end_date, datetime):
+            end_date = end_date.date()
 
-        query = rec_ev.events.filter(
-            ~models.Q(start_at__date__range=(range_start, range_end))
-            | ~models.Q(start_at__week_day=query_day)
+        # Equalize date to monday (0), set to target day
+        event_date = (
+            start_date
+            - timedelta(days=start_date.weekday())
+            + timedelta(days=rec_ev.day)
         )
-        query.delete()
-
-        # Create missing events
-        for i in range(event_count):
-            # Equalize date to monday (0), set to target day, set to target week (i)
-            event_date = (
-                (rec_ev.start_date - timedelta(days=rec_ev.start_date.weekday()))
-                + timedelta(days=rec_ev.day)
-                + timedelta(weeks=i)
+
+        if event_date < start_date:
+            event_date += timedelta(weeks=1)
+
+        dates = []
+        while event_date <= end_date:
+            dates.append(event_date)
+            event_date += timedelta(weeks=1)
+
+        return dates
+
+    @classmethod
+    def sync_recurring_event(cls, rec_ev: RecurringEvent):
+        """
+        Sync all events for recurring event template.
+
+        Compares the events that should exist with the events that do,
+        then creates, updates, and deletes the difference in bulk. Existing
+        events are matched by date, so they keep their links and attendance
+        when the template's times change. Custom descriptions are kept.
+
+        Bulk operations skip model signals, so attendance links for new
+        events are created in one background task once the sync is saved.
+        """
+
+        targets = {}
+        for event_date in cls.get_recurring_event_dates(rec_ev):
+            targets[event_date] = (
+                datetime.combine(
+                    event_date, rec_ev.event_start_time, tzinfo=dt_timezone.utc
+                ),
+                datetime.combine(
+                    event_date, rec_ev.event_end_time, tzinfo=dt_timezone.utc
+                ),
             )
 
-            if event_date < rec_ev.start_date or event_date > rec_ev.end_date:
+        to_update = []
+        to_delete = []
+
+        for event in rec_ev.events.order_by("start_at", "id"):
+            if event.start_at is None:
+                # Can't be matched to a date, replaced by a new event
+                to_delete.append(event.id)
                 continue
 
-            event_start = datetime.combine(
-                event_date, rec_ev.event_start_time, tzinfo=timezone.utc
-            )
-            event_end = datetime.combine(
-                event_date, rec_ev.event_end_time, tzinfo=timezone.utc
-            )
+            event_date = event.start_at.astimezone(dt_timezone.utc).date()
 
-            # These fields must all be unique together
-            event, _ = Event.objects.update_or_create(
-                name=rec_ev.name,
+            if event_date not in targets:
+                # Outside of start/end dates, or duplicate for date
+                to_delete.append(event.id)
+                continue
+
+            start_at, end_at = targets.pop(event_date)
+            fields = {
+                "name": rec_ev.name,
+                "start_at": start_at,
+                "end_at": end_at,
+                "location": rec_ev.location,
+                # Doesn't override custom description for existing events
+                "description": event.description or rec_ev.description,
+            }
+
+            if any(getattr(event, key) != value for key, value in fields.items()):
+                for key, value in fields.items():
+                    setattr(event, key, value)
+
+                event.updated_at = timezone.now()
+                to_update.append(event)
+
+        to_create = [
+            Event(
                 club=rec_ev.club,
-                start_at=event_start,
-                end_at=event_end,
                 recurring_event=rec_ev,
+                name=rec_ev.name,
+                start_at=start_at,
+                end_at=end_at,
+                location=rec_ev.location,
+                description=rec_ev.description,
             )
+            for start_at, end_at in targets.values()
+        ]
+
+        if not (to_delete or to_update or to_create):
+            return
+
+        with transaction.atomic():
+            Event.objects.filter(id__in=to_delete).delete()
+            Event.objects.bulk_update(
+                to_update,
+                fields=[
+                    "name",
+                    "start_at",
+                    "end_at",
+                    "location",
+                    "description",
+                    "updated_at",
+                ],
+            )
+            created = Event.objects.bulk_create(to_create)
 
-            # Set other fields
-            event.location = rec_ev.location
-
-            # Only add description if not exists
-            # Doesn't override custom description for existing events
-            if event.description is None:
-                event.description = rec_ev.description
+        event_ids = [event.id for event in created]
 
-            event.save()
+        if len(event_ids) > 0:
+            transaction.on_commit(lambda: create_event_links_task.delay(event_ids))
@@ -2,8 +2,9 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 from clubs.consts import INITIAL_CLUB_ROLES
-from clubs.models import Club, ClubRole, Event, EventAttendanceLink, RecurringEvent
+from clubs.models import Club, ClubRole, Event, RecurringEvent
 from clubs.services import ClubService
+from clubs.tasks import create_event_links
 
 
 @receiver(post_save, sender=RecurringEvent)
@@ -25,8 +26,7 @@ def on_save_event(sender, instance: Event, created=False, **kwargs):
         # Only proceed if event is being created
         return
 
-    link = EventAttendanceLink.objects.create(event=instance, reference="Default")
-    link.generate_qrcode()
+    create_event_links(instance)
 
 
 @receiver(post_save, sender=Club)
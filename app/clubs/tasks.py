@@ -0,0 +1,24 @@
+from celery import shared_task
+
+from clubs.models import Event, EventAttendanceLink
+
+
+def create_event_links(event: Event):
+    """Create default attendance link for event, and its QRCode."""
+
+    link = EventAttendanceLink.objects.filter(event=event, reference="Default").first()
+
+    if link is None:
+        link = EventAttendanceLink.objects.create(event=event, reference="Default")
+
+    link.generate_qrcode()
+
+
+@shared_task
+def create_event_links_task(event_ids: list[int]):
+    """Create default attendance links for events created in bulk."""
+
+    events = Event.objects.filter(id__in=event_ids).select_related("club")
+
+    for event in events:
+        create_event_links(event)
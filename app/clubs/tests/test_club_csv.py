@@ -1,9 +1,19 @@
-from clubs.models import ClubMembership, ClubRole
+import pandas as pd
+from django.contrib.admin import AdminSite
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from clubs.admin import ClubAdmin
+from clubs.models import Club, ClubMembership, ClubRole, EventAttendance
 from clubs.serializers import ClubMembershipCsvSerializer
-from clubs.tests.utils import create_test_club
+from clubs.tests.utils import create_test_club, create_test_event
 from lib.faker import fake
+from querycsv.models import CsvUploadStatus, QueryCsvBundleJob
 from querycsv.tests.utils import UploadCsvTestsBase
 from users.models import User
+from users.tests.utils import create_test_adminuser, create_test_user
 
 
 class ClubMembershipCsvUploadTests(UploadCsvTestsBase):
@@ -51,8 +61,133 @@ class ClubMembershipCsvUploadTests(UploadCsvTestsBase):
                     ClubRole.objects.filter(name=role, club=self.club).exists()
                 )
 
-            self.assertTrue(
-                self.repo.filter(
-                    club=expected["club"], user__email=expected["user_email"]
-                ).exists()
+            membership = self.repo.get(
+                club=expected["club"], user__email=expected["user_email"]
+            )
+            self.assertListEqual(
+                sorted(membership.roles.values_list("name", flat=True)),
+                sorted(expected["roles"]),
             )
+
+    def test_upload_club_memberships_queries(self):
+        """Should fetch the club and users once, instead of once per row."""
+
+        users = [create_test_user() for _ in range(self.dataset_size)]
+        payload = [
+            {"club": self.club.id, "user_email": user.email, "roles": ["Member"]}
+            for user in users
+        ]
+        self.data_to_csv(payload)
+
+        for bulk in (False, True):
+            with CaptureQueriesContext(connection) as ctx:
+                success, failed = self.service.upload_csv(
+                    path=self.filepath, bulk=bulk, skip_unchanged=False
+                )
+
+            self.assertLength(success, self.dataset_size, failed)
+
+            for table in ("clubs_club", "users_user"):
+                lookups = [
+                    q
+                    for q in ctx.captured_queries
+                    if q["sql"].startswith(f'SELECT "{table}".')
+                ]
+                self.assertLessEqual(len(lookups), 1, table)
+
+    def test_typed_upload_club_memberships(self):
+        """Should parse typed columns before validation, and report invalid rows."""
+
+        payload = [
+            {
+                "club": self.club.id,
+                "user_email": fake.safe_email(),
+                "points": str(i * 10),
+            }
+            for i in range(self.dataset_size)
+        ]
+        payload[1]["points"] = "lots"
+        self.data_to_csv(payload)
+
+        success, failed = self.service.upload_csv(path=self.filepath, typed=True)
+
+        self.assertLength(success, self.dataset_size - 1, failed)
+        self.assertLength(failed, 1)
+        self.assertIn("points", failed[0]["errors"].keys())
+
+        for expected in payload[2:]:
+            membership = self.repo.get(user__email=expected["user_email"])
+            self.assertEqual(membership.points, int(expected["points"]))
+
+
+class ClubMembershipCsvDownloadTests(UploadCsvTestsBase):
+    """Test exporting club memberships."""
+
+    model_class = ClubMembership
+    serializer_class = ClubMembershipCsvSerializer
+
+    def setUp(self):
+        self.club = create_test_club()
+        return super().setUp()
+
+    def create_memberships(self, count: int):
+        for _ in range(count):
+            ClubMembership.objects.create(club=self.club, user=create_test_user())
+
+    def count_export_queries(self) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(self.service.iter_flat_rows(self.repo.all()))
+
+        self.assertLength(rows, self.repo.count())
+        return len(queries)
+
+    def test_export_query_count(self):
+        """Should load related objects with a constant number of queries."""
+
+        self.create_memberships(3)
+        query_count = self.count_export_queries()
+
+        self.create_memberships(10)
+
+        with self.assertNumQueries(query_count):
+            rows = list(self.service.iter_flat_rows(self.repo.all()))
+
+        membership = self.repo.first()
+        row = next(row for row in rows if row["id"] == membership.id)
+        self.assertEqual(row["user_first_name"], membership.user.first_name)
+        self.assertEqual(row["user_email"], membership.user.email)
+        self.assertEqual(row["roles"], "Member")
+
+    def test_export_handoff_bundle(self):
+        """Admin action should export selected clubs and their objects to one workbook."""
+
+        self.create_memberships(2)
+        event = create_test_event(self.club)
+        EventAttendance.objects.create(
+            event=event, member=self.club.memberships.first()
+        )
+        create_test_club()
+
+        model_admin = ClubAdmin(Club, AdminSite())
+        request = RequestFactory().get("/")
+        request.user = create_test_adminuser()
+        request.session = {}
+        request._messages = FallbackStorage(request)
+
+        model_admin.export_handoff_bundle(request, Club.objects.filter(id=self.club.id))
+
+        job = QueryCsvBundleJob.objects.get()
+        self.assertEqual(job.status, CsvUploadStatus.SUCCESS)
+
+        sheets = pd.read_excel(job.file.path, sheet_name=None)
+        counts = {name: len(df.index) for name, df in sheets.items()}
+        self.assertDictEqual(
+            counts,
+            {
+                "Clubs": 1,
+                "Memberships": 2,
+                "Roles": self.club.roles.count(),
+                "Events": 1,
+                "Attendance": 1,
+            },
+        )
@@ -5,6 +5,8 @@ Unit tests for Club business logic.
 import datetime
 
 from django.core import exceptions
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from clubs.models import Club, DayChoice, Event
@@ -147,3 +149,87 @@ class ClubEventTests(TestsBase):
 
         self.service.sync_recurring_event(rec)
         self.assertEqual(Event.objects.count(), 13)
+
+    def test_sync_recurring_event_diff(self):
+        """Should update, create, and delete events in bulk, keeping existing events."""
+
+        rec = self.service.create_recurring_event(
+            name=fake.title(),
+            start_date=datetime.date(2024, 9, 1),
+            end_date=datetime.date(2024, 12, 1),
+            day=DayChoice.TUESDAY,
+            event_start_time=datetime.time(17, 0, 0),
+            event_end_time=datetime.time(19, 0, 0),
+        )
+        rec.refresh_from_db()
+        first = rec.events.order_by("start_at").first()
+        first.description = "Custom description"
+        first.save()
+
+        rec.event_start_time = datetime.time(18, 0, 0)
+        rec.end_date = datetime.date(2024, 10, 31)
+        rec.location = "New location"
+        rec.save()
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.service.sync_recurring_event(rec)
+
+        # Events are updated in one query, instead of one per event
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+
+        events = list(rec.events.order_by("start_at"))
+        self.assertEqual(len(events), 9)
+        self.assertEqual(events[0].id, first.id)
+        self.assertEqual(events[0].description, "Custom description")
+
+        for event in events:
+            self.assertEqual(event.start_at.hour, 18)
+            self.assertEqual(event.location, "New location")
+
+        # Links for new events are created once sync is committed
+        rec.end_date = datetime.date(2024, 12, 31)
+        rec.save()
+
+        with (
+            CaptureQueriesContext(connection) as ctx,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.service.sync_recurring_event(rec)
+
+        inserts = [
+            q
+            for q in ctx.captured_queries
+            if q["sql"].startswith('INSERT INTO "clubs_event"')
+        ]
+        self.assertEqual(len(inserts), 1)
+
+        self.assertEqual(rec.events.count(), 18)
+        for event in rec.events.filter(start_at__date__gt=datetime.date(2024, 10, 31)):
+            self.assertEqual(event.attendance_links.count(), 1)
+            self.assertIsNotNone(event.attendance_links.first().qrcode)
+
+        # Syncing again doesn't change anything
+        with self.assertNumQueries(1):
+            self.service.sync_recurring_event(rec)
+
+    def test_sync_recurring_event_without_start(self):
+        """Should replace events without a start time when syncing."""
+
+        rec = self.service.create_recurring_event(
+            name=fake.title(),
+            start_date=datetime.date(2024, 9, 1),
+            end_date=datetime.date(2024, 9, 30),
+            day=DayChoice.TUESDAY,
+            event_start_time=datetime.time(17, 0, 0),
+            event_end_time=datetime.time(19, 0, 0),
+        )
+        undated = Event.objects.create(
+            club=self.club, name=rec.name, recurring_event=rec
+        )
+
+        self.service.sync_recurring_event(rec)
+
+        self.assertFalse(Event.objects.filter(id=undated.id).exists())
+        self.assertEqual(rec.events.count(), 4)
+        self.assertFalse(rec.events.filter(start_at__isnull=True).exists())
@@ -3,16 +3,27 @@ from functools import update_wrapper
 from typing import Literal, Optional
 
 from django.contrib import admin
+from django.contrib.admin import helpers
 from django.db import models
-from django.http import FileResponse, HttpRequest
+from django.http import (
+    FileResponse,
+    HttpRequest,
+    HttpResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import redirect
 from django.template.response import TemplateResponse
 from django.urls import reverse
 from django.urls.resolvers import URLPattern
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from django.utils.safestring import mark_safe
 
+from querycsv.consts import QUERYCSV_EXPORT_ASYNC_THRESHOLD
+from querycsv.models import ExportFormat, QueryCsvDownloadJob
 from querycsv.serializers import CsvModelSerializer
 from querycsv.services import QueryCsvService
+from querycsv.signals import send_process_download_job_signal
 from querycsv.views import QueryCsvViewSet
 from utils.admin import get_admin_context, get_model_admin_reverse
 
@@ -88,7 +99,7 @@ class ModelAdminBase(AdminBase, admin.ModelAdmin):
                 serializer_class=self.csv_serializer_class, get_reverse=get_reverse
             )
 
-            self.actions += ("download_csv",)
+            self.actions += ("download_csv", "download_parquet", "download_arrow")
             self.object_tools += (
                 {
                     "url": "%s:%s_%s_upload"
@@ -122,9 +133,9 @@ class ModelAdminBase(AdminBase, admin.ModelAdmin):
         from django.urls import path
 
         # Start duplicated django code ###############
-        def wrap(view):
+        def wrap(view, cacheable=False):
             def wrapper(*args, **kwargs):
-                return self.admin_site.admin_view(view)(*args, **kwargs)
+                return self.admin_site.admin_view(view, cacheable)(*args, **kwargs)
 
             wrapper.model_admin = self
             return update_wrapper(wrapper, view)
@@ -140,14 +151,34 @@ class ModelAdminBase(AdminBase, admin.ModelAdmin):
                 wrap(self.map_upload_csv_headers),
                 name=self._url_name("upload_headermapping"),
             ),
+            path(
+                "upload/parts/",
+                wrap(self.start_upload_session),
+                name=self._url_name("upload_session_start"),
+            ),
+            path(
+                "upload/parts/<int:id>/",
+                wrap(self.upload_session),
+                name=self._url_name("upload_session"),
+            ),
+            path(
+                "upload/parts/<int:id>/complete",
+                wrap(self.complete_upload_session),
+                name=self._url_name("upload_session_complete"),
+            ),
+            path(
+                "upload/parts/<int:id>/<int:number>",
+                wrap(self.upload_session_part),
+                name=self._url_name("upload_session_part"),
+            ),
             path(
                 "csv-template/",
-                wrap(self.download_csv_template),
+                wrap(self.download_csv_template, cacheable=True),
                 name=self._url_name("csv_template"),
             ),
             path(
                 "csv-template/<path:include_fields>",
-                wrap(self.download_csv_template),
+                wrap(self.download_csv_template, cacheable=True),
                 name=self._url_name("csv_template"),
             ),
         ] + super(ModelAdminBase, self).get_urls()
@@ -176,13 +207,51 @@ class ModelAdminBase(AdminBase, admin.ModelAdmin):
         context = {**get_admin_context(request, extra_context)}
         return self.csv_views.map_upload_csv_headers(request, id, extra_context=context)
 
+    def start_upload_session(self, request: HttpRequest):
+        """Start a csv upload sent in parts."""
+
+        return self.csv_views.start_upload_session(request)
+
+    def upload_session(self, request: HttpRequest, id: int):
+        """Get received parts of a csv upload."""
+
+        return self.csv_views.upload_session(request, id)
+
+    def upload_session_part(self, request: HttpRequest, id: int, number: int):
+        """Receive a part of a csv upload."""
+
+        return self.csv_views.upload_session_part(request, id, number)
+
+    def complete_upload_session(self, request: HttpRequest, id: int):
+        """Create upload job once all parts are received."""
+
+        return self.csv_views.complete_upload_session(request, id)
+
     def download_csv_template(self, request: HttpRequest):
         """Get template for csv uploads."""
 
         include_fields = request.GET.get("fields", None)
+        content, etag = self.csv_svc.get_csv_template_content(
+            field_types=include_fields
+        )
+        etag = quote_etag(etag)
+
+        # Browsers revalidate with the ETag, and get a 304 if fields haven't changed
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            response = HttpResponse(
+                content,
+                content_type="text/csv",
+                headers={
+                    "Content-Disposition": f'attachment; filename="{self.opts.model_name}_template.csv"'
+                },
+            )
+
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
 
-        filepath = self.csv_svc.get_csv_template(field_types=include_fields)
-        return FileResponse(open(filepath, "rb"))
+        return response
 
     ##############################
     # == Custom Admin Actions == #
@@ -200,8 +269,115 @@ class ModelAdminBase(AdminBase, admin.ModelAdmin):
             )
             return redirect(f"{self.admin_name}:{self._url_name()}")
 
-        filepath = self.csv_svc.download_csv(queryset)
-        return FileResponse(open(filepath, "rb"))
+        fingerprint, count = self.csv_svc.get_export_fingerprint(
+            queryset, ExportFormat.CSV
+        )
+        cached = self.csv_svc.open_cached_download(fingerprint, ExportFormat.CSV)
+
+        if cached is not None:
+            return FileResponse(
+                cached,
+                as_attachment=True,
+                filename=f"{self.opts.model_name}.csv",
+            )
+
+        if self._enqueue_download(request, queryset, ExportFormat.CSV, count=count):
+            return None
+
+        return StreamingHttpResponse(
+            self.csv_svc.stream_csv_cached(queryset, fingerprint=fingerprint),
+            content_type="text/csv",
+            headers={
+                "Content-Disposition": f'attachment; filename="{self.opts.model_name}.csv"'
+            },
+        )
+
+    def _enqueue_download(
+        self, request, queryset, file_format: ExportFormat, count=None
+    ):
+        """
+        Export large selections in the background, so the request doesn't time out.
+
+        Returns whether a download job was created.
+        """
+
+        if count is None:
+            count = queryset.count()
+
+        if count <= QUERYCSV_EXPORT_ASYNC_THRESHOLD:
+            return False
+
+        # Objects checked on the changelist are saved by id, while "select all"
+        # saves the changelist's filters, so ids aren't loaded in the request
+        pks = None
+        if request.POST.get("select_across", "0") == "0":
+            pks = request.POST.getlist(helpers.ACTION_CHECKBOX_NAME) or None
+
+        job = QueryCsvDownloadJob.objects.create(
+            serializer_class=self.csv_serializer_class,
+            queryset=queryset,
+            file_format=file_format,
+            notify_email=request.user.email,
+            pks=pks,
+        )
+        send_process_download_job_signal(job)
+
+        self.message_user(
+            request,
+            f"Exporting {count} objects in the background, "
+            f"a download link will be emailed to {request.user.email}.",
+            logging.INFO,
+        )
+
+        return True
+
+    def _download_file(self, request, queryset, file_format: ExportFormat):
+        if self.csv_serializer_class is None:
+            self.message_user(
+                request,
+                "Unable to download objects without a serializer.",
+                logging.WARNING,
+            )
+            return redirect(f"{self.admin_name}:{self._url_name()}")
+
+        # Identical exports are served from the cache, even if they're large
+        fingerprint, count = self.csv_svc.get_export_fingerprint(queryset, file_format)
+        file = self.csv_svc.open_cached_download(fingerprint, file_format)
+
+        if file is None:
+            if self._enqueue_download(request, queryset, file_format, count=count):
+                return None
+
+            filepath = self.csv_svc.download(
+                queryset, file_format=file_format, fingerprint=fingerprint
+            )
+
+            try:
+                file = open(filepath, "rb")
+            except FileNotFoundError:
+                # Evicted from the cache by another export, export it again
+                filepath = self.csv_svc.download(
+                    queryset, file_format=file_format, use_cache=False
+                )
+                file = open(filepath, "rb")
+
+        return FileResponse(
+            file,
+            as_attachment=True,
+            filename=f"{self.opts.model_name}.{file_format.value}",
+        )
+
+    @admin.action(description="Download selection as Parquet")
+    def download_parquet(self, request, queryset):
+        """Download queryset of objects as a parquet file."""
+
+        return self._download_file(request, queryset, ExportFormat.PARQUET)
+
+    @admin.action(description="Download selection as Arrow")
+    def download_arrow(self, request, queryset):
+        """Download queryset of objects as an arrow ipc file."""
+
+        return self._download_file(request, queryset, ExportFormat.ARROW)
 
 
 class InlineBase(AdminBase):
@@ -130,7 +130,7 @@ class ModelBase(models.Model):
     """Defines permissions level applied to model."""
 
     created_at = models.DateTimeField(auto_now_add=True, editable=False, blank=True)
-    updated_at = models.DateTimeField(auto_now=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, blank=True, db_index=True)
 
     objects: ClassVar[ManagerBase[Self]] = ManagerBase[Self]()
 
@@ -102,15 +102,21 @@ class ModelSerializerBase(serializers.ModelSerializer):
     def unique_fields(self) -> list[str]:
         """Get list of all fields that can be used to unique identify models."""
 
+        unique_fields = self.model_unique_fields
+
+        return [field for field in self.readable_fields if field in unique_fields]
+
+    @property
+    def model_unique_fields(self) -> list[str]:
+        """Get names of model fields that are primary keys or unique."""
+
         model_fields = self.model_class._meta.get_fields()
-        unique_fields = [
-            field
+
+        return [
+            field.name
             for field in model_fields
             if getattr(field, "primary_key", False) or getattr(field, "_unique", False)
         ]
-        unique_fields = [field.name for field in unique_fields]
-
-        return [field for field in self.readable_fields if field in unique_fields]
 
     @property
     def related_fields(self) -> list[str]:
@@ -1,17 +1,162 @@
+import shutil
+import tempfile
+import urllib.request
+from contextlib import nullcontext
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional
+
 import numpy as np
+import openpyxl
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import xlsxwriter
 
 SPREADSHEET_EXTS = ("csv", "xls", "xlsx")
 """Tuple of supported spreadsheet extensions."""
 
+SPREADSHEET_CHUNK_SIZE = 1000
+"""Default number of rows to load at a time when reading spreadsheets in chunks."""
+
+
+def _is_excel(path) -> bool:
+    return isinstance(path, str) and (path.endswith(".xlsx") or path.endswith(".xls"))
+
+
+def _open_csv_source(path):
+    if isinstance(path, str) and (
+        path.startswith("http://") or path.startswith("https://")
+    ):
+        return urllib.request.urlopen(path)
+
+    return path
+
+
+def _apply_dtypes(table: pa.Table, dtypes: dict[str, pa.DataType]) -> pd.DataFrame:
+    """
+    Convert a table of strings to a dataframe, casting columns with a dtype.
+
+    Typed columns are arrow-backed, and empty cells are null. If a column
+    has values that can't be cast in this table, it's kept as strings so
+    each row can be validated on its own. Other columns are strings.
+    """
+
+    columns = {}
+
+    for name, column in zip(table.column_names, table.columns):
+        arrow_type = dtypes.get(name, None)
+
+        if arrow_type is None or pa.types.is_string(arrow_type):
+            columns[name] = column.to_pandas()
+            continue
+
+        trimmed = pc.utf8_trim_whitespace(column)
+        trimmed = pc.if_else(
+            pc.equal(trimmed, ""), pa.scalar(None, pa.string()), trimmed
+        )
+
+        try:
+            typed = pc.cast(trimmed, arrow_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            columns[name] = column.to_pandas()
+            continue
+
+        columns[name] = typed.to_pandas(types_mapper=pd.ArrowDtype)
+
+    return pd.DataFrame(columns)
+
+
+def _open_csv_at(path: str, row_offset: Optional[tuple[int, int]]):
+    """Open a csv file at the byte offset of a data row, or the start of the file."""
+
+    if row_offset is None:
+        return nullcontext(_open_csv_source(path))
+
+    f = open(path, "rb")
+    f.seek(row_offset[1])
+
+    return f
+
+
+def _read_csv_arrow_chunks(
+    path: str,
+    chunk_size: int,
+    dtypes: dict,
+    start=0,
+    stop=None,
+    row_offset: Optional[tuple[int, int]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Import csv in chunks with pyarrow's streaming reader, see ``_apply_dtypes``."""
+
+    headers = read_spreadsheet_headers(path)
+    remaining = stop - start if stop is not None else None
+    skipped = row_offset[0] if row_offset is not None else 0
+    buffer = None
+
+    with _open_csv_at(path, row_offset) as source:
+        reader = pa_csv.open_csv(
+            source,
+            read_options=pa_csv.ReadOptions(
+                column_names=headers if row_offset is not None else None
+            ),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={header: pa.string() for header in headers},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+
+        for batch in reader:
+            table = pa.Table.from_batches([batch])
+
+            # Skip by parsed rows, since blank lines aren't data rows
+            if skipped < start:
+                skip = min(start - skipped, table.num_rows)
+                table = table.slice(skip)
+                skipped += skip
+
+            if buffer is not None:
+                table = pa.concat_tables([buffer, table])
+
+            if remaining is not None:
+                table = table.slice(0, remaining)
+
+            while table.num_rows >= chunk_size:
+                yield _apply_dtypes(table.slice(0, chunk_size), dtypes)
+                table = table.slice(chunk_size)
+
+                if remaining is not None:
+                    remaining -= chunk_size
+
+            buffer = table
+
+            if remaining is not None and buffer.num_rows >= remaining:
+                break
+
+    if buffer is not None and buffer.num_rows > 0:
+        yield _apply_dtypes(buffer, dtypes)
+
 
-def read_spreadsheet(path: str):
-    """Import spreadsheet from filepath."""
+def read_spreadsheet(path: str, dtypes: Optional[dict[str, pa.DataType]] = None):
+    """
+    Import spreadsheet from filepath.
+
+    If dtypes are given, csv files are parsed with pyarrow, and columns
+    with a dtype are cast to it, see ``read_spreadsheet_chunks``.
+    """
+
+    if dtypes is not None:
+        chunks = list(
+            read_spreadsheet_chunks(path, chunk_size=2**31 - 1, dtypes=dtypes)
+        )
+
+        return pd.concat(chunks) if len(chunks) > 0 else pd.DataFrame()
 
     if isinstance(path, str):
         # assert os.path.exists(path), f"File doesn't exist at {path}."
 
-        if path.endswith(".xlsx") or path.endswith(".xls"):
+        if _is_excel(path):
             df = pd.read_excel(path, dtype=str)
         else:
             df = pd.read_csv(path, dtype=str)
@@ -21,3 +166,383 @@ def read_spreadsheet(path: str):
     df.replace(np.nan, "", inplace=True)
 
     return df
+
+
+def _read_excel_rows(path: str, min_row: Optional[int] = None):
+    """
+    Iterate over rows in the first sheet of an xlsx file, using a read-only workbook.
+
+    If given, rows before ``min_row`` (1-based, including the header) are skipped.
+    """
+
+    with tempfile.TemporaryFile() as file:
+        if path.startswith("http://") or path.startswith("https://"):
+            # Workbooks are zip files, so remote files are downloaded to disk first
+            with urllib.request.urlopen(path) as res:
+                shutil.copyfileobj(res, file)
+
+            file.seek(0)
+            source = file
+        else:
+            source = path
+
+        workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+
+        try:
+            yield from workbook.active.iter_rows(min_row=min_row, values_only=True)
+        finally:
+            workbook.close()
+
+
+def _is_blank_excel_row(row: tuple) -> bool:
+    return all(value is None for value in row)
+
+
+def _read_excel_chunks(
+    path: str,
+    chunk_size: int,
+    start=0,
+    stop=None,
+    row_offset: Optional[tuple[int, int]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Import xlsx file in chunks, converting cells to strings like ``read_spreadsheet``."""
+
+    if path.endswith(".xls"):
+        # Legacy format doesn't support read-only mode, load whole sheet
+        df = read_spreadsheet(path).iloc[start:stop]
+
+        for chunk_start in range(0, len(df.index), chunk_size):
+            chunk_end = chunk_start + chunk_size
+            yield df.iloc[chunk_start:chunk_end]
+
+        return
+
+    if row_offset is not None:
+        # Rows are read from the sheet row of a known data row
+        columns = read_spreadsheet_headers(path)
+        rows = _read_excel_rows(path, min_row=row_offset[1])
+        start -= row_offset[0]
+        stop = stop - row_offset[0] if stop is not None else None
+    else:
+        rows = _read_excel_rows(path)
+        header = next(rows, None)
+
+        if header is None:
+            return
+
+        columns = [str(col) if col is not None else "" for col in header]
+
+    width = len(columns)
+
+    # Skip blank rows, like the csv reader
+    rows = (row for row in rows if not _is_blank_excel_row(row))
+    rows = islice(rows, start, stop)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+
+        if len(chunk) == 0:
+            break
+
+        records = []
+        for row in chunk:
+            values = ["" if value is None else str(value) for value in row[:width]]
+            records.append(values + [""] * (width - len(values)))
+
+        yield pd.DataFrame.from_records(records, columns=columns)
+
+
+def read_spreadsheet_chunks(
+    path: str,
+    chunk_size=SPREADSHEET_CHUNK_SIZE,
+    start=0,
+    stop=None,
+    dtypes: Optional[dict[str, pa.DataType]] = None,
+    row_offset: Optional[tuple[int, int]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Import spreadsheet from filepath, yielding dataframes of at most chunk_size rows.
+
+    Only one chunk is held in memory at a time. Csv files are read with pandas'
+    chunked reader, xlsx files are read row by row with a read-only workbook.
+    Every chunk has the same columns, and empty cells are converted to "".
+
+    If dtypes are given, csv files are read with pyarrow's streaming reader
+    instead. Columns with a dtype are arrow-backed, with empty cells as nulls,
+    and the rest are strings. Columns with values that can't be cast are
+    kept as strings for that chunk.
+
+    Parameters
+    ----------
+        - path (str): Path or url of the spreadsheet.
+        - chunk_size (int): Max number of rows in each dataframe.
+        - start (int): Index of the first data row to read, excluding the header.
+        - stop (int): Index of the data row to stop before, reads to the end if None.
+        - dtypes (dict): Column name => arrow type to parse the column as.
+        - row_offset (tuple): (data row, position) of a row at or before start,
+            from ``index_spreadsheet_rows``. The file is read from that row
+            instead of parsing every row before start.
+    """
+
+    if _is_excel(path) and path.endswith(".xls"):
+        row_offset = None
+
+    if _is_excel(path):
+        for df in _read_excel_chunks(
+            path, chunk_size, start=start, stop=stop, row_offset=row_offset
+        ):
+            if dtypes is not None:
+                df = _apply_dtypes(
+                    pa.Table.from_pandas(df, preserve_index=False), dtypes
+                )
+
+            yield df
+
+        return
+
+    if stop is not None and stop <= start:
+        return
+
+    if dtypes is not None:
+        yield from _read_csv_arrow_chunks(
+            path, chunk_size, dtypes, start=start, stop=stop, row_offset=row_offset
+        )
+        return
+
+    # Rows are counted after parsing instead of skipping lines in the file,
+    # since blank lines aren't data rows, see ``count_spreadsheet_rows``
+    position = 0
+    options = {}
+
+    if row_offset is not None:
+        position = row_offset[0]
+        options = {"header": None, "names": read_spreadsheet_headers(path)}
+
+    with (
+        _open_csv_at(path, row_offset) as source,
+        pd.read_csv(source, dtype=str, chunksize=chunk_size, **options) as reader,
+    ):
+        for df in reader:
+            chunk_start = position
+            position += len(df.index)
+
+            if position <= start:
+                continue
+
+            lower = max(start - chunk_start, 0)
+            upper = stop - chunk_start if stop is not None else None
+            df = df.iloc[lower:upper]
+
+            df.replace(np.nan, "", inplace=True)
+            yield df
+
+            if stop is not None and position >= stop:
+                break
+
+
+def read_spreadsheet_headers(path: str) -> list[str]:
+    """Read column names from the first row of a spreadsheet, without loading its rows."""
+
+    if _is_excel(path) and path.endswith(".xlsx"):
+        header = next(_read_excel_rows(path), None) or []
+        return [str(col) if col is not None else "" for col in header]
+    elif _is_excel(path):
+        return list(pd.read_excel(path, dtype=str, nrows=0).columns)
+
+    return list(pd.read_csv(path, dtype=str, nrows=0).columns)
+
+
+def _index_csv_rows(path: str, every: int) -> list[tuple[int, int]]:
+    """
+    Find the byte offset of every ``every``th data row in a csv file.
+
+    Lines are joined while a quoted value is open, and blank lines are
+    skipped like pandas does, so offsets match the rows that are parsed.
+    """
+
+    offsets = []
+    row = -1  # Header
+    position = 0
+    record_start = None
+    quotes = 0
+
+    with open(path, "rb") as f:
+        for line in f:
+            if record_start is None:
+                record_start = position
+
+            position += len(line)
+            quotes += line.count(b'"')
+
+            if quotes % 2 == 1:
+                continue
+
+            is_blank = position - len(line) == record_start and line.strip() == b""
+            offset = record_start
+            record_start = None
+            quotes = 0
+
+            if is_blank:
+                continue
+
+            if row >= 0 and row % every == 0:
+                offsets.append((row, offset))
+
+            row += 1
+
+    return offsets
+
+
+def _index_excel_rows(path: str, every: int) -> list[tuple[int, int]]:
+    """Find the sheet row of every ``every``th data row in an xlsx file."""
+
+    offsets = []
+    row = 0
+
+    for sheet_row, values in enumerate(_read_excel_rows(path), start=1):
+        if sheet_row == 1 or _is_blank_excel_row(values):
+            continue
+
+        if row % every == 0:
+            offsets.append((row, sheet_row))
+
+        row += 1
+
+    return offsets
+
+
+def index_spreadsheet_rows(path: str, every: int) -> list[tuple[int, int]]:
+    """
+    Find where every ``every``th data row starts, reading the file once.
+
+    Returns (data row, position) pairs that can be given to
+    ``read_spreadsheet_chunks`` as ``row_offset``, so a range of rows can
+    be read without parsing the rows before it. Positions are byte offsets
+    in csv files, and sheet rows in xlsx files. Legacy xls files and remote
+    files aren't indexed.
+    """
+
+    if not isinstance(path, str) or path.startswith(("http://", "https://")):
+        return []
+    elif path.endswith(".xlsx"):
+        return _index_excel_rows(path, every)
+    elif _is_excel(path):
+        return []
+
+    return _index_csv_rows(path, every)
+
+
+def count_spreadsheet_rows(path: str) -> int:
+    """Count data rows in a spreadsheet, excluding the header, one chunk at a time."""
+
+    return sum(len(df.index) for df in read_spreadsheet_chunks(path))
+
+
+def flatten_record(record: dict, prefix="") -> dict:
+    """Flatten nested dicts using dot notation, like ``pd.json_normalize``."""
+
+    flat = {}
+
+    for key, value in record.items():
+        if isinstance(value, dict):
+            flat.update(flatten_record(value, prefix=f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+
+    return flat
+
+
+def _to_cell(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+
+    return str(value)
+
+
+def write_xlsx_sheets(
+    path: str, sheets: dict[str, Callable[[], Iterable[dict]]]
+) -> dict[str, int]:
+    """
+    Write rows to an xlsx file without keeping them in memory.
+
+    Each sheet is given as a function that returns a new iterator of rows,
+    since rows are read twice: once to find the columns, and once to write
+    them. The workbook uses xlsxwriter's constant memory mode, so only
+    the current row is held in memory. Returns number of rows per sheet.
+
+    Parameters
+    ----------
+        - path (str): Where to save the xlsx file.
+        - sheets (dict): Sheet name => function returning rows as dicts.
+    """
+
+    counts = {}
+    workbook = xlsxwriter.Workbook(
+        path, {"constant_memory": True, "strings_to_urls": False}
+    )
+    header_format = workbook.add_format({"bold": True, "border": 1})
+
+    try:
+        for name, get_rows in sheets.items():
+            # Columns in order of first appearance
+            columns = {}
+            for row in get_rows():
+                columns.update(dict.fromkeys(flatten_record(row)))
+
+            columns = list(columns.keys())
+            worksheet = workbook.add_worksheet(name)
+            worksheet.write_row(0, 0, columns, header_format)
+
+            count = 0
+            for count, row in enumerate(get_rows(), start=1):
+                flat = flatten_record(row)
+                worksheet.write_row(
+                    count, 0, [_to_cell(flat.get(column)) for column in columns]
+                )
+
+            counts[name] = count
+    finally:
+        workbook.close()
+
+    return counts
+
+
+def write_xlsx_stream(
+    path: str, sheets: Iterable[tuple[str, Iterable[dict], list[str]]]
+) -> dict[str, int]:
+    """
+    Write rows to an xlsx file in one pass, one sheet at a time.
+
+    Unlike ``write_xlsx_sheets``, columns are given for each sheet, so rows
+    are only read once and can come from a stream. Values for keys that
+    aren't columns are skipped. Only the current row is held in memory.
+    Returns number of rows per sheet.
+
+    Parameters
+    ----------
+        - path (str): Where to save the xlsx file.
+        - sheets (iterable): (sheet name, flat rows, columns) for each sheet.
+    """
+
+    counts = {}
+    workbook = xlsxwriter.Workbook(
+        path, {"constant_memory": True, "strings_to_urls": False}
+    )
+    header_format = workbook.add_format({"bold": True, "border": 1})
+
+    try:
+        for name, rows, columns in sheets:
+            worksheet = workbook.add_worksheet(name)
+            worksheet.write_row(0, 0, columns, header_format)
+
+            count = 0
+            for count, row in enumerate(rows, start=1):
+                worksheet.write_row(
+                    count, 0, [_to_cell(row.get(column)) for column in columns]
+                )
+
+            counts[name] = count
+    finally:
+        workbook.close()
+
+    return counts
@@ -1,5 +1,220 @@
 from django.contrib import admin
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from django.utils.translation import gettext_lazy as _
 
-from querycsv.models import QueryCsvUploadJob
+from querycsv.models import (
+    QueryCsvBundleJob,
+    QueryCsvBundleSheet,
+    QueryCsvDownloadJob,
+    QueryCsvExportProfile,
+    QueryCsvUploadJob,
+)
+from querycsv.tasks import export_profile_task
+from utils.admin import other_info_fields
 
-admin.site.register(QueryCsvUploadJob)
+
+class QueryCsvUploadJobAdmin(admin.ModelAdmin):
+    """Display csv upload jobs and their progress in admin."""
+
+    list_display = (
+        "__str__",
+        "serializer",
+        "status",
+        "rows_processed",
+        "row_count",
+        "created_at",
+    )
+    list_filter = ("status", "dry_run")
+    readonly_fields = (
+        "created_at",
+        "updated_at",
+        "dry_run",
+        "dry_run_job",
+        "status",
+        "row_count",
+        "rows_processed",
+        "rows_succeeded",
+        "rows_failed",
+        "progress_url",
+    )
+
+    fieldsets = (
+        (
+            None,
+            {
+                "fields": (
+                    "file",
+                    "serializer",
+                    "notify_email",
+                    "custom_field_mappings",
+                    "report",
+                ),
+            },
+        ),
+        (
+            _("Processing"),
+            {
+                "fields": (
+                    "chunk_size",
+                    "max_concurrency",
+                    "skip_unchanged",
+                    "dry_run",
+                    "dry_run_job",
+                )
+            },
+        ),
+        (
+            _("Progress"),
+            {
+                "fields": (
+                    "status",
+                    "row_count",
+                    "rows_processed",
+                    "rows_succeeded",
+                    "rows_failed",
+                    "progress_url",
+                )
+            },
+        ),
+        other_info_fields,
+    )
+
+    def get_urls(self):
+        info = self.opts.app_label, self.opts.model_name
+
+        return [
+            path(
+                "<int:id>/progress/",
+                self.admin_site.admin_view(self.progress_view),
+                name="%s_%s_progress" % info,
+            ),
+        ] + super().get_urls()
+
+    def progress_view(self, request, id: int):
+        """Get current progress of an upload job as json, used for polling."""
+
+        job = get_object_or_404(QueryCsvUploadJob, id=id)
+
+        if not self.has_view_permission(request, job):
+            return JsonResponse({"detail": "Permission denied."}, status=403)
+
+        return JsonResponse(job.progress)
+
+    @admin.display(description="Progress")
+    def progress_url(self, obj):
+        if not obj.id:
+            return None
+
+        info = self.admin_site.name, self.opts.app_label, self.opts.model_name
+        url = reverse("%s:%s_%s_progress" % info, args=[obj.id])
+
+        return format_html('<a href="{}" target="_blank">{}</a>', url, url)
+
+
+class QueryCsvDownloadJobAdmin(admin.ModelAdmin):
+    """Display queryset export jobs in admin."""
+
+    list_display = (
+        "__str__",
+        "serializer",
+        "file_format",
+        "status",
+        "rows_processed",
+        "row_count",
+        "created_at",
+    )
+    list_filter = ("status", "file_format")
+    readonly_fields = (
+        "created_at",
+        "updated_at",
+        "serializer",
+        "query",
+        "file_format",
+        "status",
+        "row_count",
+        "rows_processed",
+    )
+
+    def has_add_permission(self, request):
+        # Jobs are created from download actions
+        return False
+
+
+class QueryCsvBundleSheetInlineAdmin(admin.TabularInline):
+    """Display sheets of a bundle export."""
+
+    model = QueryCsvBundleSheet
+    extra = 0
+    fields = ("order", "name", "serializer")
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class QueryCsvBundleJobAdmin(admin.ModelAdmin):
+    """Display bundle export jobs in admin."""
+
+    list_display = (
+        "__str__",
+        "file_format",
+        "status",
+        "rows_processed",
+        "row_count",
+        "created_at",
+    )
+    list_filter = ("status", "file_format")
+    readonly_fields = (
+        "created_at",
+        "updated_at",
+        "name",
+        "file_format",
+        "status",
+        "row_count",
+        "rows_processed",
+    )
+    inlines = (QueryCsvBundleSheetInlineAdmin,)
+
+    def has_add_permission(self, request):
+        # Jobs are created from bundle actions
+        return False
+
+
+class QueryCsvExportProfileAdmin(admin.ModelAdmin):
+    """Manage incremental exports in admin."""
+
+    list_display = (
+        "__str__",
+        "serializer",
+        "file_format",
+        "watermark",
+        "rows_exported",
+        "rows_deleted",
+    )
+    readonly_fields = (
+        "created_at",
+        "updated_at",
+        "file",
+        "deleted_file",
+        "rows_exported",
+        "rows_deleted",
+    )
+    actions = ("export_changes",)
+
+    @admin.action(description="Export changes since last export")
+    def export_changes(self, request, queryset):
+        for profile in queryset:
+            export_profile_task.delay(profile.id)
+
+        self.message_user(
+            request, f"Exporting changes for {queryset.count()} profiles."
+        )
+
+
+admin.site.register(QueryCsvUploadJob, QueryCsvUploadJobAdmin)
+admin.site.register(QueryCsvDownloadJob, QueryCsvDownloadJobAdmin)
+admin.site.register(QueryCsvBundleJob, QueryCsvBundleJobAdmin)
+admin.site.register(QueryCsvExportProfile, QueryCsvExportProfileAdmin)
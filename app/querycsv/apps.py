@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class QuerycsvConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "querycsv"
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
+
+        return super().ready()
@@ -0,0 +1,156 @@
+"""
+Local disk cache for finished exports.
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from querycsv.consts import (
+    QUERYCSV_EXPORT_CACHE_MAX_AGE,
+    QUERYCSV_EXPORT_CACHE_MAX_SIZE,
+    QUERYCSV_MEDIA_SUBDIR,
+    QUERYCSV_TEMP_FILE_MAX_AGE,
+)
+from utils.files import evict_files, get_media_path
+
+
+class ExportCache:
+    """
+    Keep exported files, so an identical export can be served again.
+
+    Files are stored by a fingerprint of the export, see
+    ``QueryCsvService.get_export_fingerprint``. Files that haven't been
+    used for ``max_age`` seconds are removed, and when the cache is
+    larger than ``max_size`` bytes, the least recently used files are
+    removed. Files are moved into place once they are fully written.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_size=QUERYCSV_EXPORT_CACHE_MAX_SIZE,
+        max_age=QUERYCSV_EXPORT_CACHE_MAX_AGE,
+        temp_max_age=QUERYCSV_TEMP_FILE_MAX_AGE,
+    ):
+        self._directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+        self.temp_max_age = temp_max_age
+
+    @property
+    def directory(self) -> Path:
+        # Resolved when used, so importing doesn't create media directories
+        if self._directory is None:
+            return Path(get_media_path(QUERYCSV_MEDIA_SUBDIR + "cache/"))
+
+        return Path(self._directory)
+
+    def get_cached_path(self, fingerprint: str, name: str, ext: str) -> Path:
+        """Where an export is kept in the cache."""
+
+        return self.directory / f"{name}_{fingerprint}.{ext}"
+
+    def get(self, fingerprint: str, name: str, ext: str) -> Optional[str]:
+        """Get path of a cached export, if it exists and hasn't expired."""
+
+        path = self.get_cached_path(fingerprint, name, ext)
+
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                return None
+
+            # Mark as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        return str(path)
+
+    def open(self, fingerprint: str, name: str, ext: str) -> Optional[BinaryIO]:
+        """
+        Open a cached export for reading, if it exists and hasn't expired.
+
+        The file is opened before it's checked, so it can still be read
+        if another export evicts it afterwards.
+        """
+
+        path = self.get_cached_path(fingerprint, name, ext)
+
+        try:
+            file = path.open("rb")
+        except FileNotFoundError:
+            return None
+
+        if time.time() - os.fstat(file.fileno()).st_mtime > self.max_age:
+            file.close()
+            path.unlink(missing_ok=True)
+            return None
+
+        try:
+            # Mark as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        return file
+
+    def put(self, fingerprint: str, name: str, ext: str, filepath: str) -> str:
+        """Move an exported file into the cache, return its new path."""
+
+        path = self.get_cached_path(fingerprint, name, ext)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        os.replace(filepath, path)
+        self.evict(keep=path)
+
+        return str(path)
+
+    def write_through(
+        self, fingerprint: str, name: str, ext: str, chunks: Iterator[str]
+    ) -> Iterator[str]:
+        """
+        Yield chunks of a text export, and cache the file once all are written.
+
+        If the stream isn't finished, for example when a download is
+        cancelled, nothing is cached.
+        """
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        file = tempfile.NamedTemporaryFile(
+            mode="w", dir=self.directory, delete=False, newline="", suffix=".tmp"
+        )
+
+        try:
+            with file:
+                for chunk in chunks:
+                    file.write(chunk)
+                    yield chunk
+        except BaseException:
+            os.unlink(file.name)
+            raise
+
+        self.put(fingerprint, name, ext, file.name)
+
+    def evict(self, keep: Optional[Path] = None):
+        """
+        Remove expired files, and least recently used files until the cache fits.
+
+        Exports that are still being written are kept, unless they haven't
+        been written to for ``temp_max_age`` seconds.
+        """
+
+        evict_files(
+            self.directory,
+            self.max_size,
+            temp_max_age=self.temp_max_age,
+            max_age=self.max_age,
+            keep=keep,
+        )
+
+
+export_cache = ExportCache()
+"""Cache shared by querycsv exports in this process."""
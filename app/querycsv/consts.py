@@ -1,6 +1,68 @@
+import os
+import tempfile
+
 QUERYCSV_MEDIA_SUBDIR = "core/querycsv/"
 """Nested directory to use in media storage. Excludes media path."""
 
 EXTRA_QUERYCSV_FIELDS = ("SKIP",)
 
-__all__ = ["QUERYCSV_MEDIA_SUBDIR", "EXTRA_QUERYCSV_FIELDS"]
+QUERYCSV_BULK_BATCH_SIZE = 500
+"""Number of rows validated and written together when bulk uploading."""
+
+QUERYCSV_COMMIT_EVERY = 500
+"""Number of rows committed in each transaction when uploading one row at a time."""
+
+QUERYCSV_EXPORT_CHUNK_SIZE = 2000
+"""Number of objects loaded from the database at a time when exporting."""
+
+QUERYCSV_EXPORT_ASYNC_THRESHOLD = 5000
+"""Exports with more objects than this are processed in the background."""
+
+QUERYCSV_DRY_RUN_PREVIEW_SIZE = 100
+"""Max number of failed rows shown after validating an upload."""
+
+QUERYCSV_STAGING_DIR = os.path.join(tempfile.gettempdir(), "querycsv-staging")
+"""Local directory where files from remote storage are cached while processing."""
+
+QUERYCSV_STAGING_MAX_SIZE = 1024 * 1024 * 1024
+"""Max number of bytes kept in the staging directory, least recently used are removed."""
+
+QUERYCSV_TEMPLATE_CACHE_SIZE = 256
+"""Max number of csv templates kept in memory, one per set of columns."""
+
+QUERYCSV_EXPORT_CACHE_MAX_SIZE = 512 * 1024 * 1024
+"""Max number of bytes of finished exports kept, least recently used are removed."""
+
+QUERYCSV_EXPORT_CACHE_MAX_AGE = 24 * 60 * 60
+"""Seconds a finished export is kept after it was last used."""
+
+QUERYCSV_TEMP_FILE_MAX_AGE = 60 * 60
+"""Seconds a partially written cache file can go unmodified before it's removed."""
+
+QUERYCSV_EXPORT_WATERMARK_OVERLAP = 5 * 60
+"""Seconds before an export profile's watermark that are exported again, for late commits."""
+
+QUERYCSV_PROFILE_CACHE_TTL = 30
+"""Seconds the set of models with export profiles is cached in each process."""
+
+QUERYCSV_UPLOAD_PART_SIZE = 2 * 1024 * 1024
+"""Bytes in each part of a chunked upload, under Django's DATA_UPLOAD_MAX_MEMORY_SIZE."""
+
+__all__ = [
+    "QUERYCSV_MEDIA_SUBDIR",
+    "EXTRA_QUERYCSV_FIELDS",
+    "QUERYCSV_BULK_BATCH_SIZE",
+    "QUERYCSV_COMMIT_EVERY",
+    "QUERYCSV_EXPORT_CHUNK_SIZE",
+    "QUERYCSV_EXPORT_ASYNC_THRESHOLD",
+    "QUERYCSV_DRY_RUN_PREVIEW_SIZE",
+    "QUERYCSV_STAGING_DIR",
+    "QUERYCSV_STAGING_MAX_SIZE",
+    "QUERYCSV_TEMPLATE_CACHE_SIZE",
+    "QUERYCSV_EXPORT_CACHE_MAX_SIZE",
+    "QUERYCSV_EXPORT_CACHE_MAX_AGE",
+    "QUERYCSV_TEMP_FILE_MAX_AGE",
+    "QUERYCSV_EXPORT_WATERMARK_OVERLAP",
+    "QUERYCSV_PROFILE_CACHE_TTL",
+    "QUERYCSV_UPLOAD_PART_SIZE",
+]
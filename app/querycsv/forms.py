@@ -11,6 +11,24 @@ class CsvUploadForm(forms.Form):
         label="Select CSV or Excel Spreadsheet to upload.",
         widget=forms.FileInput(attrs={"class": "form-control"}),
     )
+    chunk_size = forms.IntegerField(
+        required=False,
+        min_value=1,
+        help_text=QueryCsvUploadJob.chunk_size.field.help_text,
+        widget=forms.NumberInput(attrs={"class": "form-control"}),
+    )
+    max_concurrency = forms.IntegerField(
+        required=False,
+        initial=1,
+        min_value=1,
+        help_text=QueryCsvUploadJob.max_concurrency.field.help_text,
+        widget=forms.NumberInput(attrs={"class": "form-control"}),
+    )
+    skip_unchanged = forms.BooleanField(
+        required=False,
+        help_text=QueryCsvUploadJob.skip_unchanged.field.help_text,
+        widget=forms.CheckboxInput(attrs={"class": "form-check-input"}),
+    )
 
 
 class CsvHeaderMappingForm(forms.Form):
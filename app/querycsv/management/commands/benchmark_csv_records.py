@@ -0,0 +1,72 @@
+"""
+Django command to benchmark cleaning spreadsheet rows before validation
+"""
+
+import time
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from querycsv.services import QueryCsvService
+from utils.helpers import import_from_path
+
+
+class Command(BaseCommand):
+    """
+    Measure rows/sec for ``QueryCsvService.get_records``.
+
+    Builds a dataframe with a column for each writable field of the
+    serializer. Every other cell is empty, and list fields contain
+    comma separated values with empty items. The database is not used.
+    """
+
+    help = "Benchmark normalizing spreadsheet rows into records."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--serializer",
+            default="core.mock.serializers.BusterCsvSerializer",
+            help="Import path of csv serializer to benchmark.",
+        )
+
+    def get_dataframe(self, svc: QueryCsvService, rows: int):
+        data = {}
+
+        for name, field in svc.flat_fields.items():
+            if field.is_readonly:
+                continue
+
+            if (
+                field.is_list_item
+                or name in svc.serializer.writable_many_related_fields
+            ):
+                values = ["one,two,,three", ""]
+            else:
+                values = [f"{name} value", ""]
+
+            data[name] = [values[i % 2] for i in range(rows)]
+
+        return pd.DataFrame(data, dtype=str)
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+
+        Serializer = import_from_path(options["serializer"])
+        svc = QueryCsvService(serializer_class=Serializer)
+
+        rows = options["rows"]
+        df = self.get_dataframe(svc, rows)
+
+        timings = []
+        for _ in range(options["repeat"]):
+            start = time.perf_counter()
+            svc.get_records(df.copy())
+            timings.append(time.perf_counter() - start)
+
+        best = min(timings)
+        self.stdout.write(
+            f"{rows} rows x {len(df.columns)} columns: "
+            f"best {best:.3f}s, {rows / best:,.0f} rows/sec"
+        )
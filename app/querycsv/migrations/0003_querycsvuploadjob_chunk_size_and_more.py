@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("querycsv", "0002_alter_querycsvuploadjob_serializer"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="querycsvuploadjob",
+            name="chunk_size",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Split upload into tasks of this many rows. If empty, the whole file is processed by a single task.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="querycsvuploadjob",
+            name="max_concurrency",
+            field=models.PositiveIntegerField(
+                default=1, help_text="Max number of chunks processed at the same time."
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("querycsv", "0003_querycsvuploadjob_chunk_size_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="querycsvuploadjob",
+            name="row_count",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Number of data rows in the spreadsheet.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="querycsvuploadjob",
+            name="rows_failed",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="querycsvuploadjob",
+            name="rows_processed",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="querycsvuploadjob",
+            name="rows_succeeded",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
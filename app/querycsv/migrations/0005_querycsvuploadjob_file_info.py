@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("querycsv", "0004_querycsvuploadjob_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="querycsvuploadjob",
+            name="file_hash",
+            field=models.CharField(
+                blank=True, help_text="SHA-256 of the file.", max_length=64, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="querycsvuploadjob",
+            name="headers",
+            field=models.JSONField(
+                blank=True,
+                help_text="Column names from the first row of the file.",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:13
+
+from django.db import migrations, models
+import querycsv.serializers
+import utils.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("querycsv", "0005_querycsvuploadjob_file_info"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QueryCsvDownloadJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "serializer",
+                    models.CharField(
+                        max_length=64,
+                        validators=[
+                            utils.models.ValidateImportString(
+                                target_type=querycsv.serializers.CsvModelSerializer
+                            )
+                        ],
+                    ),
+                ),
+                (
+                    "query",
+                    models.TextField(
+                        help_text="Pickled queryset query, base64 encoded."
+                    ),
+                ),
+                (
+                    "file_format",
+                    models.CharField(
+                        choices=[
+                            ("csv", "CSV"),
+                            ("parquet", "Parquet"),
+                            ("arrow", "Arrow IPC"),
+                        ],
+                        default="csv",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processing", "Processing"),
+                            ("failed", "Failed"),
+                            ("success", "Success"),
+                        ],
+                        default="pending",
+                    ),
+                ),
+                (
+                    "notify_email",
+                    models.EmailField(blank=True, max_length=254, null=True),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True, null=True, upload_to="core/querycsv/downloads/"
+                    ),
+                ),
+                ("row_count", models.PositiveIntegerField(blank=True, null=True)),
+                ("rows_processed", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
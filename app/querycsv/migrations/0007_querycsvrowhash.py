@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("querycsv", "0006_querycsvdownloadjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QueryCsvRowHash",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "key",
+                    models.CharField(
+                        help_text="Hash of unique field and value", max_length=64
+                    ),
+                ),
+                ("row_hash", models.CharField(max_length=64)),
+                ("object_id", models.CharField(max_length=64)),
+                ("object_updated_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="querycsvrowhash",
+            constraint=models.UniqueConstraint(
+                fields=("content_type", "key"), name="unique_row_hash_per_model"
+            ),
+        ),
+    ]
@@ -0,0 +1,138 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import querycsv.serializers
+import utils.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("querycsv", "0007_querycsvrowhash"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="querycsvdownloadjob",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="querycsvrowhash",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="querycsvuploadjob",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name="QueryCsvExportProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+                ("name", models.CharField(max_length=64, unique=True)),
+                (
+                    "serializer",
+                    models.CharField(
+                        max_length=64,
+                        validators=[
+                            utils.models.ValidateImportString(
+                                target_type=querycsv.serializers.CsvModelSerializer
+                            )
+                        ],
+                    ),
+                ),
+                (
+                    "file_format",
+                    models.CharField(
+                        choices=[
+                            ("csv", "CSV"),
+                            ("parquet", "Parquet"),
+                            ("arrow", "Arrow IPC"),
+                        ],
+                        default="csv",
+                    ),
+                ),
+                (
+                    "watermark",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Objects changed after this time are included in the next export.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True, null=True, upload_to="core/querycsv/exports/"
+                    ),
+                ),
+                (
+                    "deleted_file",
+                    models.FileField(
+                        blank=True, null=True, upload_to="core/querycsv/exports/"
+                    ),
+                ),
+                ("rows_exported", models.PositiveIntegerField(default=0)),
+                ("rows_deleted", models.PositiveIntegerField(default=0)),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="QueryCsvTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+                ("object_id", models.CharField(max_length=64)),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["content_type", "deleted_at"],
+                        name="querycsv_qu_content_9cb843_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,124 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+import querycsv.serializers
+import utils.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("querycsv", "0008_querycsvexportprofile"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QueryCsvBundleJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+                ("name", models.CharField(max_length=64)),
+                (
+                    "file_format",
+                    models.CharField(
+                        choices=[("xlsx", "Excel workbook"), ("zip", "Zip of CSVs")],
+                        default="xlsx",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("processing", "Processing"),
+                            ("failed", "Failed"),
+                            ("success", "Success"),
+                        ],
+                        default="pending",
+                    ),
+                ),
+                (
+                    "notify_email",
+                    models.EmailField(blank=True, max_length=254, null=True),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True, null=True, upload_to="core/querycsv/bundles/"
+                    ),
+                ),
+                ("row_count", models.PositiveIntegerField(blank=True, null=True)),
+                ("rows_processed", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="QueryCsvBundleSheet",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Name of sheet or csv file.", max_length=31
+                    ),
+                ),
+                (
+                    "serializer",
+                    models.CharField(
+                        max_length=64,
+                        validators=[
+                            utils.models.ValidateImportString(
+                                target_type=querycsv.serializers.CsvModelSerializer
+                            )
+                        ],
+                    ),
+                ),
+                (
+                    "query",
+                    models.TextField(
+                        help_text="Pickled queryset query, base64 encoded."
+                    ),
+                ),
+                ("order", models.PositiveIntegerField(default=0)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sheets",
+                        to="querycsv.querycsvbundlejob",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["order"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="querycsvbundlesheet",
+            constraint=models.UniqueConstraint(
+                fields=("job", "name"), name="unique_sheet_name_per_bundle"
+            ),
+        ),
+    ]
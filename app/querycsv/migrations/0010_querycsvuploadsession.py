@@ -0,0 +1,90 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:48
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import querycsv.serializers
+import utils.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("querycsv", "0009_querycsvbundlejob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QueryCsvUploadSession",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+                (
+                    "serializer",
+                    models.CharField(
+                        max_length=64,
+                        validators=[
+                            utils.models.ValidateImportString(
+                                target_type=querycsv.serializers.CsvModelSerializer
+                            )
+                        ],
+                    ),
+                ),
+                (
+                    "filename",
+                    models.CharField(
+                        max_length=255,
+                        validators=[
+                            django.core.validators.RegexValidator(
+                                "\\.(csv|xls|xlsx)$",
+                                message="File must be a spreadsheet.",
+                            )
+                        ],
+                    ),
+                ),
+                (
+                    "size",
+                    models.PositiveBigIntegerField(
+                        help_text="Size of the file in bytes.",
+                        validators=[django.core.validators.MinValueValidator(1)],
+                    ),
+                ),
+                (
+                    "part_size",
+                    models.PositiveIntegerField(
+                        default=2097152,
+                        help_text="Size of each part in bytes, except the last.",
+                        validators=[django.core.validators.MinValueValidator(1)],
+                    ),
+                ),
+                (
+                    "notify_email",
+                    models.EmailField(blank=True, max_length=254, null=True),
+                ),
+                ("chunk_size", models.PositiveIntegerField(blank=True, null=True)),
+                ("max_concurrency", models.PositiveIntegerField(default=1)),
+                (
+                    "job",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="upload_session",
+                        to="querycsv.querycsvuploadjob",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
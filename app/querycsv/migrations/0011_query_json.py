@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:14
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("querycsv", "0010_querycsvuploadsession"),
+    ]
+
+    operations = [
+        # Pickled queries can't be converted, so they're replaced
+        migrations.RemoveField(
+            model_name="querycsvbundlesheet",
+            name="query",
+        ),
+        migrations.AddField(
+            model_name="querycsvbundlesheet",
+            name="query",
+            field=models.JSONField(
+                default=dict,
+                encoder=django.core.serializers.json.DjangoJSONEncoder,
+                help_text="Model, primary keys, and ordering of the queryset.",
+            ),
+        ),
+        # Pickled queries can't be converted, so they're replaced
+        migrations.RemoveField(
+            model_name="querycsvdownloadjob",
+            name="query",
+        ),
+        migrations.AddField(
+            model_name="querycsvdownloadjob",
+            name="query",
+            field=models.JSONField(
+                default=dict,
+                encoder=django.core.serializers.json.DjangoJSONEncoder,
+                help_text="Model, primary keys, and ordering of the queryset.",
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("querycsv", "0011_query_json"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="querycsvrowhash",
+            name="object_updated_at",
+        ),
+        migrations.AddField(
+            model_name="querycsvrowhash",
+            name="object_hash",
+            field=models.CharField(
+                default="",
+                help_text="Hash of the serialized object after the row was saved",
+                max_length=64,
+            ),
+        ),
+    ]
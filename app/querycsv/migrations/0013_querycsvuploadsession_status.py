@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("querycsv", "0012_querycsvrowhash_object_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="querycsvuploadsession",
+            name="checksum",
+            field=models.CharField(
+                blank=True,
+                help_text="SHA-256 of every part's SHA-256, joined in order.",
+                max_length=64,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="querycsvuploadsession",
+            name="error",
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="querycsvuploadsession",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("failed", "Failed"),
+                    ("success", "Success"),
+                ],
+                default="pending",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:31
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("querycsv", "0013_querycsvuploadsession_status"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="querycsvbundlesheet",
+            name="query",
+            field=models.JSONField(
+                default=dict,
+                encoder=django.core.serializers.json.DjangoJSONEncoder,
+                help_text="Model, and signed query or primary keys of the queryset.",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="querycsvdownloadjob",
+            name="query",
+            field=models.JSONField(
+                default=dict,
+                encoder=django.core.serializers.json.DjangoJSONEncoder,
+                help_text="Model, and signed query or primary keys of the queryset.",
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("querycsv", "0014_query_signed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="querycsvuploadjob",
+            name="skip_unchanged",
+            field=models.BooleanField(
+                default=False,
+                help_text="Skip rows that haven't changed since they were last uploaded, if their objects haven't changed either.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="querycsvuploadsession",
+            name="skip_unchanged",
+            field=models.BooleanField(default=False),
+        ),
+    ]
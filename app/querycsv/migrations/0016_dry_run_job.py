@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("querycsv", "0015_skip_unchanged"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="querycsvuploadjob",
+            name="dry_run",
+            field=models.BooleanField(
+                default=False, help_text="Validate rows without saving them."
+            ),
+        ),
+        migrations.AddField(
+            model_name="querycsvuploadjob",
+            name="dry_run_job",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Last dry run of the file, with the mappings that were validated.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="querycsv.querycsvuploadjob",
+            ),
+        ),
+        migrations.AddField(
+            model_name="querycsvuploadjob",
+            name="failed_preview",
+            field=models.JSONField(
+                blank=True, help_text="First rows that failed validation.", null=True
+            ),
+        ),
+    ]
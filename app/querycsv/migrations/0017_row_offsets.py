@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("querycsv", "0016_dry_run_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="querycsvuploadjob",
+            name="row_offsets",
+            field=models.JSONField(
+                blank=True,
+                help_text="(Data row, position) of the first row of each range, bytes in csv files and sheet rows in xlsx files.",
+                null=True,
+            ),
+        ),
+    ]
@@ -2,20 +2,49 @@
 CSV data logging models.
 """
 
+import base64
+import hashlib
+import math
+import pickle
+import re
+import tempfile
+from datetime import timedelta
 from pathlib import Path
 from typing import ClassVar, Optional, Type, TypedDict
 
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core import signing
+from django.core.exceptions import ValidationError
 from django.core.files import File
-from django.core.validators import FileExtensionValidator
-from django.db import models
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import (
+    FileExtensionValidator,
+    MinValueValidator,
+    RegexValidator,
+)
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
 from core.abstracts.models import ManagerBase, ModelBase
-from lib.spreadsheets import SPREADSHEET_EXTS, read_spreadsheet
-from querycsv.consts import QUERYCSV_MEDIA_SUBDIR
+from lib.spreadsheets import (
+    SPREADSHEET_EXTS,
+    count_spreadsheet_rows,
+    index_spreadsheet_rows,
+    read_spreadsheet,
+    read_spreadsheet_headers,
+)
+from querycsv.consts import (
+    QUERYCSV_EXPORT_WATERMARK_OVERLAP,
+    QUERYCSV_MEDIA_SUBDIR,
+    QUERYCSV_UPLOAD_PART_SIZE,
+)
 from querycsv.serializers import CsvModelSerializer
-from utils.files import get_file_path
+from querycsv.staging import get_staged_path
 from utils.helpers import get_import_path, import_from_path
 from utils.models import UploadFilepathFactory, ValidateImportString
 
@@ -29,6 +58,78 @@ class CsvUploadStatus(models.TextChoices):
     SUCCESS = "success", _("Success")
 
 
+class ExportFormat(models.TextChoices):
+    """File formats that querysets can be exported to."""
+
+    CSV = "csv", _("CSV")
+    PARQUET = "parquet", _("Parquet")
+    ARROW = "arrow", _("Arrow IPC")
+
+
+class BundleFormat(models.TextChoices):
+    """File formats that bundles of querysets can be exported to."""
+
+    XLSX = "xlsx", _("Excel workbook")
+    ZIP = "zip", _("Zip of CSVs")
+
+
+QUERY_SIGNER = signing.Signer(salt="querycsv.query")
+"""Signs pickled queries, so only queries saved by this app are unpickled."""
+
+
+def dump_query(queryset: models.QuerySet, pks: Optional[list] = None) -> dict:
+    """
+    Save a queryset, so it can be rebuilt in a background task.
+
+    The queryset's query is pickled, so its filters are run in the task
+    instead of loading every object in the request. Pickles are signed with
+    the secret key, and are checked before loading. If ``pks`` are given,
+    for a small selection of objects, only they are saved.
+    """
+
+    if pks is not None:
+        ordering = [
+            field for field in queryset.query.order_by if isinstance(field, str)
+        ]
+
+        return {
+            "model": queryset.model._meta.label,
+            "pks": list(pks),
+            "ordering": ordering,
+        }
+
+    pickled = base64.b64encode(pickle.dumps(queryset.query)).decode()
+
+    return {
+        "model": queryset.model._meta.label,
+        "query": QUERY_SIGNER.sign(pickled),
+    }
+
+
+def load_queryset(query: dict) -> models.QuerySet:
+    """
+    Rebuild a queryset from a query saved with ``dump_query``.
+
+    Raises ``BadSignature`` if the query wasn't saved by this app.
+    """
+
+    model = apps.get_model(query["model"])
+
+    if "pks" in query:
+        queryset = model._default_manager.filter(pk__in=query["pks"])
+
+        if len(query["ordering"]) > 0:
+            queryset = queryset.order_by(*query["ordering"])
+
+        return queryset
+
+    pickled = QUERY_SIGNER.unsign(query["query"])
+    queryset = model._default_manager.all()
+    queryset.query = pickle.loads(base64.b64decode(pickled))
+
+    return queryset
+
+
 class FieldMappingType(TypedDict):
     column_name: str
     field_name: str
@@ -90,6 +191,61 @@ class QueryCsvUploadJob(ModelBase):
         blank=True, help_text="Key value pairs, column name => model field"
     )
 
+    # Processing options
+    chunk_size = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Split upload into tasks of this many rows. "
+        "If empty, the whole file is processed by a single task.",
+    )
+    max_concurrency = models.PositiveIntegerField(
+        default=1,
+        help_text="Max number of chunks processed at the same time.",
+    )
+    skip_unchanged = models.BooleanField(
+        default=False,
+        help_text="Skip rows that haven't changed since they were last uploaded, "
+        "if their objects haven't changed either.",
+    )
+    dry_run = models.BooleanField(
+        default=False, help_text="Validate rows without saving them."
+    )
+    dry_run_job = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="Last dry run of the file, with the mappings that were validated.",
+    )
+
+    # Progress
+    row_count = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Number of data rows in the spreadsheet."
+    )
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_succeeded = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+
+    # File info, cached when the job is created
+    headers = models.JSONField(
+        null=True, blank=True, help_text="Column names from the first row of the file."
+    )
+    file_hash = models.CharField(
+        max_length=64, null=True, blank=True, help_text="SHA-256 of the file."
+    )
+    row_offsets = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="(Data row, position) of the first row of each range, "
+        "bytes in csv files and sheet rows in xlsx files.",
+    )
+
+    # Set once a dry run is reported
+    failed_preview = models.JSONField(
+        null=True, blank=True, help_text="First rows that failed validation."
+    )
+
     # Overrides
     objects: ClassVar[QueryCsvUploadJobManager] = QueryCsvUploadJobManager()
 
@@ -102,7 +258,7 @@ class QueryCsvUploadJob(ModelBase):
     # Dynamic properties
     @property
     def filepath(self):
-        return get_file_path(self.file)
+        return get_staged_path(self.file)
 
     @property
     def spreadsheet(self):
@@ -125,13 +281,150 @@ class QueryCsvUploadJob(ModelBase):
         return self.custom_field_mappings["fields"]
 
     @property
-    def csv_headers(self):
-        return list(self.spreadsheet.columns)
+    def progress(self) -> dict:
+        """Summary of how many rows have been committed so far."""
+
+        percent = None
+        if self.row_count:
+            percent = round(min(self.rows_processed / self.row_count, 1) * 100, 2)
+        elif self.row_count == 0 and self.status == CsvUploadStatus.SUCCESS:
+            percent = 100
+
+        return {
+            "id": self.id,
+            "status": self.status,
+            "row_count": self.row_count,
+            "rows_processed": self.rows_processed,
+            "rows_succeeded": self.rows_succeeded,
+            "rows_failed": self.rows_failed,
+            "percent": percent,
+        }
+
+    @property
+    def csv_headers(self) -> list[str]:
+        """Column names of the file, read once and cached on the job."""
+
+        if self.headers is None:
+            self.headers = read_spreadsheet_headers(self.filepath)
+            QueryCsvUploadJob.objects.filter(id=self.id).update(headers=self.headers)
+
+        return list(self.headers)
 
     # Methods
+    def load_file_info(self, commit=True):
+        """
+        Cache headers, row count, and hash of the uploaded file.
+
+        The whole file is read, so this is done when the job is processed
+        instead of when it's created.
+        """
+
+        filepath = self.filepath
+        file_hash = hashlib.sha256()
+
+        with open(filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                file_hash.update(chunk)
+
+        self.file_hash = file_hash.hexdigest()
+        self.headers = read_spreadsheet_headers(filepath)
+        self.row_count = count_spreadsheet_rows(filepath)
+
+        if commit:
+            QueryCsvUploadJob.objects.filter(id=self.id).update(
+                file_hash=self.file_hash, headers=self.headers, row_count=self.row_count
+            )
+
+    def load_row_offsets(self, commit=True):
+        """
+        Cache where each range of ``chunk_size`` rows starts in the file.
+
+        The file is read once, so tasks for each range can read from the
+        start of their range instead of parsing all rows before it.
+        """
+
+        self.row_offsets = index_spreadsheet_rows(self.filepath, self.chunk_size)
+
+        if commit:
+            QueryCsvUploadJob.objects.filter(id=self.id).update(
+                row_offsets=self.row_offsets
+            )
+
+    def get_row_offset(self, start: int) -> Optional[tuple[int, int]]:
+        """Get the last cached (data row, position) at or before a row."""
+
+        row_offset = None
+
+        for row, position in self.row_offsets or []:
+            if row > start:
+                break
+
+            row_offset = (row, position)
+
+        return row_offset
+
+    def add_progress(self, succeeded: int, failed: int):
+        """
+        Atomically add committed rows to the progress counters.
+
+        Chunks of the same job may be processed at the same time,
+        so the counters are incremented in the database.
+        """
+
+        QueryCsvUploadJob.objects.filter(id=self.id).update(
+            rows_processed=models.F("rows_processed") + succeeded + failed,
+            rows_succeeded=models.F("rows_succeeded") + succeeded,
+            rows_failed=models.F("rows_failed") + failed,
+        )
+        self.refresh_from_db(fields=["rows_processed", "rows_succeeded", "rows_failed"])
+
+    def set_status(self, status: CsvUploadStatus):
+        """Update status without overwriting progress from other tasks."""
+
+        self.status = status
+        QueryCsvUploadJob.objects.filter(id=self.id).update(status=status)
+
+    def get_row_ranges(self, row_count: int) -> list[tuple[int, int]]:
+        """Split data rows into (start, stop) ranges of ``chunk_size`` rows."""
+
+        if not self.chunk_size:
+            return [(0, row_count)]
+
+        return [
+            (start, min(start + self.chunk_size, row_count))
+            for start in range(0, row_count, self.chunk_size)
+        ]
+
+    def start_dry_run(self) -> "QueryCsvUploadJob":
+        """
+        Create a job that validates the file with this job's current mappings.
+
+        Rows are validated by the same tasks as uploads, without saving them.
+        The mappings aren't saved to this job, only to the dry run, which
+        replaces the last dry run of this job.
+        """
+
+        dry_run_job = QueryCsvUploadJob.objects.create(
+            serializer_class=self.serializer_class,
+            file=self.file.name,
+            custom_field_mappings=self.custom_field_mappings,
+            chunk_size=self.chunk_size,
+            max_concurrency=self.max_concurrency,
+            dry_run=True,
+            headers=self.headers,
+            row_count=self.row_count,
+            file_hash=self.file_hash,
+            row_offsets=self.row_offsets,
+        )
+
+        self.dry_run_job = dry_run_job
+        QueryCsvUploadJob.objects.filter(id=self.id).update(dry_run_job=dry_run_job)
+
+        return dry_run_job
+
     def add_field_mapping(self, column_name: str, field_name: str, commit=True):
         """Add custom field mapping."""
-        column_options = list(self.spreadsheet.columns)
+        column_options = self.csv_headers
 
         assert (
             column_name in column_options
@@ -143,3 +436,738 @@ class QueryCsvUploadJob(ModelBase):
 
         if commit:
             self.save()
+
+
+class QueryCsvUploadSessionManager(ManagerBase["QueryCsvUploadSession"]):
+    """Model manager for uploads sent in parts."""
+
+    def create(
+        self,
+        serializer_class: Type[serializers.Serializer],
+        filename: str,
+        size: int,
+        notify_email: Optional[str] = None,
+        **kwargs,
+    ) -> "QueryCsvUploadSession":
+        """
+        Create new upload session, parts are sent after.
+        """
+
+        kwargs["serializer"] = get_import_path(serializer_class)
+
+        return super().create(
+            filename=filename, size=size, notify_email=notify_email, **kwargs
+        )
+
+
+class QueryCsvUploadSession(ModelBase):
+    """
+    Upload a spreadsheet in numbered parts, then create an upload job from it.
+
+    Each part is sent in its own request with its SHA-256, and saved to
+    storage once verified. Parts can be sent in any order, or sent again
+    if a request fails, so an interrupted upload resumes with the parts
+    that weren't received. Once all parts are received, they're assembled
+    into one file in a background task, which is verified with the checksum
+    of all parts.
+    """
+
+    validate_import_string = ValidateImportString(target_type=CsvModelSerializer)
+
+    # Primary fields
+    serializer = models.CharField(max_length=64, validators=[validate_import_string])
+    filename = models.CharField(
+        max_length=255,
+        validators=[
+            RegexValidator(
+                r"\.(%s)$" % "|".join(SPREADSHEET_EXTS),
+                message="File must be a spreadsheet.",
+            )
+        ],
+    )
+    size = models.PositiveBigIntegerField(
+        validators=[MinValueValidator(1)], help_text="Size of the file in bytes."
+    )
+    part_size = models.PositiveIntegerField(
+        default=QUERYCSV_UPLOAD_PART_SIZE,
+        validators=[MinValueValidator(1)],
+        help_text="Size of each part in bytes, except the last.",
+    )
+
+    # Options for the upload job
+    notify_email = models.EmailField(null=True, blank=True)
+    chunk_size = models.PositiveIntegerField(null=True, blank=True)
+    max_concurrency = models.PositiveIntegerField(default=1)
+    skip_unchanged = models.BooleanField(default=False)
+
+    # Set once the upload is completed
+    status = models.CharField(
+        choices=CsvUploadStatus.choices, default=CsvUploadStatus.PENDING
+    )
+    checksum = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        help_text=_("SHA-256 of every part's SHA-256, joined in order."),
+    )
+    error = models.TextField(null=True, blank=True)
+
+    # Created once all parts are assembled
+    job = models.OneToOneField(
+        QueryCsvUploadJob,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="upload_session",
+    )
+
+    # Overrides
+    objects: ClassVar[QueryCsvUploadSessionManager] = QueryCsvUploadSessionManager()
+
+    def __str__(self):
+        return self.filename
+
+    # Dynamic properties
+    @property
+    def serializer_class(self) -> Type[CsvModelSerializer]:
+        return import_from_path(self.serializer)
+
+    @property
+    def part_count(self) -> int:
+        return math.ceil(self.size / self.part_size)
+
+    @property
+    def parts_dir(self) -> str:
+        """Storage directory for parts that have been received."""
+
+        return QUERYCSV_MEDIA_SUBDIR + f"parts/{self.id}/"
+
+    @property
+    def received_parts(self) -> list[int]:
+        """Numbers of parts saved to storage, in order."""
+
+        try:
+            _, files = default_storage.listdir(self.parts_dir)
+        except FileNotFoundError:
+            return []
+
+        parts = []
+        for name in files:
+            match = re.fullmatch(r"part-(\d+)", name)
+
+            if match:
+                parts.append(int(match.group(1)))
+
+        return sorted(parts)
+
+    @property
+    def progress(self) -> dict:
+        """Summary of received parts, used by clients to resume an upload."""
+
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "size": self.size,
+            "part_size": self.part_size,
+            "part_count": self.part_count,
+            "received_parts": self.received_parts,
+            "status": self.status,
+            "error": self.error,
+            "job": self.job_id,
+        }
+
+    # Methods
+    def get_part_name(self, number: int) -> str:
+        return self.parts_dir + f"part-{number}"
+
+    def get_part_size(self, number: int) -> int:
+        """Expected size of a part, the last part has the remaining bytes."""
+
+        return min(self.part_size, self.size - number * self.part_size)
+
+    def save_part(self, number: int, content: bytes, checksum: str):
+        """
+        Verify a part, and save it to storage.
+
+        Parameters
+        ----------
+            - number (int): Index of the part, starting at 0.
+            - content (bytes): Contents of the part.
+            - checksum (str): SHA-256 of the part, as hex.
+        """
+
+        if self.status in (CsvUploadStatus.PROCESSING, CsvUploadStatus.SUCCESS):
+            raise ValidationError("Upload is already complete.")
+        elif number < 0 or number >= self.part_count:
+            raise ValidationError(f"Part must be between 0 and {self.part_count - 1}.")
+        elif len(content) != self.get_part_size(number):
+            raise ValidationError(
+                f"Part {number} must be {self.get_part_size(number)} bytes."
+            )
+        elif hashlib.sha256(content).hexdigest() != checksum.lower():
+            raise ValidationError(f"Checksum of part {number} doesn't match.")
+
+        name = self.get_part_name(number)
+
+        # Parts are sent again if a response is lost
+        if default_storage.exists(name):
+            default_storage.delete(name)
+
+        default_storage.save(name, ContentFile(content))
+
+    def delete_parts(self):
+        """Remove saved parts once they are assembled."""
+
+        for number in self.received_parts:
+            default_storage.delete(self.get_part_name(number))
+
+    def complete(self, checksum: str) -> bool:
+        """
+        Mark the upload as complete, once all parts are received.
+
+        ``checksum`` is the SHA-256 of every part's hex SHA-256 joined in
+        order, it's verified when the parts are assembled, see ``assemble``.
+        The session is locked, so completing an upload again, or at the same
+        time, doesn't assemble it twice. Returns whether the parts should be
+        assembled now.
+        """
+
+        with transaction.atomic():
+            session = QueryCsvUploadSession.objects.select_for_update().get(id=self.id)
+
+            if session.status in (CsvUploadStatus.PROCESSING, CsvUploadStatus.SUCCESS):
+                self.refresh_from_db()
+                return False
+
+            missing = sorted(set(range(self.part_count)) - set(self.received_parts))
+
+            if len(missing) > 0:
+                raise ValidationError(f"Missing parts: {', '.join(map(str, missing))}.")
+
+            QueryCsvUploadSession.objects.filter(id=self.id).update(
+                status=CsvUploadStatus.PROCESSING, checksum=checksum.lower(), error=None
+            )
+
+        self.refresh_from_db()
+        return True
+
+    def assemble(self) -> QueryCsvUploadJob:
+        """
+        Assemble received parts into an upload job.
+
+        Parts are appended to the file one at a time, and checked against
+        the checksum sent when the upload was completed. If the file doesn't
+        match, the session fails, and the parts are kept. Assembling an
+        upload again returns the same job. The job is created and linked
+        while the session is locked, so tasks assembling the same session
+        at the same time only create one job.
+        """
+
+        if self.job_id is not None:
+            return self.job
+
+        part_checksums = []
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = Path(tmpdir, Path(self.filename).name)
+
+            with filepath.open(mode="wb") as f:
+                for number in range(self.part_count):
+                    with default_storage.open(self.get_part_name(number), "rb") as part:
+                        content = part.read()
+
+                    part_checksums.append(hashlib.sha256(content).hexdigest())
+                    f.write(content)
+
+            file_checksum = hashlib.sha256("".join(part_checksums).encode())
+
+            if filepath.stat().st_size != self.size:
+                error = f"File must be {self.size} bytes."
+            elif file_checksum.hexdigest() != self.checksum:
+                error = "Checksum of file doesn't match."
+            else:
+                error = None
+
+            if error is not None:
+                self.status = CsvUploadStatus.FAILED
+                self.error = error
+                self.save()
+                raise ValidationError(error)
+
+            with transaction.atomic():
+                session = QueryCsvUploadSession.objects.select_for_update().get(
+                    id=self.id
+                )
+
+                if session.job_id is None:
+                    job = QueryCsvUploadJob.objects.create(
+                        serializer_class=self.serializer_class,
+                        filepath=str(filepath),
+                        notify_email=self.notify_email,
+                        chunk_size=self.chunk_size,
+                        max_concurrency=self.max_concurrency,
+                        skip_unchanged=self.skip_unchanged,
+                    )
+                    QueryCsvUploadSession.objects.filter(id=self.id).update(
+                        job=job, status=CsvUploadStatus.SUCCESS
+                    )
+
+        self.refresh_from_db()
+        self.delete_parts()
+
+        return self.job
+
+
+class QueryCsvDownloadJobManager(ManagerBase["QueryCsvDownloadJob"]):
+    """Model manager for queryset exports."""
+
+    def create(
+        self,
+        serializer_class: Type[serializers.Serializer],
+        queryset: models.QuerySet,
+        file_format: ExportFormat = ExportFormat.CSV,
+        notify_email: Optional[str] = None,
+        pks: Optional[list] = None,
+        **kwargs,
+    ) -> "QueryCsvDownloadJob":
+        """
+        Create new QuerySet Csv Download Job.
+
+        Pass ``pks`` if the queryset is a selection of objects, see ``dump_query``.
+        """
+
+        kwargs["serializer"] = get_import_path(serializer_class)
+        kwargs["query"] = dump_query(queryset, pks=pks)
+
+        return super().create(
+            file_format=file_format, notify_email=notify_email, **kwargs
+        )
+
+
+class QueryCsvDownloadJob(ModelBase):
+    """Used to export a queryset to a file in the background."""
+
+    validate_import_string = ValidateImportString(target_type=CsvModelSerializer)
+
+    # Primary fields
+    serializer = models.CharField(max_length=64, validators=[validate_import_string])
+    query = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text="Model, and signed query or primary keys of the queryset.",
+    )
+    file_format = models.CharField(
+        choices=ExportFormat.choices, default=ExportFormat.CSV
+    )
+
+    # Meta fields
+    status = models.CharField(
+        choices=CsvUploadStatus.choices, default=CsvUploadStatus.PENDING
+    )
+    notify_email = models.EmailField(null=True, blank=True)
+    file = models.FileField(
+        upload_to=QUERYCSV_MEDIA_SUBDIR + "downloads/", null=True, blank=True
+    )
+
+    # Progress
+    row_count = models.PositiveIntegerField(null=True, blank=True)
+    rows_processed = models.PositiveIntegerField(default=0)
+
+    # Overrides
+    objects: ClassVar[QueryCsvDownloadJobManager] = QueryCsvDownloadJobManager()
+
+    # Dynamic properties
+    @property
+    def serializer_class(self) -> Type[CsvModelSerializer]:
+        return import_from_path(self.serializer)
+
+    @property
+    def model_class(self) -> Type[ModelBase]:
+        return self.serializer_class.Meta.model
+
+    @property
+    def queryset(self) -> models.QuerySet:
+        """Rebuild the queryset that was exported."""
+
+        return load_queryset(self.query)
+
+    @property
+    def progress(self) -> dict:
+        """Summary of how many objects have been exported so far."""
+
+        percent = None
+        if self.row_count:
+            percent = round(min(self.rows_processed / self.row_count, 1) * 100, 2)
+        elif self.row_count == 0 and self.status == CsvUploadStatus.SUCCESS:
+            percent = 100
+
+        return {
+            "id": self.id,
+            "status": self.status,
+            "row_count": self.row_count,
+            "rows_processed": self.rows_processed,
+            "percent": percent,
+        }
+
+    # Methods
+    def add_progress(self, count: int):
+        """Atomically add exported objects to the progress counter."""
+
+        QueryCsvDownloadJob.objects.filter(id=self.id).update(
+            rows_processed=models.F("rows_processed") + count
+        )
+        self.refresh_from_db(fields=["rows_processed"])
+
+    def set_status(self, status: CsvUploadStatus):
+        """Update status without overwriting progress."""
+
+        self.status = status
+        QueryCsvDownloadJob.objects.filter(id=self.id).update(status=status)
+
+
+class QueryCsvBundleJobManager(ManagerBase["QueryCsvBundleJob"]):
+    """Model manager for bundle exports."""
+
+    def create(
+        self,
+        sheets: list[tuple[str, Type[serializers.Serializer], models.QuerySet]],
+        file_format: BundleFormat = BundleFormat.XLSX,
+        notify_email: Optional[str] = None,
+        **kwargs,
+    ) -> "QueryCsvBundleJob":
+        """
+        Create new bundle export job, with a sheet for each queryset.
+
+        Parameters
+        ----------
+            - sheets (list): (sheet name, serializer class, queryset) in sheet order.
+            - file_format (BundleFormat): Export to one workbook, or a zip of csvs.
+            - notify_email (str): Where to send a link once the bundle is exported.
+        """
+
+        job = super().create(
+            file_format=file_format, notify_email=notify_email, **kwargs
+        )
+
+        for order, (name, serializer_class, queryset) in enumerate(sheets):
+            QueryCsvBundleSheet.objects.create(
+                job=job,
+                name=name,
+                serializer=get_import_path(serializer_class),
+                query=dump_query(queryset),
+                order=order,
+            )
+
+        return job
+
+
+class QueryCsvBundleJob(ModelBase):
+    """Used to export several querysets to one file in the background."""
+
+    # Primary fields
+    name = models.CharField(max_length=64)
+    file_format = models.CharField(
+        choices=BundleFormat.choices, default=BundleFormat.XLSX
+    )
+
+    # Meta fields
+    status = models.CharField(
+        choices=CsvUploadStatus.choices, default=CsvUploadStatus.PENDING
+    )
+    notify_email = models.EmailField(null=True, blank=True)
+    file = models.FileField(
+        upload_to=QUERYCSV_MEDIA_SUBDIR + "bundles/", null=True, blank=True
+    )
+
+    # Progress
+    row_count = models.PositiveIntegerField(null=True, blank=True)
+    rows_processed = models.PositiveIntegerField(default=0)
+
+    # Overrides
+    objects: ClassVar[QueryCsvBundleJobManager] = QueryCsvBundleJobManager()
+
+    sheets: models.QuerySet["QueryCsvBundleSheet"]
+
+    def __str__(self):
+        return self.name
+
+    # Methods
+    def add_progress(self, count: int):
+        """Atomically add exported objects to the progress counter."""
+
+        QueryCsvBundleJob.objects.filter(id=self.id).update(
+            rows_processed=models.F("rows_processed") + count
+        )
+        self.refresh_from_db(fields=["rows_processed"])
+
+    def set_status(self, status: CsvUploadStatus):
+        """Update status without overwriting progress."""
+
+        self.status = status
+        QueryCsvBundleJob.objects.filter(id=self.id).update(status=status)
+
+
+class QueryCsvBundleSheet(ModelBase):
+    """A queryset exported as one sheet, or csv, of a bundle."""
+
+    validate_import_string = ValidateImportString(target_type=CsvModelSerializer)
+
+    job = models.ForeignKey(
+        QueryCsvBundleJob, on_delete=models.CASCADE, related_name="sheets"
+    )
+    name = models.CharField(max_length=31, help_text=_("Name of sheet or csv file."))
+    serializer = models.CharField(max_length=64, validators=[validate_import_string])
+    query = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text="Model, and signed query or primary keys of the queryset.",
+    )
+    order = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["order"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=("job", "name"), name="unique_sheet_name_per_bundle"
+            )
+        ]
+
+    def __str__(self):
+        return self.name
+
+    # Dynamic properties
+    @property
+    def serializer_class(self) -> Type[CsvModelSerializer]:
+        return import_from_path(self.serializer)
+
+    @property
+    def queryset(self) -> models.QuerySet:
+        """Rebuild the queryset that is exported."""
+
+        return load_queryset(self.query)
+
+
+class QueryCsvRowHashManager(ManagerBase["QueryCsvRowHash"]):
+    """Model manager for row hashes."""
+
+    def get_for_keys(
+        self, content_type: ContentType, keys: list[str]
+    ) -> dict[str, "QueryCsvRowHash"]:
+        """Get saved hashes for unique keys, with one query."""
+
+        query = self.filter(content_type=content_type, key__in=keys)
+        return {row_hash.key: row_hash for row_hash in query}
+
+    def save_hashes(self, content_type: ContentType, hashes: dict[str, tuple]):
+        """
+        Create or replace hashes with one query.
+
+        Parameters
+        ----------
+            - content_type (ContentType): Model the rows were uploaded to.
+            - hashes (dict): Unique key => (row hash, object id, object hash)
+                after the row was saved.
+        """
+
+        objs = [
+            QueryCsvRowHash(
+                content_type=content_type,
+                key=key,
+                row_hash=row_hash,
+                object_id=object_id,
+                object_hash=object_hash,
+            )
+            for key, (row_hash, object_id, object_hash) in hashes.items()
+        ]
+
+        return self.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=["content_type", "key"],
+            update_fields=["row_hash", "object_id", "object_hash", "updated_at"],
+        )
+
+
+class QueryCsvRowHash(ModelBase):
+    """
+    Content hash of the last uploaded row for an object.
+
+    Rows are identified by the model and one of its unique values. If the
+    same row is uploaded again, and the object hasn't changed since, the
+    row can be skipped.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    key = models.CharField(max_length=64, help_text=_("Hash of unique field and value"))
+    row_hash = models.CharField(max_length=64)
+    object_id = models.CharField(max_length=64)
+    object_hash = models.CharField(
+        max_length=64,
+        default="",
+        help_text=_("Hash of the serialized object after the row was saved"),
+    )
+
+    objects: ClassVar[QueryCsvRowHashManager] = QueryCsvRowHashManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("content_type", "key"), name="unique_row_hash_per_model"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type} {self.object_id}"
+
+
+class QueryCsvExportProfileManager(ManagerBase["QueryCsvExportProfile"]):
+    """Model manager for incremental export profiles."""
+
+    def create(
+        self,
+        name: str,
+        serializer_class: Type[serializers.Serializer],
+        file_format: ExportFormat = ExportFormat.CSV,
+        **kwargs,
+    ) -> "QueryCsvExportProfile":
+        """
+        Create new export profile.
+        """
+
+        kwargs["serializer"] = get_import_path(serializer_class)
+
+        return super().create(name=name, file_format=file_format, **kwargs)
+
+
+class QueryCsvExportProfile(ModelBase):
+    """
+    Export objects that changed since the last export, for a consumer.
+
+    Each export includes objects with an ``updated_at`` after the
+    profile's watermark, and a file of objects deleted since. The
+    watermark is moved forward once the files are saved.
+
+    Timestamps are set before a transaction commits, so changes committed
+    after an export started can have times before its watermark. Exports
+    start ``QUERYCSV_EXPORT_WATERMARK_OVERLAP`` seconds before the
+    watermark, so consumers may receive the same objects again.
+    """
+
+    validate_import_string = ValidateImportString(target_type=CsvModelSerializer)
+
+    # Primary fields
+    name = models.CharField(max_length=64, unique=True)
+    serializer = models.CharField(max_length=64, validators=[validate_import_string])
+    content_type = models.ForeignKey(
+        ContentType, on_delete=models.CASCADE, editable=False
+    )
+    file_format = models.CharField(
+        choices=ExportFormat.choices, default=ExportFormat.CSV
+    )
+    watermark = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("Objects changed after this time are included in the next export."),
+    )
+
+    # Last export
+    file = models.FileField(
+        upload_to=QUERYCSV_MEDIA_SUBDIR + "exports/", null=True, blank=True
+    )
+    deleted_file = models.FileField(
+        upload_to=QUERYCSV_MEDIA_SUBDIR + "exports/", null=True, blank=True
+    )
+    rows_exported = models.PositiveIntegerField(default=0)
+    rows_deleted = models.PositiveIntegerField(default=0)
+
+    # Overrides
+    objects: ClassVar[QueryCsvExportProfileManager] = QueryCsvExportProfileManager()
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        self.content_type = ContentType.objects.get_for_model(self.model_class)
+        return super().save(*args, **kwargs)
+
+    # Dynamic properties
+    @property
+    def serializer_class(self) -> Type[CsvModelSerializer]:
+        return import_from_path(self.serializer)
+
+    @property
+    def model_class(self) -> Type[ModelBase]:
+        return self.serializer_class.Meta.model
+
+    @property
+    def export_since(self):
+        """Start of the next export, the watermark minus the overlap window."""
+
+        if self.watermark is None:
+            return None
+
+        return self.watermark - timedelta(seconds=QUERYCSV_EXPORT_WATERMARK_OVERLAP)
+
+    def get_changed_queryset(self, until) -> models.QuerySet:
+        """Objects updated after ``export_since``, up to and including ``until``."""
+
+        queryset = self.model_class.objects.filter(updated_at__lte=until)
+
+        if self.export_since is not None:
+            queryset = queryset.filter(updated_at__gt=self.export_since)
+
+        return queryset.order_by("updated_at", "pk")
+
+    def get_tombstones(self, until) -> models.QuerySet["QueryCsvTombstone"]:
+        """Deletions recorded after ``export_since``, up to and including ``until``."""
+
+        queryset = QueryCsvTombstone.objects.filter(
+            content_type=self.content_type, deleted_at__lte=until
+        )
+
+        if self.export_since is not None:
+            queryset = queryset.filter(deleted_at__gt=self.export_since)
+
+        return queryset.order_by("deleted_at", "pk")
+
+
+class QueryCsvTombstoneManager(ManagerBase["QueryCsvTombstone"]):
+    """Model manager for deleted object records."""
+
+    def prune(self, content_type: ContentType):
+        """
+        Delete tombstones that every export profile for the model has exported,
+        and won't export again in the overlap window.
+        """
+
+        watermarks = QueryCsvExportProfile.objects.filter(
+            content_type=content_type
+        ).values_list("watermark", flat=True)
+
+        if len(watermarks) == 0 or None in watermarks:
+            return
+
+        overlap = timedelta(seconds=QUERYCSV_EXPORT_WATERMARK_OVERLAP)
+        self.filter(
+            content_type=content_type, deleted_at__lte=min(watermarks) - overlap
+        ).delete()
+
+
+class QueryCsvTombstone(ModelBase):
+    """
+    Record of a deleted object, for models with export profiles.
+
+    Lets incremental exports tell consumers which objects were removed.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    objects: ClassVar[QueryCsvTombstoneManager] = QueryCsvTombstoneManager()
+
+    class Meta:
+        indexes = [models.Index(fields=("content_type", "deleted_at"))]
+
+    def __str__(self):
+        return f"{self.content_type} {self.object_id}"
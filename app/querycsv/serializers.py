@@ -1,13 +1,28 @@
+import copy
 import re
 from typing import Optional
 
-from django.db import models
+from django.core import exceptions
+from django.db import IntegrityError, models, transaction
 from rest_framework import serializers
-from rest_framework.fields import empty
+from rest_framework.fields import SkipField, empty, get_error_detail
 from rest_framework.relations import SlugRelatedField
+from rest_framework.serializers import raise_errors_on_nested_writes
+from rest_framework.utils import model_meta
+from rest_framework.validators import BaseUniqueForValidator, UniqueValidator
 
 from core.abstracts.serializers import FieldType, ModelSerializerBase, SerializerBase
 from utils.helpers import str_to_list
+from utils.models import get_auto_now_fields, get_changed_fields, supports_bulk_save
+
+LIST_ITEM_FIELD_RE = re.compile(r"([a-z0-9_-]+)\[(\d+|n)\]\.?(.*)?")
+"""Matches flat list item field names, like ``field[0].sub_field`` or ``field[n]``."""
+
+LIST_ITEM_KEY_RE = re.compile(r"([a-z0-9_-]+)\[([0-9]+)\]\.?(.*)?")
+"""Matches flat list item keys with a numbered index, like ``field[0].sub_field``."""
+
+LIST_INDEX_RE = re.compile(r"\[(\d+|n)\]")
+GENERIC_INDEX_RE = re.compile(r"\[\d+|n\]")
 
 
 class FlatField:
@@ -65,10 +80,10 @@ class FlatListField(FlatField):
         self._set_list_values()
 
     def __eq__(self, value):
-        return value == self.key or re.sub(r"\[(\d+|n)\]", "[n]", value) == self.key
+        return value == self.key or LIST_INDEX_RE.sub("[n]", value) == self.key
 
     def _set_list_values(self):
-        matches = re.match(r"([a-z0-9_-]+)\[(\d+|n)\]\.?(.*)?", self.key)
+        matches = LIST_ITEM_FIELD_RE.match(self.key)
         assert bool(matches), f"Invalid list item field: {self.key}"
 
         parent_field, index, sub_field = list(matches.groups())
@@ -76,7 +91,7 @@ class FlatListField(FlatField):
         self.parent_key = parent_field
         self.index = index if index != "n" else None
         self.sub_key = sub_field if sub_field != "" else None
-        self.generic_key = re.sub(r"\[\d+|n\]", "[n]", self.key)
+        self.generic_key = GENERIC_INDEX_RE.sub("[n]", self.key)
 
     def set_index(self, index: int):
         """Used when index is found later."""
@@ -88,6 +103,189 @@ class FlatListField(FlatField):
             self.key += f".{self.sub_key}"
 
 
+class FlatSchema:
+    """
+    Flat structure of a serializer class, compiled once and reused.
+
+    Building DRF fields is expensive, so the field names, their types,
+    and flat fields are computed when the schema is created. Parsed flat
+    keys are memoized, so converting rows only needs dict lookups.
+    """
+
+    def __init__(self, serializer: "FlatSerializer"):
+        fields = serializer.get_fields()
+
+        self.all_fields = list(fields.keys())
+        self.writable_fields = [
+            key for key, value in fields.items() if value.read_only is False
+        ]
+        self.readonly_fields = [
+            key for key, value in fields.items() if value.read_only is True
+        ]
+        self.required_fields = [
+            key
+            for key, value in serializer.fields.items()
+            if value.required is True and value.read_only is False
+        ]
+
+        if isinstance(serializer, ModelSerializerBase):
+            model_unique_fields = serializer.model_unique_fields
+            self.unique_fields = [
+                key for key in self.all_fields if key in model_unique_fields
+            ]
+        else:
+            self.unique_fields = []
+
+        self.writable_many_related_fields = [
+            key
+            for key, value in fields.items()
+            if isinstance(value, serializers.ManyRelatedField)
+            and (
+                isinstance(value.child_relation, WritableSlugRelatedField)
+                or value.read_only is False
+            )
+        ]
+
+        self._field_types = {
+            key: self._compile_field_types(key) for key in self.all_fields
+        }
+        self._writable_many_related_set = set(self.writable_many_related_fields)
+        self._parsed_keys = {}
+
+        self.flat_fields = self._compile_flat_fields(serializer, fields)
+        self.export_columns = self._compile_export_columns(fields)
+        self._export_paths = [
+            (column, column.split(".")) for column in self.export_columns
+        ]
+
+    def _compile_field_types(self, field_name: str) -> list[FieldType]:
+        field_types = []
+
+        if field_name in self.writable_fields:
+            field_types.append(FieldType.WRITABLE)
+
+        if field_name in self.readonly_fields:
+            field_types.append(FieldType.READONLY)
+
+        if field_name in self.required_fields:
+            field_types.append(FieldType.REQUIRED)
+
+        if field_name in self.unique_fields:
+            field_types.append(FieldType.UNIQUE)
+
+        return field_types
+
+    def _compile_flat_fields(self, serializer: "FlatSerializer", fields: dict):
+        flat_fields = {}
+
+        for key, value in fields.items():
+            if not isinstance(value, serializers.BaseSerializer):
+
+                field = FlatField(key, value, self.get_field_types(key))
+                flat_fields[key] = field
+                continue
+
+            field_name = key
+            many = isinstance(value, serializers.ListSerializer)
+
+            if many:
+                field_name += "[n]."
+            else:
+                field_name += "."
+
+            sub_serializer = value.child if many else value
+            sub_fields = sub_serializer.get_fields()
+
+            for sub_field in sub_fields:
+                nested_field_name = field_name + sub_field
+                field_cls = FlatField if not many else FlatListField
+
+                field = field_cls(
+                    nested_field_name,
+                    sub_fields[sub_field],
+                    serializer.get_field_types(sub_field, serializer=sub_serializer),
+                )
+
+                flat_fields[key] = field
+
+        return flat_fields
+
+    def _compile_export_columns(self, fields: dict, prefix="") -> list[str]:
+        """Columns of exported rows, fields of nested objects use dot notation."""
+
+        columns = []
+
+        for key, value in fields.items():
+            if value.write_only:
+                continue
+            elif isinstance(value, serializers.Serializer):
+                columns.extend(
+                    self._compile_export_columns(
+                        value.get_fields(), prefix=f"{prefix}{key}."
+                    )
+                )
+            else:
+                columns.append(f"{prefix}{key}")
+
+        return columns
+
+    def to_export_row(self, data: dict) -> dict:
+        """
+        Flatten a representation into the export columns.
+
+        Every row has the same columns, so a nested object that is missing
+        in one row leaves its columns empty. Lists are joined like
+        ``json_to_flat``.
+        """
+
+        row = {}
+
+        for column, path in self._export_paths:
+            value = data
+
+            for key in path:
+                value = value.get(key, None) if isinstance(value, dict) else None
+
+            if isinstance(value, list):
+                value = ", ".join([str(v) for v in value])
+
+            row[column] = value
+
+        return row
+
+    def get_field_types(self, field_name: str) -> list[FieldType]:
+        """Get ``FieldType`` for a top level field."""
+
+        return list(self._field_types.get(field_name, []))
+
+    def is_many_related(self, key: str) -> bool:
+        """Whether a key is a writable many related field."""
+
+        return key in self._writable_many_related_set
+
+    def parse_key(self, key: str) -> tuple[str, Optional[int], str]:
+        """
+        Split a flat key into ``(field, index, nested_field)``.
+
+        Index is None if the key is not a list item.
+        """
+
+        parsed = self._parsed_keys.get(key, None)
+
+        if parsed is None:
+            matches = LIST_ITEM_KEY_RE.match(key)
+
+            if matches:
+                field, index, nested_field = matches.groups()
+                parsed = (field, int(index), nested_field)
+            else:
+                parsed = (key, None, "")
+
+            self._parsed_keys[key] = parsed
+
+        return parsed
+
+
 class FlatSerializer(SerializerBase):
     """Convert between json data and flattened data."""
 
@@ -103,22 +301,45 @@ class FlatSerializer(SerializerBase):
     # == Serializer Functions == #
     ##############################
 
+    @classmethod
+    def get_schema(cls) -> FlatSchema:
+        """Get compiled flat schema for this serializer class, built on first use."""
+
+        schema = cls.__dict__.get("_flat_schema", None)
+
+        if schema is None:
+            schema = FlatSchema(cls())
+            cls._flat_schema = schema
+
+        return schema
+
+    @property
+    def all_fields(self) -> list[str]:
+        return list(self.get_schema().all_fields)
+
+    @property
+    def writable_fields(self) -> list[str]:
+        return list(self.get_schema().writable_fields)
+
+    @property
+    def readonly_fields(self) -> list[str]:
+        return list(self.get_schema().readonly_fields)
+
+    @property
+    def required_fields(self) -> list[str]:
+        return list(self.get_schema().required_fields)
+
     @property
     def writable_many_related_fields(self):
         """List of fields that are WritableRelated, and have many=True"""
 
-        return [
-            key
-            for key, value in self.get_fields().items()
-            if (
-                isinstance(value, serializers.ManyRelatedField)
-                and isinstance(value.child_relation, WritableSlugRelatedField)
-            )
-            or (
-                isinstance(value, serializers.ManyRelatedField)
-                and value.read_only is False
-            )
-        ]
+        return list(self.get_schema().writable_many_related_fields)
+
+    def get_field_types(self, field_name: str, serializer=None) -> list[FieldType]:
+        if serializer is not None and serializer is not self:
+            return super().get_field_types(field_name, serializer=serializer)
+
+        return self.get_schema().get_field_types(field_name)
 
     @property
     def flat_data(self):
@@ -128,16 +349,26 @@ class FlatSerializer(SerializerBase):
         return self.json_to_flat(data)
 
     @classmethod
-    def json_to_flat(cls, data: dict):
-        """Convert representation to flattened struction for CSV."""
+    def json_to_flat(cls, data: dict, prefix=""):
+        """
+        Convert representation to flattened struction for CSV.
+
+        Nested objects are flattened using dot notation, matching the
+        columns produced by ``pd.json_normalize``.
+        """
+
+        flat = {}
 
-        # TODO: Handle nested json to flat
         for key, value in data.items():
-            # Convert lists to string
-            if isinstance(value, list):
-                data[key] = ", ".join([str(v) for v in value])
+            if isinstance(value, dict):
+                flat.update(cls.json_to_flat(value, prefix=f"{prefix}{key}."))
+            elif isinstance(value, list):
+                # Convert lists to string
+                flat[f"{prefix}{key}"] = ", ".join([str(v) for v in value])
+            else:
+                flat[f"{prefix}{key}"] = value
 
-        return data
+        return flat
 
     @classmethod
     def flat_to_json(cls, record: dict) -> dict:
@@ -154,17 +385,15 @@ class FlatSerializer(SerializerBase):
         """
 
         parsed = {}
+        schema = cls.get_schema()
 
         # Initial parsing
         for key, value in record.items():
-            list_objs_res = re.match(r"([a-z0-9_-]+)\[([0-9]+)\]\.?(.*)?", key)
+            field, index, nested_field = schema.parse_key(key)
 
-            if bool(list_objs_res):
+            if index is not None:
                 # Handle list of objects
-                field, index, nested_field = list_objs_res.groups()
-                index = int(index)
-
-                if field not in parsed.keys():
+                if field not in parsed:
                     parsed[field] = []
 
                 assert isinstance(
@@ -178,12 +407,10 @@ class FlatSerializer(SerializerBase):
 
                 # TODO: Recurse for deeply nested objects
                 parsed[field][index][nested_field] = value
-            elif key in cls().writable_many_related_fields and isinstance(value, str):
+            elif schema.is_many_related(key) and isinstance(value, str):
                 # Handle list of literals
                 parsed[key] = str_to_list(value)
-            elif key in cls().writable_many_related_fields and not isinstance(
-                value, list
-            ):
+            elif schema.is_many_related(key) and not isinstance(value, list):
                 parsed[key] = [value]
             else:
                 # Handle objects
@@ -210,71 +437,90 @@ class FlatSerializer(SerializerBase):
     def get_flat_fields(self) -> dict[str, FlatField | FlatListField]:
         """Like ``get_fields``, returns a dict of fields with their flat type."""
 
-        flat_fields = {}
+        # Copy fields since list fields can be updated with an index
+        return {
+            key: copy.copy(field)
+            for key, field in self.get_schema().flat_fields.items()
+        }
 
-        for key, value in self.get_fields().items():
-            if not isinstance(value, serializers.BaseSerializer):
 
-                field = FlatField(key, value, self.get_field_types(key))
-                flat_fields[key] = field
-                continue
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field that reads objects from the upload's ``SlugLookupCache``.
 
-            field_name = key
+    Used for related fields of csv serializers, so rows that refer to the
+    same object don't fetch it again. Works like ``PrimaryKeyRelatedField``
+    when the serializer isn't given a cache.
+    """
 
-            if value.many:
-                field_name += "[n]."
-            else:
-                field_name += "."
+    def to_internal_value(self, data):
+        lookup_cache: Optional[SlugLookupCache] = self.context.get(
+            SlugLookupCache.context_key, None
+        )
 
-            sub_serializer = value.child
+        if lookup_cache is None or self.pk_field is not None:
+            return super().to_internal_value(data)
 
-            for sub_field in sub_serializer.get_fields():
-                nested_field_name = field_name + sub_field
-                field_cls = FlatField if not value.many else FlatListField
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
 
-                field = field_cls(
-                    nested_field_name,
-                    sub_serializer.get_fields()[sub_field],
-                    self.get_field_types(sub_field, serializer=sub_serializer),
-                )
+        try:
+            obj = lookup_cache.get_by_pk(self.get_queryset(), data)
+        except (TypeError, ValueError, exceptions.ValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
 
-                flat_fields[key] = field
+        if obj is None:
+            self.fail("does_not_exist", pk_value=data)
 
-        return flat_fields
+        return obj
 
 
 class CsvModelSerializer(FlatSerializer, ModelSerializerBase):
     """Convert fields to csv columns."""
 
-    def __init__(self, instance=None, data=empty, **kwargs):
-        """Override default functionality to implement update or create."""
+    export_related_fields: tuple[str, ...] = ()
+    """Extra relations to load when exporting, for fields read through model properties."""
+
+    serializer_related_field = CachedPrimaryKeyRelatedField
+
+    def __init__(
+        self,
+        instance=None,
+        data=empty,
+        resolve_instance=True,
+        prevalidated: Optional[dict] = None,
+        **kwargs,
+    ):
+        """
+        Override default functionality to implement update or create.
+
+        Parameters
+        ----------
+            - resolve_instance (bool): Search for an existing object using the
+                unique fields in data. Disable if the instance was already resolved.
+            - prevalidated (dict): Field name => value already validated by
+                ``prevalidate_records``, these fields aren't validated again.
+        """
+
+        self.prevalidated = prevalidated or {}
 
         # Skip if data is empty
         if data is None:
             return super().__init__(instance=instance, **kwargs)
 
-        # Coerce Slug Many Related Field to a list before processing
-        # TODO: This should be handled entirely by flat_to_json
-        try:
-            fields = [
-                field
-                for field in self.writable_many_related_fields
-                if field in data.keys()
-            ]
-
-            for field in fields:
-                if isinstance(data[field], str):
-                    data[field] = str_to_list(data[field])
-
-        except Exception:
-            pass
+        self.coerce_many_related(data)
 
         # Initialize rest of serializer first, needed if data is flat
         super().__init__(data=data, **kwargs)
 
         # Allow create_or_udpate functionality
         try:
-            if instance is None and data is not None and data is not empty:
+            if (
+                resolve_instance
+                and instance is None
+                and data is not None
+                and data is not empty
+            ):
                 ModelClass = self.model_class
                 search_fields = {}
                 search_query = None
@@ -306,6 +552,151 @@ class CsvModelSerializer(FlatSerializer, ModelSerializerBase):
 
         self.instance = instance
 
+    @classmethod
+    def coerce_many_related(cls, data):
+        """Convert comma separated values for many related fields to lists."""
+
+        # TODO: This should be handled entirely by flat_to_json
+        if not isinstance(data, dict):
+            return
+
+        schema = cls.get_schema()
+
+        for field, value in data.items():
+            if schema.is_many_related(field) and isinstance(value, str):
+                data[field] = str_to_list(value)
+
+    @staticmethod
+    def is_local_field(field: serializers.Field) -> bool:
+        """Whether a field can be validated without the database."""
+
+        if field.read_only or isinstance(
+            field,
+            (
+                serializers.RelatedField,
+                serializers.ManyRelatedField,
+                serializers.BaseSerializer,
+            ),
+        ):
+            return False
+
+        return not any(
+            isinstance(validator, (UniqueValidator, BaseUniqueForValidator))
+            for validator in field.validators
+        )
+
+    @classmethod
+    def prevalidate_records(cls, records: list[dict]) -> list[tuple[dict, dict, dict]]:
+        """
+        Convert flat records to json, and validate fields that don't use the database.
+
+        Used to validate rows in worker processes, so only picklable values
+        are returned. Returns (data, validated values, errors) for each record,
+        pass data and validated values to a new serializer with
+        ``CsvModelSerializer(data=data, prevalidated=values)``.
+        """
+
+        fields = [field for field in cls().fields.values() if cls.is_local_field(field)]
+        results = []
+
+        for record in records:
+            record = {**record}
+            cls.coerce_many_related(record)
+            data = cls.flat_to_json(record)
+            validated = {}
+            errors = {}
+
+            for field in fields:
+                try:
+                    validated[field.field_name] = field.run_validation(
+                        field.get_value(data)
+                    )
+                except serializers.ValidationError as e:
+                    errors[field.field_name] = e.detail
+                except exceptions.ValidationError as e:
+                    errors[field.field_name] = get_error_detail(e)
+                except SkipField:
+                    continue
+
+            results.append((data, validated, errors))
+
+        return results
+
+    def to_internal_value(self, data):
+        """Like ``Serializer.to_internal_value``, but uses prevalidated values."""
+
+        if not self.prevalidated:
+            return super().to_internal_value(data)
+
+        ret = {}
+        errors = {}
+
+        for field in self._writable_fields:
+            validate_method = getattr(self, "validate_" + field.field_name, None)
+
+            try:
+                if field.field_name in self.prevalidated:
+                    validated_value = self.prevalidated[field.field_name]
+                else:
+                    validated_value = field.run_validation(field.get_value(data))
+
+                if validate_method is not None:
+                    validated_value = validate_method(validated_value)
+            except serializers.ValidationError as e:
+                errors[field.field_name] = e.detail
+            except exceptions.ValidationError as e:
+                errors[field.field_name] = get_error_detail(e)
+            except SkipField:
+                pass
+            else:
+                self.set_value(ret, field.source_attrs, validated_value)
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return ret
+
+    @property
+    def unique_fields(self) -> list[str]:
+        return list(self.get_schema().unique_fields)
+
+    def update(self, instance, validated_data):
+        """
+        Like ``ModelSerializer.update``, but only saves fields that changed.
+
+        If no fields changed, the object isn't saved, so rows that are
+        uploaded again don't change ``updated_at``.
+        """
+
+        raise_errors_on_nested_writes("update", self, validated_data)
+        info = model_meta.get_field_info(instance)
+        before = copy.copy(instance)
+        m2m_fields = []
+
+        for attr, value in validated_data.items():
+            if attr in info.relations and info.relations[attr].to_many:
+                m2m_fields.append((attr, value))
+            else:
+                setattr(instance, attr, value)
+
+        update_fields = get_changed_fields(
+            before,
+            instance,
+            [attr for attr in validated_data.keys() if attr not in dict(m2m_fields)],
+        )
+
+        if update_fields is None:
+            instance.save()
+        elif len(update_fields) > 0:
+            update_fields += get_auto_now_fields(type(instance))
+            instance.save(update_fields=update_fields)
+
+        for attr, value in m2m_fields:
+            field = getattr(instance, attr)
+            field.set(value)
+
+        return instance
+
 
 class WritableSlugRelatedField(SlugRelatedField):
     """
@@ -323,11 +714,244 @@ class WritableSlugRelatedField(SlugRelatedField):
     def to_internal_value(self, data):
         """Overrides default behavior to create if not found."""
         queryset = self.get_queryset()
+        lookup_cache: Optional[SlugLookupCache] = self.context.get(
+            SlugLookupCache.context_key, None
+        )
 
         try:
+            if lookup_cache is not None:
+                return lookup_cache.get_or_create(self, data)
+
             obj, _ = queryset.get_or_create(
                 **{self.slug_field: data}, **self.extra_kwargs
             )
             return obj
         except (TypeError, ValueError) as e:
             print(e)
+
+
+class SlugLookupCache:
+    """
+    Resolve objects for ``WritableSlugRelatedField`` values during an upload.
+
+    Objects are stored by scope, which is the field's model, slug field,
+    extra kwargs, and queryset filters. Call ``preload`` with the
+    serializers for a set of rows before validating them; each scope's
+    values are fetched with one query, and missing objects are created
+    once. Rows are then served from memory.
+
+    If ``read_only`` is set, missing objects are not created. Unsaved
+    objects are used instead, so rows can be validated without writing.
+
+    Pass to serializers with ``context={SlugLookupCache.context_key: cache}``.
+    """
+
+    context_key = "slug_lookup_cache"
+
+    def __init__(self, read_only=False):
+        self.read_only = read_only
+        self._objects: dict[tuple, dict[str, models.Model]] = {}
+
+    def get_scope(self, field: WritableSlugRelatedField) -> tuple:
+        queryset = field.get_queryset()
+        extra_kwargs = tuple(
+            sorted(
+                (key, value.pk if isinstance(value, models.Model) else value)
+                for key, value in field.extra_kwargs.items()
+            )
+        )
+
+        return (
+            queryset.model._meta.label,
+            field.slug_field,
+            extra_kwargs,
+            str(queryset.query.where),
+        )
+
+    def get_or_create(self, field: WritableSlugRelatedField, data):
+        """Get object for a value, falls back to a query if it wasn't preloaded."""
+
+        objects = self._objects.setdefault(self.get_scope(field), {})
+        obj = objects.get(str(data), None)
+
+        if obj is None and self.read_only:
+            queryset = field.get_queryset()
+            obj = queryset.filter(**{field.slug_field: data}).first()
+
+            if obj is None:
+                obj = queryset.model(**{field.slug_field: data}, **field.extra_kwargs)
+
+            objects[str(data)] = obj
+        elif obj is None:
+            obj, _ = field.get_queryset().get_or_create(
+                **{field.slug_field: data}, **field.extra_kwargs
+            )
+            objects[str(data)] = obj
+
+        return obj
+
+    def get_pk_scope(self, queryset: models.QuerySet) -> tuple:
+        return ("pk", queryset.model._meta.label, str(queryset.query.where))
+
+    def get_by_pk(self, queryset: models.QuerySet, value) -> Optional[models.Model]:
+        """Get object by primary key, falls back to a query if it wasn't preloaded."""
+
+        objects = self._objects.setdefault(self.get_pk_scope(queryset), {})
+
+        if str(value) not in objects:
+            pk = queryset.model._meta.pk.to_python(value)
+            objects[str(value)] = queryset.filter(pk=pk).first()
+
+        return objects[str(value)]
+
+    def preload(self, row_serializers: list[serializers.Serializer]):
+        """
+        Fetch or create objects for all slug values used by the serializers.
+
+        Objects for primary key fields are fetched the same way, but
+        are never created.
+        """
+
+        scopes = {}
+        pk_scopes = {}
+
+        for serializer in row_serializers:
+            data = getattr(serializer, "initial_data", None)
+
+            if not isinstance(data, dict):
+                continue
+
+            for field_name, field in serializer.fields.items():
+                if field.read_only or field_name not in data:
+                    continue
+
+                values = data[field_name]
+
+                if isinstance(field, serializers.ManyRelatedField):
+                    field = field.child_relation
+                    values = values if isinstance(values, list) else [values]
+                else:
+                    values = [values]
+
+                if isinstance(field, CachedPrimaryKeyRelatedField):
+                    queryset = field.get_queryset()
+                    _, scope_values = pk_scopes.setdefault(
+                        self.get_pk_scope(queryset), (queryset, set())
+                    )
+                    scope_values.update(
+                        str(value) for value in values if value not in (None, "")
+                    )
+                    continue
+                elif not isinstance(field, WritableSlugRelatedField):
+                    continue
+
+                scope = self.get_scope(field)
+                _, scope_values = scopes.setdefault(scope, (field, set()))
+                scope_values.update(
+                    str(value) for value in values if value not in (None, "")
+                )
+
+        for scope, (field, values) in scopes.items():
+            objects = self._objects.setdefault(scope, {})
+            missing = [value for value in values if value not in objects]
+
+            if len(missing) > 0:
+                objects.update(self._load(field, missing))
+
+        for scope, (queryset, values) in pk_scopes.items():
+            objects = self._objects.setdefault(scope, {})
+            pks = {}
+
+            for value in values:
+                if value in objects:
+                    continue
+
+                try:
+                    pks[value] = queryset.model._meta.pk.to_python(value)
+                except exceptions.ValidationError:
+                    # Left for the row to fail validation
+                    continue
+
+            if len(pks) == 0:
+                continue
+
+            found = {obj.pk: obj for obj in queryset.filter(pk__in=pks.values())}
+            objects.update({value: found.get(pk, None) for value, pk in pks.items()})
+
+    def _clean_values(self, field: WritableSlugRelatedField, values: list[str]):
+        model_field = field.get_queryset().model._meta.get_field(field.slug_field)
+        cleaned = {}
+
+        for value in values:
+            try:
+                cleaned[value] = model_field.to_python(value)
+            except exceptions.ValidationError:
+                # Left for the row to fail validation
+                continue
+
+        return cleaned
+
+    def _load(self, field: WritableSlugRelatedField, values: list[str]):
+        """Get objects for values, creating the ones that don't exist."""
+
+        if "__" in field.slug_field:
+            return {}
+
+        queryset = field.get_queryset()
+        model = queryset.model
+        cleaned = self._clean_values(field, values)
+
+        def fetch(lookup_values):
+            return {
+                str(getattr(obj, field.slug_field)): obj
+                for obj in queryset.filter(**{f"{field.slug_field}__in": lookup_values})
+            }
+
+        objects = fetch(list(cleaned.values()))
+        missing = [value for value in cleaned.keys() if value not in objects]
+
+        if len(missing) == 0:
+            return objects
+
+        if self.read_only:
+            for value in missing:
+                objects[value] = model(
+                    **{field.slug_field: cleaned[value]}, **field.extra_kwargs
+                )
+
+            return objects
+
+        if not supports_bulk_save(model):
+            # Values were fetched above, so objects are created without a lookup
+            for value in missing:
+                kwargs = {field.slug_field: cleaned[value], **field.extra_kwargs}
+
+                try:
+                    with transaction.atomic():
+                        objects[value] = queryset.create(**kwargs)
+                except IntegrityError:
+                    # Created by another worker
+                    objects[value] = queryset.filter(**kwargs).first()
+                except exceptions.ValidationError:
+                    # Left for the row to create, and report the error
+                    continue
+
+            return objects
+
+        new_objects = []
+        for value in missing:
+            obj = model(**{field.slug_field: cleaned[value]}, **field.extra_kwargs)
+
+            try:
+                obj.full_clean(validate_unique=False, validate_constraints=False)
+            except exceptions.ValidationError:
+                # Left for the row to create, and report the error
+                continue
+
+            new_objects.append(obj)
+
+        # Other workers may create the same objects, so conflicts are fetched after
+        model._default_manager.bulk_create(new_objects, ignore_conflicts=True)
+        objects.update(fetch([cleaned[value] for value in missing]))
+
+        return objects
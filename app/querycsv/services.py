@@ -1,16 +1,83 @@
+import copy
+import csv
+import functools
+import hashlib
+import io
+import json
+import logging
+import math
+import multiprocessing
 import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from enum import Enum
-from typing import Literal, Optional, OrderedDict, Type, TypedDict
+from itertools import chain, islice
+from typing import (
+    BinaryIO,
+    Callable,
+    Iterator,
+    Literal,
+    Optional,
+    OrderedDict,
+    Type,
+    TypedDict,
+)
 
+import django
+import numpy as np
 import pandas as pd
-from django.db import models
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from django.contrib.contenttypes.models import ContentType
+from django.core import exceptions
+from django.core.exceptions import EmptyResultSet
+from django.db import DatabaseError, models, transaction
+from django.utils import timezone
+from rest_framework.fields import (
+    BooleanField,
+    DateField,
+    DateTimeField,
+    FloatField,
+    IntegerField,
+)
+from rest_framework.relations import RelatedField
+from rest_framework.serializers import (
+    BaseSerializer,
+    ListSerializer,
+    raise_errors_on_nested_writes,
+)
+from rest_framework.utils import model_meta
+from rest_framework.validators import UniqueValidator
 
 from core.abstracts.serializers import ModelSerializerBase
-from lib.spreadsheets import read_spreadsheet
-from querycsv.consts import QUERYCSV_MEDIA_SUBDIR
-from querycsv.models import QueryCsvUploadJob
-from querycsv.serializers import CsvModelSerializer
+from lib.spreadsheets import (
+    SPREADSHEET_CHUNK_SIZE,
+    read_spreadsheet_chunks,
+    write_xlsx_stream,
+)
+from querycsv.caching import export_cache
+from querycsv.consts import (
+    QUERYCSV_BULK_BATCH_SIZE,
+    QUERYCSV_COMMIT_EVERY,
+    QUERYCSV_EXPORT_CHUNK_SIZE,
+    QUERYCSV_MEDIA_SUBDIR,
+    QUERYCSV_TEMPLATE_CACHE_SIZE,
+)
+from querycsv.models import (
+    BundleFormat,
+    ExportFormat,
+    QueryCsvRowHash,
+    QueryCsvUploadJob,
+)
+from querycsv.serializers import CsvModelSerializer, SlugLookupCache
 from utils.files import get_media_path
+from utils.helpers import get_import_path, import_from_path
+from utils.models import get_auto_now_fields, get_changed_fields, supports_bulk_save
+
+SHEET_NAME_INVALID_RE = re.compile(r"[\[\]:*?/\\]")
+"""Characters removed from bundle sheet names, not allowed in xlsx sheet names or paths."""
 
 
 class FieldMappingType(TypedDict):
@@ -18,6 +85,56 @@ class FieldMappingType(TypedDict):
     field_name: str
 
 
+class _EchoBuffer:
+    """File-like object that returns written values instead of storing them."""
+
+    def write(self, value: str):
+        return value
+
+
+def _get_validation_pool(processes: Optional[int]) -> Optional[ProcessPoolExecutor]:
+    """
+    Start worker processes for validating rows, if more than one is requested.
+
+    Workers are spawned instead of forked, so they don't share database
+    connections with this process, and set up Django before importing
+    this module. Daemonic processes, like Celery's prefork workers, can't
+    start child processes, so rows are validated in this process instead.
+    """
+
+    if processes is None or processes <= 1:
+        return None
+
+    if multiprocessing.current_process().daemon:
+        logging.warning(
+            "Rows are validated in one process, "
+            "since daemonic processes can't start worker processes."
+        )
+        return None
+
+    return ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=django.setup,
+    )
+
+
+def _prevalidate_records(serializer_path: str, records: list[dict]):
+    """Validate records in a worker process, see ``CsvModelSerializer.prevalidate_records``."""
+
+    Serializer = import_from_path(serializer_path)
+    return Serializer.prevalidate_records(records)
+
+
+@functools.lru_cache(maxsize=QUERYCSV_TEMPLATE_CACHE_SIZE)
+def _build_csv_template(columns: tuple[str, ...]) -> tuple[bytes, str]:
+    """Create csv template with a header row, and its ETag."""
+
+    content = pd.DataFrame([], columns=list(columns)).to_csv(index=False).encode()
+
+    return content, hashlib.sha256(content).hexdigest()[:32]
+
+
 class QueryCsvService:
     """Handle uploads and downloads of models using csvs."""
 
@@ -28,7 +145,8 @@ class QueryCsvService:
     def __init__(self, serializer_class: Type[CsvModelSerializer]):
         self.serializer_class = serializer_class
         self.serializer = serializer_class()
-        self.model_name = self.serializer.model_class.__name__
+        self.model_class = self.serializer.model_class
+        self.model_name = self.model_class.__name__
 
         self.fields: OrderedDict = self.serializer.get_fields()
         self.readonly_fields = self.serializer.readonly_fields
@@ -48,7 +166,18 @@ class QueryCsvService:
         assert job.serializer is not None, "Upload job must container serializer."
 
         svc = cls(serializer_class=job.serializer_class)
-        return svc.upload_csv(job.file, custom_field_maps=job.custom_fields)
+        return svc.upload_csv(job.filepath, custom_field_maps=job.custom_fields)
+
+    @classmethod
+    def upload_chunks_from_job(cls, job: QueryCsvUploadJob, **kwargs):
+        """Upload csv using predefined job, yield results for each chunk of rows."""
+
+        assert job.serializer is not None, "Upload job must container serializer."
+
+        svc = cls(serializer_class=job.serializer_class)
+        return svc.upload_csv_chunks(
+            job.filepath, custom_field_maps=job.custom_fields, **kwargs
+        )
 
     @classmethod
     def queryset_to_csv(
@@ -59,151 +188,1657 @@ class QueryCsvService:
         service = cls(serializer_class=serializer_class)
         return service.download_csv(queryset)
 
-    def download_csv(self, queryset: models.QuerySet) -> str:
-        """Download: Convert queryset to csv, return path to csv."""
+    def _add_related_path(
+        self,
+        model: Type[models.Model],
+        attrs: list[str],
+        prefix: list[str],
+        many: bool,
+        plan: dict[str, bool],
+    ):
+        """
+        Follow attributes through a model, and add each relation to the plan.
+
+        Returns the path, model, and many-ness of the last relation followed,
+        stopping at the first attribute that isn't a relation.
+        """
+
+        path = list(prefix)
+
+        for attr in attrs:
+            try:
+                model_field = model._meta.get_field(attr)
+            except exceptions.FieldDoesNotExist:
+                break
 
-        data = self.serializer_class(queryset, many=True).data
-        flattened = [self.serializer_class.json_to_flat(obj) for obj in data]
+            if not model_field.is_relation or model_field.related_model is None:
+                break
+
+            path.append(attr)
+            model = model_field.related_model
+            many = many or model_field.many_to_many or model_field.one_to_many
+            plan["__".join(path)] = many
+
+        return path, model, many
+
+    def _plan_related_fields(
+        self,
+        serializer: BaseSerializer,
+        model: Type[models.Model],
+        prefix: list[str],
+        many: bool,
+        plan: dict[str, bool],
+    ):
+        """Add relations read by a serializer's fields to the plan, see ``get_export_plan``."""
+
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+
+            if isinstance(field, ListSerializer):
+                field = field.child
+
+            attrs = field.source_attrs
+
+            if isinstance(field, RelatedField) and field.use_pk_only_optimization():
+                # Only reads foreign key value from the object
+                attrs = attrs[:-1]
+
+            path, related_model, related_many = self._add_related_path(
+                model, attrs, prefix, many, plan
+            )
+
+            followed_all = len(path) - len(prefix) == len(attrs)
+
+            if isinstance(field, BaseSerializer) and followed_all:
+                self._plan_related_fields(
+                    field, related_model, path, related_many, plan
+                )
+
+    def get_export_plan(
+        self, serializer: Optional[BaseSerializer] = None
+    ) -> tuple[list[str], list[str]]:
+        """
+        Get relations to load with select_related and prefetch_related when exporting.
+
+        Follows the source of each readable field through the model, including
+        nested serializers and related fields. Single relations are joined, and
+        relations after a many relation are prefetched. Relations read through
+        model properties can be added with the serializer's ``export_related_fields``.
+        If given, only relations read by ``serializer``'s fields are planned.
+        """
+
+        plan = {}
+        self._plan_related_fields(
+            serializer or self.serializer, self.model_class, [], False, plan
+        )
+
+        for related_path in self.serializer_class.export_related_fields:
+            self._add_related_path(
+                self.model_class, related_path.split("__"), [], False, plan
+            )
+
+        def leaves(paths):
+            return sorted(
+                path
+                for path in paths
+                if not any(other.startswith(path + "__") for other in paths)
+            )
+
+        select = leaves([path for path, many in plan.items() if not many])
+        prefetch = leaves([path for path, many in plan.items() if many])
+
+        return select, prefetch
+
+    def apply_export_plan(
+        self, queryset: models.QuerySet, serializer: Optional[BaseSerializer] = None
+    ) -> models.QuerySet:
+        """Load related objects used by the serializer with the queryset."""
+
+        select, prefetch = self.get_export_plan(serializer)
+
+        if len(select) > 0:
+            queryset = queryset.select_related(*select)
+        if len(prefetch) > 0:
+            queryset = queryset.prefetch_related(*prefetch)
+
+        return queryset
+
+    def iter_flat_rows(
+        self,
+        queryset: models.QuerySet,
+        chunk_size=QUERYCSV_EXPORT_CHUNK_SIZE,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> Iterator[dict]:
+        """
+        Yield flattened representations of objects in queryset.
+
+        Every row has the serializer's export columns, see ``get_export_columns``.
+        Objects are fetched from the database and serialized chunk_size
+        objects at a time, so the full queryset is never held in memory.
+        If provided, ``on_progress`` is called with the number of objects
+        in each chunk once they are serialized. Related objects are loaded
+        for each chunk, see ``get_export_plan``.
+        """
+
+        objects = self.apply_export_plan(queryset).iterator(chunk_size=chunk_size)
+        schema = self.serializer_class.get_schema()
+
+        while True:
+            chunk = list(islice(objects, chunk_size))
+
+            if len(chunk) == 0:
+                break
+
+            for data in self.serializer_class(chunk, many=True).data:
+                yield schema.to_export_row(data)
+
+            if on_progress is not None:
+                on_progress(len(chunk))
+
+    def get_export_columns(self) -> list[str]:
+        """
+        Columns of exported files, from the serializer's schema.
+
+        Fields of nested objects are flattened with dot notation, so
+        the columns don't depend on which objects are exported.
+        """
+
+        return list(self.serializer_class.get_schema().export_columns)
+
+    def stream_csv(
+        self,
+        queryset: models.QuerySet,
+        chunk_size=QUERYCSV_EXPORT_CHUNK_SIZE,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> Iterator[str]:
+        """Download: Yield lines of a csv representing queryset."""
+
+        writer = csv.writer(_EchoBuffer(), lineterminator="\n")
+        columns = self.get_export_columns()
+
+        yield writer.writerow(columns)
+
+        for row in self.iter_flat_rows(
+            queryset, chunk_size=chunk_size, on_progress=on_progress
+        ):
+            yield writer.writerow([row[column] for column in columns])
+
+    def download_csv(
+        self,
+        queryset: models.QuerySet,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> str:
+        """Download: Convert queryset to csv, return path to csv."""
 
-        df = pd.json_normalize(flattened)
         filepath = get_media_path(
             QUERYCSV_MEDIA_SUBDIR + "downloads/",
             fileprefix=f"{self.model_name}",
             fileext="csv",
         )
-        df.to_csv(filepath, index=False)
+
+        with open(filepath, mode="w", newline="") as f:
+            f.writelines(self.stream_csv(queryset, on_progress=on_progress))
 
         return filepath
 
-    def get_csv_template(self, field_types: Literal["all", "required", "writable"]):
+    ##########################
+    # == Columnar Exports == #
+    ##########################
+
+    def get_arrow_type(self, column: str) -> pa.DataType:
         """
-        Get path to csv file containing required fields for upload.
+        Get arrow type for a flat column, based on its serializer field.
+
+        Nested, related, and text fields are exported as strings.
+        """
+
+        field = self.fields.get(column, None)
+
+        if isinstance(field, BooleanField):
+            return pa.bool_()
+        elif isinstance(field, IntegerField):
+            return pa.int64()
+        elif isinstance(field, FloatField):
+            return pa.float64()
+        elif isinstance(field, DateTimeField):
+            return pa.timestamp("us")
+        elif isinstance(field, DateField):
+            return pa.date32()
+
+        return pa.string()
+
+    def get_arrow_schema(self, columns: list[str]) -> pa.Schema:
+        return pa.schema([(column, self.get_arrow_type(column)) for column in columns])
+
+    def _to_arrow_array(self, column: str, values: list, arrow_type: pa.DataType):
+        if pa.types.is_string(arrow_type):
+            return pa.array(
+                [None if value is None else str(value) for value in values],
+                type=arrow_type,
+            )
+
+        if pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type):
+            # Dates are represented as formatted strings by the serializer
+            strings = pa.array(
+                [None if value in (None, "") else str(value) for value in values],
+                type=pa.string(),
+            )
+            fmt = getattr(self.fields[column], "format", None)
+
+            if isinstance(fmt, str) and "%" in fmt:
+                return pc.strptime(strings, format=fmt, unit="s").cast(arrow_type)
+
+            try:
+                return pc.cast(pc.cast(strings, pa.timestamp("us")), arrow_type)
+            except pa.ArrowInvalid:
+                # ISO strings with an offset are stored as UTC
+                utc = pc.cast(strings, pa.timestamp("us", tz="UTC"))
+                return pc.cast(utc, arrow_type)
+
+        return pa.array(
+            [None if value == "" else value for value in values], type=arrow_type
+        )
+
+    def iter_record_batches(
+        self,
+        queryset: models.QuerySet,
+        chunk_size=QUERYCSV_EXPORT_CHUNK_SIZE,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> tuple[pa.Schema, Iterator[pa.RecordBatch]]:
+        """
+        Get arrow schema, and record batches of chunk_size objects from queryset.
+
+        Like ``stream_csv``, columns are taken from the serializer's schema.
+        """
+
+        rows = self.iter_flat_rows(
+            queryset, chunk_size=chunk_size, on_progress=on_progress
+        )
+        schema = self.get_arrow_schema(self.get_export_columns())
+
+        def batches():
+            chunk = list(islice(rows, chunk_size))
+
+            while len(chunk) > 0:
+                arrays = [
+                    self._to_arrow_array(
+                        field.name, [row.get(field.name) for row in chunk], field.type
+                    )
+                    for field in schema
+                ]
+                yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+                chunk = list(islice(rows, chunk_size))
+
+        return schema, batches()
+
+    def download_parquet(
+        self,
+        queryset: models.QuerySet,
+        chunk_size=QUERYCSV_EXPORT_CHUNK_SIZE,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> str:
+        """Download: Convert queryset to parquet, one row group per chunk, return path."""
+
+        filepath = get_media_path(
+            QUERYCSV_MEDIA_SUBDIR + "downloads/",
+            fileprefix=f"{self.model_name}",
+            fileext="parquet",
+        )
+        schema, batches = self.iter_record_batches(
+            queryset, chunk_size=chunk_size, on_progress=on_progress
+        )
+
+        with pq.ParquetWriter(filepath, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+
+        return filepath
+
+    def download_arrow(
+        self,
+        queryset: models.QuerySet,
+        chunk_size=QUERYCSV_EXPORT_CHUNK_SIZE,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> str:
+        """Download: Convert queryset to an arrow ipc file, one batch per chunk, return path."""
+
+        filepath = get_media_path(
+            QUERYCSV_MEDIA_SUBDIR + "downloads/",
+            fileprefix=f"{self.model_name}",
+            fileext="arrow",
+        )
+        schema, batches = self.iter_record_batches(
+            queryset, chunk_size=chunk_size, on_progress=on_progress
+        )
+
+        with pa.OSFile(filepath, "wb") as sink:
+            with pa.ipc.new_file(sink, schema) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+
+        return filepath
+
+    def get_export_fingerprint(
+        self, queryset: models.QuerySet, file_format=ExportFormat.CSV
+    ) -> tuple[Optional[str], Optional[int]]:
+        """
+        Hash of everything an export depends on, and the number of objects.
+
+        Includes the serializer, file format, the queryset's sql, and the number
+        of objects and their latest ``updated_at``, so the fingerprint changes
+        when objects are created, changed, or deleted. Changes that don't set
+        ``updated_at``, like ``QuerySet.update``, or changes to related objects,
+        are only picked up once the cached file expires.
+
+        Both are found with one query, so callers can reuse the count. If the
+        export can't be cached, returns None for both without a query.
+        """
+
+        model_fields = [field.name for field in queryset.model._meta.concrete_fields]
+
+        if "updated_at" not in model_fields:
+            return None, None
+
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return None, None
+
+        stats = queryset.aggregate(
+            count=models.Count("pk"), updated_at=models.Max("updated_at")
+        )
+        content = json.dumps(
+            [
+                get_import_path(self.serializer_class),
+                str(file_format),
+                sql,
+                params,
+                stats["count"],
+                stats["updated_at"],
+            ],
+            default=str,
+        )
+
+        return hashlib.sha256(content.encode()).hexdigest(), stats["count"]
+
+    def get_cached_download(
+        self, queryset: models.QuerySet, file_format=ExportFormat.CSV
+    ) -> Optional[str]:
+        """Get path to a finished export of the queryset, if the objects haven't changed."""
+
+        fingerprint, _ = self.get_export_fingerprint(queryset, file_format)
+
+        if fingerprint is None:
+            return None
+
+        return export_cache.get(fingerprint, self.model_name, str(file_format))
+
+    def open_cached_download(
+        self, fingerprint: Optional[str], file_format=ExportFormat.CSV
+    ) -> Optional[BinaryIO]:
+        """Open a finished export by fingerprint, see ``get_export_fingerprint``."""
+
+        if fingerprint is None:
+            return None
+
+        return export_cache.open(fingerprint, self.model_name, str(file_format))
+
+    def stream_csv_cached(
+        self, queryset: models.QuerySet, fingerprint: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Download: Like ``stream_csv``, and cache the csv once it's streamed.
+
+        Pass the queryset's fingerprint if it's already known, so it isn't
+        queried again.
+        """
+
+        if fingerprint is None:
+            fingerprint, _ = self.get_export_fingerprint(queryset, ExportFormat.CSV)
+
+        lines = self.stream_csv(queryset)
+
+        if fingerprint is None:
+            return lines
+
+        return export_cache.write_through(fingerprint, self.model_name, "csv", lines)
+
+    def download(
+        self,
+        queryset: models.QuerySet,
+        file_format=ExportFormat.CSV,
+        on_progress: Optional[Callable[[int], None]] = None,
+        use_cache=True,
+        fingerprint: Optional[str] = None,
+    ) -> str:
+        """
+        Download: Convert queryset to a file with the given format, return path.
+
+        Finished exports are cached by fingerprint, see ``get_export_fingerprint``,
+        so an identical export returns the cached file until the objects change.
+        Pass the fingerprint if it's already known, so it isn't queried again.
+        """
+
+        count = None
+
+        if use_cache and fingerprint is None:
+            fingerprint, count = self.get_export_fingerprint(queryset, file_format)
+        elif not use_cache:
+            fingerprint = None
+
+        if fingerprint is not None:
+            cached = export_cache.get(fingerprint, self.model_name, str(file_format))
+
+            if cached is not None:
+                if on_progress is not None:
+                    on_progress(count if count is not None else queryset.count())
+
+                return cached
+
+        if file_format == ExportFormat.PARQUET:
+            filepath = self.download_parquet(queryset, on_progress=on_progress)
+        elif file_format == ExportFormat.ARROW:
+            filepath = self.download_arrow(queryset, on_progress=on_progress)
+        else:
+            filepath = self.download_csv(queryset, on_progress=on_progress)
+
+        if fingerprint is None:
+            return filepath
+
+        return export_cache.put(
+            fingerprint, self.model_name, str(file_format), filepath
+        )
+
+    def download_tombstones(
+        self, tombstones: models.QuerySet, file_format=ExportFormat.CSV
+    ) -> str:
+        """Download: Convert records of deleted objects to a file, return path."""
+
+        filepath = get_media_path(
+            QUERYCSV_MEDIA_SUBDIR + "downloads/",
+            fileprefix=f"{self.model_name}_deleted",
+            fileext=str(file_format),
+        )
+        rows = list(tombstones.values_list("object_id", "deleted_at"))
+
+        if file_format == ExportFormat.CSV:
+            with open(filepath, mode="w", newline="") as f:
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(["id", "deleted_at"])
+                writer.writerows(
+                    [object_id, deleted_at.isoformat()]
+                    for object_id, deleted_at in rows
+                )
+
+            return filepath
+
+        table = pa.table(
+            {
+                "id": pa.array([object_id for object_id, _ in rows], pa.string()),
+                "deleted_at": pa.array(
+                    [deleted_at for _, deleted_at in rows],
+                    pa.timestamp("us", tz="UTC"),
+                ),
+            }
+        )
+
+        if file_format == ExportFormat.PARQUET:
+            pq.write_table(table, filepath)
+        else:
+            with pa.OSFile(filepath, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+        return filepath
+
+    @classmethod
+    def download_bundle(
+        cls,
+        sheets: list[tuple[str, Type[CsvModelSerializer], models.QuerySet]],
+        file_format=BundleFormat.XLSX,
+        name="bundle",
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> str:
+        """
+        Download: Export several querysets to one workbook, or a zip of csvs, return path.
+
+        Sheets are written one at a time, and each queryset is streamed in
+        chunks like ``stream_csv``, so only one chunk of objects is held in
+        memory. Sheet names are limited to 31 characters, like xlsx sheets.
 
         Parameters
         ----------
-            - all_fields (bool): Whether to include all fields or just required fields.
+            - sheets (list): (sheet name, serializer class, queryset) in sheet order.
+            - file_format (BundleFormat): Export to one workbook, or a zip of csvs.
+            - name (str): Prefix of the exported file name.
+            - on_progress (callable): Called with the number of objects in each chunk.
         """
 
+        filepath = get_media_path(
+            QUERYCSV_MEDIA_SUBDIR + "bundles/",
+            fileprefix=name,
+            fileext=str(file_format),
+        )
+
+        sheets = (
+            (SHEET_NAME_INVALID_RE.sub("", sheet_name)[:31], cls(serializer_class), qs)
+            for sheet_name, serializer_class, qs in sheets
+        )
+
+        if file_format == BundleFormat.ZIP:
+            with zipfile.ZipFile(filepath, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                for sheet_name, svc, queryset in sheets:
+                    with zf.open(f"{sheet_name}.csv", "w") as raw:
+                        with io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+                            f.writelines(
+                                svc.stream_csv(queryset, on_progress=on_progress)
+                            )
+
+            return filepath
+
+        def iter_sheets():
+            for sheet_name, svc, queryset in sheets:
+                rows = svc.iter_flat_rows(queryset, on_progress=on_progress)
+                yield sheet_name, rows, svc.get_export_columns()
+
+        write_xlsx_stream(filepath, iter_sheets())
+
+        return filepath
+
+    def get_csv_template_fields(
+        self, field_types: Literal["all", "required", "writable"]
+    ) -> list[str]:
+        """Get columns to include in a csv template."""
+
         match field_types:
             case "required":
-                template_fields = self.required_fields
+                return self.required_fields
             case "writable":
-                template_fields = self.writable_fields
+                return self.writable_fields
             case "all" | _:
-                template_fields = self.all_fields
+                return self.all_fields
+
+    def get_csv_template_content(
+        self, field_types: Literal["all", "required", "writable"]
+    ) -> tuple[bytes, str]:
+        """
+        Get contents of csv template for upload, and its ETag.
+
+        Templates are built once per set of columns and kept in memory,
+        so a template is only rebuilt when the serializer's fields change.
+        """
+
+        return _build_csv_template(tuple(self.get_csv_template_fields(field_types)))
+
+    def get_csv_template(self, field_types: Literal["all", "required", "writable"]):
+        """
+        Get path to csv file containing required fields for upload.
+
+        Parameters
+        ----------
+            - field_types (str): Whether to include all, required, or writable fields.
+        """
 
         filepath = get_media_path(
             QUERYCSV_MEDIA_SUBDIR + "templates/",
             f"{self.model_name}_template.csv",
             create_path=True,
         )
-        df = pd.DataFrame([], columns=template_fields)
-        df.to_csv(filepath, index=False)
+        content, _ = self.get_csv_template_content(field_types)
+
+        with open(filepath, "wb") as f:
+            f.write(content)
 
         return filepath
 
-    def upload_csv(
-        self, path: str, custom_field_maps: Optional[list[FieldMappingType]] = None
+    def get_column_renames(
+        self, custom_field_maps: Optional[list[FieldMappingType]] = None
+    ) -> dict[str, str]:
+        """Get mapping of spreadsheet column names to flat field names."""
+
+        renames = {}
+
+        if not custom_field_maps:
+            return renames
+
+        generic_list_keys = []  # Used for determining index when ambiguous
+
+        for mapping in custom_field_maps:
+            map_field_name = mapping["field_name"]
+
+            if (
+                map_field_name not in self.flat_fields.keys()
+                and map_field_name not in self.actions
+            ):
+                continue  # Safely skip invalid mappings
+
+            field = self.flat_fields[map_field_name]
+
+            if not field.is_list_item:
+                # Default field logic
+                renames[mapping["column_name"]] = map_field_name
+                continue
+
+            #######################################################
+            # Handle list items.
+            #
+            # Mappings can come in as field[n].subfield, or field[0].subfield.
+            # If the mapping uses n for the index, then the n will be the "nth" occurance
+            # of that field, starting at 0.
+            #
+            # At this point, all "field" (FlatListField) values are index=None,
+            # n-mappings will all be assigned indexes.
+            #######################################################
+
+            # Determine type
+            numbers = re.findall(r"\d+", mapping["column_name"])
+            assert (
+                len(numbers) <= 1
+            ), "List items can only contain 0 or 1 numbers (multi digit allowed)."
+
+            if len(numbers) == 1:
+                # Number was provided in spreadsheet
+                index = numbers[0]
+            else:
+                # Number was not provided in spreadsheet, get index of field
+                index = len(
+                    [key for key in generic_list_keys if key == field.generic_key]
+                )
+
+            field.set_index(index)
+            generic_list_keys.append(field.generic_key)
+
+            renames[mapping["column_name"]] = str(field)
+
+        return renames
+
+    def get_column_dtypes(
+        self, renames: Optional[dict[str, str]] = None
+    ) -> dict[str, pa.DataType]:
+        """
+        Get arrow types to parse spreadsheet columns as, keyed by column name.
+
+        Only writable boolean, number, and date fields are typed, since text
+        and decimal values are validated by the serializer as strings.
+        """
+
+        columns = {name: name for name in self.fields.keys()}
+        columns.update(renames or {})
+
+        dtypes = {}
+
+        for column, field_name in columns.items():
+            field = self.fields.get(field_name, None)
+
+            if field is None or field.read_only:
+                continue
+
+            arrow_type = self.get_arrow_type(field_name)
+
+            if not pa.types.is_string(arrow_type):
+                dtypes[column] = arrow_type
+
+        return dtypes
+
+    def get_records(self, df: pd.DataFrame) -> list[dict]:
+        """
+        Normalize and clean spreadsheet rows, return list of flat records.
+
+        Columns are cleaned as whole arrays: list fields are split on commas,
+        and empty values in other fields are converted to None. Row dicts are
+        built once at the end, dropping null fields.
+        """
+
+        columns = list(df.columns)
+        values = []
+
+        for column in columns:
+            field = self.flat_fields.get(column, None)
+
+            if df[column].dtype != object:
+                # Typed columns are already parsed, nulls are empty cells
+                cleaned = df[column].to_numpy(dtype=object)
+                cleaned[pd.isna(cleaned)] = None
+                values.append(cleaned)
+            elif field is None:
+                values.append(df[column].to_numpy(dtype=object))
+            elif field.is_list_item:
+                values.append(self._clean_list_column(df[column]))
+            else:
+                cleaned = df[column].to_numpy(dtype=object, copy=True)
+                cleaned[cleaned == ""] = None
+                values.append(cleaned)
+
+        return [
+            {key: value for key, value in zip(columns, row) if value is not None}
+            for row in zip(*values)
+        ]
+
+    def _clean_list_column(self, column: pd.Series) -> np.ndarray:
+        """Split comma separated values into lists, skipping empty items."""
+
+        # Remove empty items before splitting, so lists don't need filtering
+        cleaned = (
+            column.astype(str).str.replace(r",{2,}", ",", regex=True).str.strip(",")
+        )
+        lists = cleaned.str.split(",").to_numpy(dtype=object)
+
+        for i in np.flatnonzero((cleaned == "").to_numpy()):
+            lists[i] = []
+
+        return lists
+
+    def get_row_key(self, record: dict) -> Optional[str]:
+        """Hash of the first unique field in a record that has a value."""
+
+        for field_name in self.unique_fields:
+            value = record.get(field_name, None)
+
+            if value is None or value == "":
+                continue
+            elif isinstance(value, str):
+                value = value.strip()
+
+            try:
+                value = self.model_class._meta.get_field(field_name).to_python(value)
+            except exceptions.ValidationError:
+                continue
+
+            return hashlib.sha256(f"{field_name}={value}".encode()).hexdigest()
+
+        return None
+
+    def get_row_hash(self, record: dict) -> str:
+        """Hash of all values in a record, and the serializer they are uploaded with."""
+
+        content = json.dumps(
+            [get_import_path(self.serializer_class), record],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get_object_states(
+        self, pks: list, columns: Optional[list[str]] = None
+    ) -> dict[str, tuple[str, dict]]:
+        """
+        Serialize objects with their relations, including many-to-many fields.
+
+        If columns are given, only the fields they upload to are serialized,
+        and only their relations are loaded, so the cost doesn't depend on
+        fields the spreadsheet doesn't change. Returns (hash, serialized data)
+        of each object by primary key, used to check whether objects changed
+        since their rows were uploaded.
+        """
+
+        serializer = self.serializer_class()
+
+        if columns is not None:
+            field_names = {
+                re.split(r"[.\[]", column, maxsplit=1)[0] for column in columns
+            }
+
+            for field_name in list(serializer.fields.keys()):
+                if field_name not in field_names:
+                    del serializer.fields[field_name]
+
+        objects = self.apply_export_plan(
+            self.model_class.objects.filter(pk__in=pks), serializer=serializer
+        )
+        states = {}
+
+        for obj in objects:
+            data = serializer.to_representation(obj)
+
+            # Many related values aren't ordered, so they're hashed in any order
+            content = json.dumps(
+                {
+                    key: (
+                        sorted(
+                            json.dumps(item, sort_keys=True, default=str)
+                            for item in value
+                        )
+                        if isinstance(value, list)
+                        else value
+                    )
+                    for key, value in data.items()
+                },
+                sort_keys=True,
+                default=str,
+            )
+            states[str(obj.pk)] = (hashlib.sha256(content.encode()).hexdigest(), data)
+
+        return states
+
+    def filter_unchanged_records(
+        self, records: list[dict], columns: Optional[list[str]] = None
     ):
         """
-        Upload: Given path to csv, create/update models and
-        return successful and failed objects.
+        Split records into changed and unchanged rows, using saved row hashes.
+
+        A row is unchanged if it has the same hash as the last time it was
+        uploaded, and the fields of the uploaded columns serialize to the same
+        values as they did after that upload, so changes made outside of
+        uploads, like to many-to-many fields, are applied again. Returns
+        changed records, the serialized fields of unchanged records, and the
+        (key, hash) of each changed record by ``id(record)``, to save once
+        the rows are committed.
+        """
+
+        content_type = ContentType.objects.get_for_model(self.model_class)
+        row_hashes = {}
+
+        for record in records:
+            key = self.get_row_key(record)
+
+            if key is not None:
+                row_hashes[id(record)] = (key, self.get_row_hash(record))
+
+        if len(row_hashes) == 0:
+            return records, [], row_hashes
+
+        saved = QueryCsvRowHash.objects.get_for_keys(
+            content_type, [key for key, _ in row_hashes.values()]
+        )
+        states = self.get_object_states(
+            [row_hash.object_id for row_hash in saved.values()], columns=columns
+        )
+
+        changed = []
+        unchanged = []
+
+        for record in records:
+            key, row_hash = row_hashes.get(id(record), (None, None))
+            saved_hash = saved.get(key, None)
+            state = states.get(saved_hash.object_id) if saved_hash else None
+
+            if (
+                saved_hash is not None
+                and saved_hash.row_hash == row_hash
+                and state is not None
+                and state[0] == saved_hash.object_hash
+            ):
+                unchanged.append(state[1])
+            else:
+                changed.append(record)
+
+        return changed, unchanged, row_hashes
+
+    def prevalidate_records(
+        self, records: list[dict], pool: ProcessPoolExecutor, processes: int
+    ):
+        """
+        Flatten records and validate fields that don't use the database,
+        split between worker processes.
+
+        Returns records that passed, their (data, validated values) to pass to
+        ``upload_records``/``bulk_upsert``, and reports for rows that failed.
+        """
+
+        if len(records) == 0:
+            return records, [], []
+
+        size = math.ceil(len(records) / processes)
+        chunks = []
+
+        for i in range(0, len(records), size):
+            end = i + size
+            chunks.append(records[i:end])
+
+        serializer_path = get_import_path(self.serializer_class)
+        results = pool.map(
+            _prevalidate_records, [serializer_path] * len(chunks), chunks
+        )
+
+        valid_records = []
+        prevalidated = []
+        errors = []
+
+        for record, (data, validated, row_errors) in zip(
+            records, chain.from_iterable(results)
+        ):
+            if len(row_errors) > 0:
+                errors.append({**data, "errors": row_errors})
+            else:
+                valid_records.append(record)
+                prevalidated.append((data, validated))
+
+        return valid_records, prevalidated, errors
+
+    @staticmethod
+    def get_save_errors(e: exceptions.ValidationError | DatabaseError) -> dict:
+        """Get errors to report for a row that failed to save."""
+
+        if isinstance(e, DatabaseError):
+            return {"non_field_errors": [str(e)]}
+        elif hasattr(e, "error_dict"):
+            return e.message_dict
+
+        return {"non_field_errors": e.messages}
+
+    def get_row_serializer(
+        self, record: dict, prevalidated: Optional[tuple] = None, **kwargs
+    ):
+        """Create serializer for a flat record, with values validated in advance."""
+
+        if prevalidated is None:
+            return self.serializer_class(data=record, flat=True, **kwargs)
+
+        data, validated = prevalidated
+        return self.serializer_class(data=data, prevalidated=validated, **kwargs)
+
+    def upload_records(
+        self,
+        records: list[dict],
+        lookup_cache: Optional[SlugLookupCache] = None,
+        on_saved: Optional[Callable[[dict, models.Model], None]] = None,
+        prevalidated: Optional[list[tuple]] = None,
+        commit_every: Optional[int] = QUERYCSV_COMMIT_EVERY,
+        on_batch: Optional[Callable[[list[dict], int, int], None]] = None,
+    ):
+        """
+        Create/update models from flat records, one row at a time.
+
+        Related objects for slug fields are resolved for all records at once,
+        optionally pass ``lookup_cache`` to share them between calls.
+        If given, ``on_saved`` is called with each record and its object
+        after the row is saved, and ``prevalidated`` has the results of
+        ``prevalidate_records`` for each record.
+
+        Rows are committed in transactions of ``commit_every`` rows, each row
+        is saved in a savepoint so errors only roll back that row. After each
+        transaction commits, ``on_batch`` is called with its records and the
+        number of rows that succeeded and failed. If ``commit_every`` is None,
+        each row is committed on its own.
         """
 
-        # Start by importing csv
-        df = read_spreadsheet(path)
+        success = []
+        errors = []
+        lookup_cache = lookup_cache if lookup_cache is not None else SlugLookupCache()
+        context = {SlugLookupCache.context_key: lookup_cache}
+        prevalidated = prevalidated or [None] * len(records)
+
+        # Note: string stripping is done in the serializer
+        serializers = [
+            self.get_row_serializer(data, prevalidated=values, context=context)
+            for data, values in zip(records, prevalidated)
+        ]
+        lookup_cache.preload(serializers)
 
-        # Update df values with header associations
-        if custom_field_maps:
-            generic_list_keys = []  # Used for determining index when ambiguous
+        batch_size = commit_every or len(records)
 
-            for mapping in custom_field_maps:
-                map_field_name = mapping["field_name"]
+        for start in range(0, len(records), max(batch_size, 1)):
+            end = start + batch_size
+            batch_success = []
+            batch_errors = []
 
-                if (
-                    map_field_name not in self.flat_fields.keys()
-                    and map_field_name not in self.actions
+            with transaction.atomic() if commit_every else nullcontext():
+                for record, serializer in zip(
+                    records[start:end], serializers[start:end]
                 ):
-                    continue  # Safely skip invalid mappings
+                    if not serializer.is_valid():
+                        report = {**serializer.data, "errors": {**serializer.errors}}
+                        batch_errors.append(report)
+                        continue
+
+                    # Savepoint per row, so a failed row doesn't abort its batch
+                    try:
+                        with transaction.atomic():
+                            instance = serializer.save()
+                    except (exceptions.ValidationError, DatabaseError) as e:
+                        batch_errors.append(
+                            {**record, "errors": self.get_save_errors(e)}
+                        )
+                        continue
+
+                    batch_success.append(serializer.data)
+
+                    if on_saved is not None:
+                        on_saved(record, instance)
+
+            success.extend(batch_success)
+            errors.extend(batch_errors)
+
+            if commit_every and on_batch is not None:
+                on_batch(records[start:end], len(batch_success), len(batch_errors))
+
+        return success, errors
+
+    def upload_csv_chunks(
+        self,
+        path: str,
+        custom_field_maps: Optional[list[FieldMappingType]] = None,
+        bulk=False,
+        batch_size=QUERYCSV_BULK_BATCH_SIZE,
+        chunk_size=SPREADSHEET_CHUNK_SIZE,
+        start=0,
+        stop=None,
+        dry_run=False,
+        skip_unchanged=False,
+        processes: Optional[int] = None,
+        commit_every: Optional[int] = QUERYCSV_COMMIT_EVERY,
+        typed=False,
+        row_offset: Optional[tuple[int, int]] = None,
+        on_batch: Optional[Callable[[dict], None]] = None,
+    ) -> Iterator[tuple[list, list]]:
+        """
+        Upload: Given path to csv, create/update models chunk by chunk,
+        yield successful and failed objects for each chunk.
+
+        Only one chunk of the spreadsheet is loaded into memory at a time.
+        Accepts the same parameters as ``upload_csv``, and optionally a
+        range of data rows to process with start/stop. If given, the file
+        is read from ``row_offset``, see ``read_spreadsheet_chunks``.
+
+        If given, ``on_batch`` is called with the boundaries of each committed
+        transaction, as a dict with the (start, stop) range of data rows, the
+        number of rows that succeeded and failed, and when it was committed.
+        """
+
+        renames = self.get_column_renames(custom_field_maps)
+        dtypes = self.get_column_dtypes(renames) if typed else None
+        lookup_cache = SlugLookupCache(read_only=dry_run)
+        content_type = ContentType.objects.get_for_model(self.model_class)
+        pool = _get_validation_pool(processes)
+
+        row_start = start
+
+        try:
+            for df in read_spreadsheet_chunks(
+                path,
+                chunk_size=chunk_size,
+                start=start,
+                stop=stop,
+                dtypes=dtypes,
+                row_offset=row_offset,
+            ):
+                # Update df values with header associations
+                df.rename(columns=renames, inplace=True)
+                columns = list(df.columns)
+                records = self.get_records(df)
+                row_numbers = {
+                    id(record): row_start + i for i, record in enumerate(records)
+                }
+                row_start += len(records)
 
-                field = self.flat_fields[map_field_name]
+                unchanged = []
+                row_hashes = {}
+                saved_hashes = {}
+                prevalidated = None
+                prevalidated_errors = []
 
-                if not field.is_list_item:
-                    # Default field logic
-                    df.rename(
-                        columns={mapping["column_name"]: map_field_name},
-                        inplace=True,
+                if skip_unchanged and not dry_run:
+                    records, unchanged, row_hashes = self.filter_unchanged_records(
+                        records, columns=columns
                     )
-                    continue
 
-                #######################################################
-                # Handle list items.
-                #
-                # Mappings can come in as field[n].subfield, or field[0].subfield.
-                # If the mapping uses n for the index, then the n will be the "nth" occurance
-                # of that field, starting at 0.
-                #
-                # At this point, all "field" (FlatListField) values are index=None,
-                # n-mappings will all be assigned indexes.
-                #######################################################
-
-                # Determine type
-                numbers = re.findall(r"\d+", mapping["column_name"])
-                assert (
-                    len(numbers) <= 1
-                ), "List items can only contain 0 or 1 numbers (multi digit allowed)."
-
-                if len(numbers) == 1:
-                    # Number was provided in spreadsheet
-                    index = numbers[0]
+                if pool is not None:
+                    records, prevalidated, prevalidated_errors = (
+                        self.prevalidate_records(records, pool, processes)
+                    )
+
+                def on_saved(record, instance):
+                    if id(record) in row_hashes:
+                        key, row_hash = row_hashes[id(record)]
+                        saved_hashes[key] = (row_hash, instance)
+
+                def on_records_batch(batch_records, succeeded, failed):
+                    if on_batch is None or len(batch_records) == 0:
+                        return
+
+                    rows = [row_numbers[id(record)] for record in batch_records]
+                    on_batch(
+                        {
+                            "start": min(rows),
+                            "stop": max(rows) + 1,
+                            "succeeded": succeeded,
+                            "failed": failed,
+                            "committed_at": timezone.now(),
+                        }
+                    )
+
+                if dry_run:
+                    # Rolled back in case a serializer writes while validating
+                    with transaction.atomic():
+                        success, errors = self.bulk_upsert(
+                            records,
+                            batch_size=batch_size,
+                            lookup_cache=lookup_cache,
+                            dry_run=True,
+                            prevalidated=prevalidated,
+                        )
+                        transaction.set_rollback(True)
+                elif bulk:
+                    success, errors = self.bulk_upsert(
+                        records,
+                        batch_size=batch_size,
+                        lookup_cache=lookup_cache,
+                        on_saved=on_saved,
+                        prevalidated=prevalidated,
+                        on_batch=on_records_batch,
+                    )
                 else:
-                    # Number was not provided in spreadsheet, get index of field
-                    index = len(
-                        [key for key in generic_list_keys if key == field.generic_key]
+                    success, errors = self.upload_records(
+                        records,
+                        lookup_cache=lookup_cache,
+                        on_saved=on_saved,
+                        prevalidated=prevalidated,
+                        commit_every=commit_every,
+                        on_batch=on_records_batch,
                     )
 
-                field.set_index(index)
-                generic_list_keys.append(field.generic_key)
+                if len(saved_hashes) > 0:
+                    states = self.get_object_states(
+                        [obj.pk for _, obj in saved_hashes.values()], columns=columns
+                    )
+                    QueryCsvRowHash.objects.save_hashes(
+                        content_type,
+                        {
+                            key: (row_hash, str(obj.pk), states[str(obj.pk)][0])
+                            for key, (row_hash, obj) in saved_hashes.items()
+                            if str(obj.pk) in states
+                        },
+                    )
+
+                # Skipped rows are reported with the uploaded fields serialized
+                yield success + unchanged, prevalidated_errors + errors
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def upload_csv(
+        self,
+        path: str,
+        custom_field_maps: Optional[list[FieldMappingType]] = None,
+        bulk=False,
+        batch_size=QUERYCSV_BULK_BATCH_SIZE,
+        chunk_size=SPREADSHEET_CHUNK_SIZE,
+        dry_run=False,
+        skip_unchanged=False,
+        processes: Optional[int] = None,
+        commit_every: Optional[int] = QUERYCSV_COMMIT_EVERY,
+        typed=False,
+    ):
+        """
+        Upload: Given path to csv, create/update models and
+        return successful and failed objects.
+
+        Parameters
+        ----------
+            - path (str): Path to csv or excel spreadsheet.
+            - custom_field_maps (list): Mappings between spreadsheet columns and fields.
+            - bulk (bool): Resolve, validate, and write rows in batches instead
+                of one row at a time. Uses the same report format.
+            - batch_size (int): Number of rows per batch when uploading in bulk.
+            - chunk_size (int): Number of spreadsheet rows to read into memory at once.
+            - dry_run (bool): Validate rows in bulk without writing anything,
+                successful rows are returned as they were uploaded.
+            - skip_unchanged (bool): Skip rows that haven't changed since they were
+                last uploaded with this option, if the fields of the uploaded
+                columns haven't changed either. Skipped rows are returned with
+                those fields serialized. Opt-in, since objects are loaded to
+                compare them.
+            - processes (int): Number of processes used to flatten rows and validate
+                fields that don't use the database. Rows are saved in this process.
+                Ignored in daemonic processes, like Celery's prefork workers.
+            - commit_every (int): Number of rows committed in each transaction, rows
+                are saved in savepoints so a failed row doesn't abort the others.
+                If None, each row is committed on its own.
+            - typed (bool): Parse csv files with pyarrow, converting boolean, number,
+                and date columns before validation. Columns with invalid values
+                are validated as strings.
+        """
+
+        success = []
+        errors = []
+
+        for chunk_success, chunk_errors in self.upload_csv_chunks(
+            path,
+            custom_field_maps=custom_field_maps,
+            bulk=bulk,
+            batch_size=batch_size,
+            chunk_size=chunk_size,
+            dry_run=dry_run,
+            skip_unchanged=skip_unchanged,
+            processes=processes,
+            commit_every=commit_every,
+            typed=typed,
+        ):
+            success.extend(chunk_success)
+            errors.extend(chunk_errors)
+
+        return success, errors
+
+    ###########################
+    # == Bulk Upload Utils == #
+    ###########################
+
+    @property
+    def supports_bulk_writes(self) -> bool:
+        """
+        Whether valid rows can be saved with bulk queries.
+
+        If the serializer or model define custom save logic, the rows are
+        still resolved and validated in batches, but saved one at a time.
+        """
+
+        if (
+            self.serializer_class.create is not CsvModelSerializer.create
+            or self.serializer_class.update is not CsvModelSerializer.update
+        ):
+            return False
 
-                df.rename(columns={mapping["column_name"]: str(field)}, inplace=True)
+        if not supports_bulk_save(self.model_class):
+            return False
 
-        # Normalize & clean fields before conversion to dict
-        for field_name, field_type in self.serializer.get_flat_fields().items():
-            if field_name not in list(df.columns):
+        m2m_fields = self._get_bulk_m2m_fields()
+
+        for field in self.serializer.fields.values():
+            if field.read_only or not hasattr(field, "child_relation"):
                 continue
 
-            if field_type.is_list_item:
-                df[field_name] = df[field_name].map(
-                    lambda val: [
-                        item for item in str(val).split(",") if str(item) != ""
-                    ]
+            if field.source not in m2m_fields:
+                return False
+
+        return True
+
+    def _get_bulk_m2m_fields(self) -> list[str]:
+        """Many-to-many fields that can be set by inserting into the through table."""
+
+        return [
+            field.name
+            for field in self.model_class._meta.many_to_many
+            if field.remote_field.through._meta.auto_created
+        ]
+
+    def _resolve_instances(self, records: list[dict]):
+        """
+        Find existing objects for records, using one query per unique field.
+
+        Mirrors the lookup done in ``CsvModelSerializer``, returns the
+        (field, value) keys for each record and a mapping of keys to objects.
+        """
+
+        record_keys = [[] for _ in records]
+        existing = {}
+
+        for field_name in self.unique_fields:
+            model_field = self.model_class._meta.get_field(field_name)
+            values = set()
+
+            for i, record in enumerate(records):
+                value = record.get(field_name, None)
+
+                # Remove leading/trailing spaces before processing
+                if value is None or value == "":
+                    continue
+                elif isinstance(value, str):
+                    value = value.strip()
+
+                try:
+                    value = model_field.to_python(value)
+                except exceptions.ValidationError:
+                    continue
+
+                record_keys[i].append((field_name, value))
+                values.add(value)
+
+            if len(values) == 0:
+                continue
+
+            query = self.model_class.objects.filter(**{f"{field_name}__in": values})
+
+            for obj in query:
+                existing[(field_name, getattr(obj, model_field.attname))] = obj
+
+        return record_keys, existing
+
+    def _apply_validated_data(
+        self, obj: models.Model, serializer: CsvModelSerializer, dry_run=False
+    ):
+        """
+        Set validated data on a copy of obj, and validate the model without
+        querying the database. Returns the updated object, m2m values, and
+        the names of the fields that changed.
+
+        On dry runs, related objects may not be saved yet, so fields
+        set to unsaved objects are not validated.
+        """
+
+        validated_data = {**serializer.validated_data}
+        raise_errors_on_nested_writes(
+            "update" if obj.pk else "create", serializer, validated_data
+        )
+
+        info = model_meta.get_field_info(self.model_class)
+        m2m_values = {}
+        candidate = copy.copy(obj)
+
+        exclude = []
+
+        for attr, value in validated_data.items():
+            if attr in info.relations and info.relations[attr].to_many:
+                m2m_values[attr] = value
+                continue
+
+            setattr(candidate, attr, value)
+
+            if dry_run and isinstance(value, models.Model) and value.pk is None:
+                exclude.append(attr)
+
+        candidate.full_clean(
+            exclude=exclude, validate_unique=False, validate_constraints=False
+        )
+
+        field_names = [key for key in validated_data if key not in m2m_values]
+        changed = get_changed_fields(obj, candidate, field_names)
+        obj.__dict__.update(candidate.__dict__)
+
+        return obj, m2m_values, changed if changed is not None else field_names
+
+    def _bulk_set_m2m(self, m2m_assignments: dict, batch_size: int):
+        """Replace m2m values for objects, one delete and insert per field."""
+
+        for field_name, assignments in m2m_assignments.items():
+            field = self.model_class._meta.get_field(field_name)
+            through = field.remote_field.through
+            source_name = field.m2m_field_name()
+            target_name = field.m2m_reverse_field_name()
+
+            through._default_manager.filter(
+                **{f"{source_name}__in": [obj.pk for obj, _ in assignments.values()]}
+            ).delete()
+
+            rows = []
+            for obj, values in assignments.values():
+                target_ids = {value.pk for value in values}
+
+                for target_id in target_ids:
+                    rows.append(
+                        through(
+                            **{
+                                f"{source_name}_id": obj.pk,
+                                f"{target_name}_id": target_id,
+                            }
+                        )
+                    )
+
+            through._default_manager.bulk_create(rows, batch_size=batch_size)
+
+    def _upsert_batch(
+        self,
+        records: list[dict],
+        bulk_writes: bool,
+        batch_size: int,
+        lookup_cache: SlugLookupCache,
+        dry_run=False,
+        on_saved: Optional[Callable[[dict, models.Model], None]] = None,
+        prevalidated: Optional[list[tuple]] = None,
+    ):
+        """
+        Validate and save a batch of records, return successful and failed rows.
+
+        On dry runs, rows are validated but nothing is saved, and
+        successful rows are reported as they were uploaded.
+        """
+
+        record_keys, existing = self._resolve_instances(records)
+        context = {SlugLookupCache.context_key: lookup_cache}
+        serializers = []
+        prevalidated = prevalidated or [None] * len(records)
+
+        for record, keys, values in zip(records, record_keys, prevalidated):
+            instance = next(
+                (existing[key] for key in keys if key in existing),
+                None,
+            )
+            serializers.append(
+                self.get_row_serializer(
+                    record,
+                    prevalidated=values,
+                    instance=instance,
+                    resolve_instance=False,
+                    context=context,
                 )
+            )
+
+        lookup_cache.preload(serializers)
+        touched = {}
+        """Objects created or updated in this batch, by unique (field, value)."""
+
+        valid_rows = []
+        """Record, serializer, object, and m2m values of each valid row."""
+
+        errors = []
+        creates = {}
+        updates = {}
+        update_fields = set()
+        m2m_assignments = {}
+
+        for record, serializer, keys in zip(records, serializers, record_keys):
+            matches = [touched.get(key, existing.get(key, None)) for key in keys]
+            matches = {id(obj): obj for obj in matches if obj is not None}
+            instance = next(iter(matches.values()), None)
+
+            # Earlier rows in the batch may have created or changed the object
+            serializer.instance = (
+                instance if instance is not None and instance.pk else None
+            )
+
+            # If record matches exactly one object, uniqueness was already checked
+            if len(matches) <= 1:
+                for field_name in self.unique_fields:
+                    field = serializer.fields.get(field_name, None)
+
+                    if field is None:
+                        continue
+
+                    field.validators = [
+                        validator
+                        for validator in field.validators
+                        if not isinstance(validator, UniqueValidator)
+                    ]
+
+            if not serializer.is_valid():
+                report = {**serializer.data, "errors": {**serializer.errors}}
+                errors.append(report)
+                continue
+
+            m2m_values = {}
+
+            if dry_run:
+                obj = instance if instance is not None else self.model_class()
+
+                # Serializers with custom writes are only validated by the serializer
+                if bulk_writes:
+                    try:
+                        obj, _, _ = self._apply_validated_data(
+                            obj, serializer, dry_run=True
+                        )
+                    except exceptions.ValidationError as e:
+                        report = {**serializer.data, "errors": e.message_dict}
+                        errors.append(report)
+                        continue
+
+                instance = obj
+            elif not bulk_writes:
+                # Savepoint per row, so a failed row doesn't abort its batch
+                try:
+                    with transaction.atomic():
+                        instance = serializer.save()
+                except (exceptions.ValidationError, DatabaseError) as e:
+                    errors.append({**record, "errors": self.get_save_errors(e)})
+                    continue
             else:
-                df[field_name] = df[field_name].map(
-                    lambda val: val if val != "" else None
+                obj = instance if instance is not None else self.model_class()
+
+                try:
+                    obj, m2m_values, fields = self._apply_validated_data(
+                        obj, serializer
+                    )
+                except exceptions.ValidationError as e:
+                    report = {**serializer.data, "errors": e.message_dict}
+                    errors.append(report)
+                    continue
+
+                if obj.pk is None:
+                    creates[id(obj)] = obj
+                elif len(fields) > 0:
+                    updates[id(obj)] = obj
+                    update_fields.update(fields)
+
+                for field_name, values in m2m_values.items():
+                    m2m_assignments.setdefault(field_name, {})[id(obj)] = (obj, values)
+
+                instance = obj
+
+            for key in keys:
+                touched[key] = instance
+
+            valid_rows.append((record, serializer, instance, m2m_values))
+
+        if dry_run:
+            return [record for record, _, _, _ in valid_rows], errors
+
+        if bulk_writes and len(valid_rows) > 0:
+            try:
+                with transaction.atomic():
+                    self.model_class.objects.bulk_create(
+                        list(creates.values()), batch_size=batch_size
+                    )
+
+                    if len(updates) > 0:
+                        now = timezone.now()
+
+                        for field_name in get_auto_now_fields(self.model_class):
+                            update_fields.add(field_name)
+                            attname = self.model_class._meta.get_field(
+                                field_name
+                            ).attname
+
+                            for obj in updates.values():
+                                setattr(obj, attname, now)
+
+                        self.model_class.objects.bulk_update(
+                            list(updates.values()),
+                            fields=list(update_fields),
+                            batch_size=batch_size,
+                        )
+
+                    self._bulk_set_m2m(m2m_assignments, batch_size=batch_size)
+            except DatabaseError:
+                # Find the rows that conflict with the database, and save the others
+                valid_rows, save_errors = self._save_rows(
+                    valid_rows, list(creates.values())
                 )
+                errors.extend(save_errors)
 
-        # Convert df to list of dicts, drop null fields
-        upload_data = df.to_dict("records")
-        filtered_data = [
-            {k: v for k, v in record.items() if v is not None} for record in upload_data
-        ]
+        if len(valid_rows) > 0:
+            # Reload objects with relations for the report
+            refreshed = self.apply_export_plan(
+                self.model_class.objects.filter(
+                    pk__in=[instance.pk for _, _, instance, _ in valid_rows]
+                )
+            )
+            refreshed = {obj.pk: obj for obj in refreshed}
 
-        # Finally, save data if valid
+            for _, serializer, instance, _ in valid_rows:
+                serializer.instance = refreshed.get(instance.pk, instance)
+
+        if on_saved is not None:
+            for record, _, instance, _ in valid_rows:
+                on_saved(record, instance)
+
+        success = [serializer.data for _, serializer, _, _ in valid_rows]
+
+        return success, errors
+
+    def _save_rows(self, rows: list[tuple], created: list[models.Model]):
+        """
+        Save rows one at a time after a bulk write fails, each in a savepoint.
+
+        The bulk write was rolled back, so objects it created are unsaved
+        again. Returns the rows that were saved, and reports for the rows
+        that failed.
+        """
+
+        for obj in created:
+            obj.pk = None
+            obj._state.adding = True
+
+        saved = []
+        errors = []
+
+        for row in rows:
+            record, _, instance, m2m_values = row
+            adding = instance._state.adding
+
+            try:
+                with transaction.atomic():
+                    instance.save()
+
+                    for field_name, values in m2m_values.items():
+                        getattr(instance, field_name).set(values)
+            except (exceptions.ValidationError, DatabaseError) as e:
+                if adding:
+                    instance.pk = None
+                    instance._state.adding = True
+
+                errors.append({**record, "errors": self.get_save_errors(e)})
+                continue
+
+            saved.append(row)
+
+        return saved, errors
+
+    def bulk_upsert(
+        self,
+        records: list[dict],
+        batch_size=QUERYCSV_BULK_BATCH_SIZE,
+        lookup_cache: Optional[SlugLookupCache] = None,
+        dry_run=False,
+        on_saved: Optional[Callable[[dict, models.Model], None]] = None,
+        prevalidated: Optional[list[tuple]] = None,
+        on_batch: Optional[Callable[[list[dict], int, int], None]] = None,
+    ):
+        """
+        Create or update objects from flat records in batches.
+
+        For each batch, existing objects are found with one query per unique
+        field, rows are validated in memory, and objects are saved with
+        ``bulk_create``/``bulk_update``. Returns successful and failed rows.
+
+        If ``dry_run`` is set, rows are validated the same way, but nothing
+        is written. Use with a read-only ``SlugLookupCache``. If given,
+        ``on_saved`` is called with each record and its object after the
+        batch is saved, ``on_batch`` is called with the records of each batch
+        and the number of rows that succeeded and failed, and
+        ``prevalidated`` has the results of ``prevalidate_records`` for
+        each record.
+        """
+
+        bulk_writes = self.supports_bulk_writes
+        lookup_cache = lookup_cache if lookup_cache is not None else SlugLookupCache()
         success = []
         errors = []
 
-        # Note: string stripping is done in the serializer
-        serializers = [
-            self.serializer_class(data=data, flat=True) for data in filtered_data
-        ]
+        for start in range(0, len(records), batch_size):
+            end = start + batch_size
+            batch_success, batch_errors = self._upsert_batch(
+                records[start:end],
+                prevalidated=prevalidated[start:end] if prevalidated else None,
+                bulk_writes=bulk_writes,
+                batch_size=batch_size,
+                lookup_cache=lookup_cache,
+                dry_run=dry_run,
+                on_saved=on_saved,
+            )
+            success.extend(batch_success)
+            errors.extend(batch_errors)
 
-        for serializer in serializers:
-            if serializer.is_valid():
-                serializer.save()
-                success.append(serializer.data)
-            else:
-                report = {**serializer.data, "errors": {**serializer.errors}}
-                errors.append(report)
+            if not dry_run and on_batch is not None:
+                on_batch(records[start:end], len(batch_success), len(batch_errors))
 
         return success, errors
@@ -1,9 +1,26 @@
+import time
 from typing import Optional
 
 from django import dispatch
+from django.contrib.contenttypes.models import ContentType
+from django.db import OperationalError, ProgrammingError, transaction
+from django.db.models.signals import post_delete, post_save
 
-from querycsv.models import QueryCsvUploadJob
-from querycsv.tasks import process_csv_job_task
+from querycsv.consts import QUERYCSV_PROFILE_CACHE_TTL
+from querycsv.models import (
+    QueryCsvBundleJob,
+    QueryCsvDownloadJob,
+    QueryCsvExportProfile,
+    QueryCsvTombstone,
+    QueryCsvUploadJob,
+    QueryCsvUploadSession,
+)
+from querycsv.tasks import (
+    assemble_upload_session_task,
+    process_bundle_job_task,
+    process_csv_job_task,
+    process_download_job_task,
+)
 
 ####################
 # Signal Producers #
@@ -18,6 +35,33 @@ def send_process_csv_job_signal(job: QueryCsvUploadJob):
     process_csv_job_signal.send(job.__class__, instance=job)
 
 
+process_download_job_signal = dispatch.Signal()
+
+
+def send_process_download_job_signal(job: QueryCsvDownloadJob):
+    """Sends signal for queueing up a queryset export job."""
+
+    process_download_job_signal.send(job.__class__, instance=job)
+
+
+process_bundle_job_signal = dispatch.Signal()
+
+
+def send_process_bundle_job_signal(job: QueryCsvBundleJob):
+    """Sends signal for queueing up a bundle export job."""
+
+    process_bundle_job_signal.send(job.__class__, instance=job)
+
+
+assemble_upload_session_signal = dispatch.Signal()
+
+
+def send_assemble_upload_session_signal(session: QueryCsvUploadSession):
+    """Sends signal for queueing up assembling a completed upload session."""
+
+    assemble_upload_session_signal.send(session.__class__, instance=session)
+
+
 ####################
 # Signal Receivers #
 ####################
@@ -35,3 +79,129 @@ def on_process_csv_job_signal(sender, instance: Optional[QueryCsvUploadJob], **k
         return
 
     process_csv_job_task.delay(job_id=instance.pk)
+
+
+@dispatch.receiver(process_download_job_signal)
+def on_process_download_job_signal(
+    sender, instance: Optional[QueryCsvDownloadJob], **kwargs
+):
+    """
+    Runs when the process download job signal is fired.
+
+    This will create a new celery task for exporting a queryset.
+    """
+
+    if not instance:
+        return
+
+    process_download_job_task.delay(job_id=instance.pk)
+
+
+@dispatch.receiver(process_bundle_job_signal)
+def on_process_bundle_job_signal(
+    sender, instance: Optional[QueryCsvBundleJob], **kwargs
+):
+    """
+    Runs when the process bundle job signal is fired.
+
+    This will create a new celery task for exporting a bundle of querysets.
+    """
+
+    if not instance:
+        return
+
+    process_bundle_job_task.delay(job_id=instance.pk)
+
+
+@dispatch.receiver(assemble_upload_session_signal)
+def on_assemble_upload_session_signal(
+    sender, instance: Optional[QueryCsvUploadSession], **kwargs
+):
+    """
+    Runs when the assemble upload session signal is fired.
+
+    This will create a new celery task for assembling an upload's parts.
+    """
+
+    if not instance:
+        return
+
+    assemble_upload_session_task.delay(session_id=instance.pk)
+
+
+_profiled_content_types = {"ids": None, "expires_at": 0.0}
+"""Content type ids with export profiles, cached in this process."""
+
+
+def get_profiled_content_type_ids() -> frozenset[int]:
+    """
+    Get ids of content types that have export profiles.
+
+    Cached for ``QUERYCSV_PROFILE_CACHE_TTL`` seconds, and cleared in this
+    process when a profile is saved or deleted. Other processes see a new
+    profile once their cache expires. Deletions before a profile's first
+    export are included in it anyway, since the first export has every object.
+    """
+
+    now = time.monotonic()
+
+    if _profiled_content_types["ids"] is None or now >= (
+        _profiled_content_types["expires_at"]
+    ):
+        try:
+            # Savepoint, so a missing table doesn't abort the delete's transaction
+            with transaction.atomic():
+                ids = frozenset(
+                    QueryCsvExportProfile.objects.values_list(
+                        "content_type_id", flat=True
+                    ).distinct()
+                )
+        except (OperationalError, ProgrammingError):
+            # Tables don't exist before migrating
+            return frozenset()
+
+        _profiled_content_types["ids"] = ids
+        _profiled_content_types["expires_at"] = now + QUERYCSV_PROFILE_CACHE_TTL
+
+    return _profiled_content_types["ids"]
+
+
+def clear_profiled_content_types():
+    _profiled_content_types["ids"] = None
+
+
+@dispatch.receiver(post_delete)
+def on_model_delete(sender, instance, **kwargs):
+    """
+    Runs when any object is deleted.
+
+    Records a tombstone if the model has export profiles, so the next
+    export includes the deletion. Profiled models are checked against
+    a cached set, so deletes don't query for profiles.
+    """
+
+    if sender._meta.app_label == "querycsv":
+        return
+
+    content_type = ContentType.objects.get_for_model(sender)
+
+    if content_type.id not in get_profiled_content_type_ids():
+        return
+
+    QueryCsvTombstone.objects.create(
+        content_type=content_type, object_id=str(instance.pk)
+    )
+
+
+@dispatch.receiver(post_save, sender=QueryCsvExportProfile)
+def on_export_profile_save(sender, instance: QueryCsvExportProfile, **kwargs):
+    """Start recording deletions for the profile's model."""
+
+    clear_profiled_content_types()
+
+
+@dispatch.receiver(post_delete, sender=QueryCsvExportProfile)
+def on_export_profile_delete(sender, instance: QueryCsvExportProfile, **kwargs):
+    """Stop recording deletions once a model has no export profiles."""
+
+    clear_profiled_content_types()
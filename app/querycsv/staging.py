@@ -0,0 +1,133 @@
+"""
+Local disk cache for spreadsheets and results kept in remote storage.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from django.core.files.storage import Storage
+from django.db.models.fields.files import FieldFile
+
+from querycsv.consts import (
+    QUERYCSV_STAGING_DIR,
+    QUERYCSV_STAGING_MAX_SIZE,
+    QUERYCSV_TEMP_FILE_MAX_AGE,
+)
+from utils.files import evict_files
+
+
+def get_storage_etag(storage: Storage, name: str) -> str:
+    """
+    Get a value that changes when a stored file changes.
+
+    Uses the object's ETag for S3 storage, otherwise the file's
+    size and modified time.
+    """
+
+    bucket = getattr(storage, "bucket", None)
+
+    if bucket is not None:
+        return bucket.Object(storage._normalize_name(name)).e_tag
+
+    return f"{storage.size(name)}-{storage.get_modified_time(name).timestamp()}"
+
+
+class StagingCache:
+    """
+    Download files from storage once, and read them from local disk after.
+
+    Files are stored by storage name and ETag, so a changed file is
+    downloaded again. When the cache is larger than ``max_size`` bytes,
+    the least recently used files are removed. The directory can be
+    shared between processes on the same machine, since files are
+    moved into place once they are fully downloaded.
+    """
+
+    def __init__(
+        self,
+        directory=QUERYCSV_STAGING_DIR,
+        max_size=QUERYCSV_STAGING_MAX_SIZE,
+        temp_max_age=QUERYCSV_TEMP_FILE_MAX_AGE,
+    ):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.temp_max_age = temp_max_age
+
+    def _get_name_key(self, name: str):
+        return hashlib.sha256(name.encode()).hexdigest()[:32]
+
+    def get_cached_path(self, name: str, etag: str) -> Path:
+        """Where a version of a stored file is kept in the cache."""
+
+        etag_key = hashlib.sha256(etag.encode()).hexdigest()[:16]
+        suffix = "".join(Path(name).suffixes[-1:])
+
+        return self.directory / f"{self._get_name_key(name)}-{etag_key}{suffix}"
+
+    def get_path(self, storage: Storage, name: str) -> str:
+        """
+        Get local path of a stored file.
+
+        Storages with local files return their own path. Otherwise, the
+        file is downloaded to the cache if it isn't there already.
+        """
+
+        try:
+            return storage.path(name)
+        except NotImplementedError:
+            pass
+
+        path = self.get_cached_path(name, get_storage_etag(storage, name))
+
+        if path.exists():
+            # Mark as recently used
+            os.utime(path)
+            return str(path)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.discard(name)
+
+        with (
+            storage.open(name, "rb") as src,
+            tempfile.NamedTemporaryFile(
+                dir=self.directory, delete=False, suffix=".tmp"
+            ) as dst,
+        ):
+            shutil.copyfileobj(src, dst)
+
+        os.replace(dst.name, path)
+        self.evict(keep=path)
+
+        return str(path)
+
+    def discard(self, name: str):
+        """Remove all cached versions of a stored file."""
+
+        for path in self.directory.glob(f"{self._get_name_key(name)}-*"):
+            path.unlink(missing_ok=True)
+
+    def evict(self, keep: Optional[Path] = None):
+        """
+        Remove least recently used files until the cache fits in ``max_size``.
+
+        Files that are still being downloaded are kept, unless they haven't
+        been written to for ``temp_max_age`` seconds.
+        """
+
+        evict_files(
+            self.directory, self.max_size, temp_max_age=self.temp_max_age, keep=keep
+        )
+
+
+staging_cache = StagingCache()
+"""Cache shared by querycsv reads in this process."""
+
+
+def get_staged_path(file: FieldFile) -> str:
+    """Get local path for a model's file, downloading remote files once."""
+
+    return staging_cache.get_path(file.storage, file.name)
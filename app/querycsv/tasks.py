@@ -1,14 +1,32 @@
-import pandas as pd
-from celery import shared_task
+import json
+import math
+import re
+from itertools import islice
+
+from celery import chain, chord, group, shared_task
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.mail import EmailMultiAlternatives
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from django.utils.safestring import mark_safe
 
-from querycsv.consts import QUERYCSV_MEDIA_SUBDIR
-from querycsv.models import CsvUploadStatus, QueryCsvUploadJob
+from lib.spreadsheets import write_xlsx_sheets
+from querycsv.consts import QUERYCSV_DRY_RUN_PREVIEW_SIZE, QUERYCSV_MEDIA_SUBDIR
+from querycsv.models import (
+    CsvUploadStatus,
+    QueryCsvBundleJob,
+    QueryCsvDownloadJob,
+    QueryCsvExportProfile,
+    QueryCsvTombstone,
+    QueryCsvUploadJob,
+    QueryCsvUploadSession,
+)
 from querycsv.services import QueryCsvService
+from querycsv.staging import staging_cache
 from utils.files import get_media_path
-from utils.helpers import import_from_path
+from utils.helpers import get_full_url, import_from_path
 from utils.models import save_file_to_model
 
 
@@ -21,34 +39,178 @@ def upload_csv_task(filepath: str, serializer_path: str):
     print("Created objects:", qs)
 
 
-@shared_task
-def process_csv_job_task(job_id: int):
+def get_job_results_dir(job: QueryCsvUploadJob):
+    """Storage directory for results of rows that have been committed."""
+
+    return QUERYCSV_MEDIA_SUBDIR + f"jobs/{job.id}/"
+
+
+def get_job_segments(job: QueryCsvUploadJob) -> list[tuple[int, int]]:
     """
-    Processes a predefined upload job.
-    Used for larger uploads.
+    List (start, stop) ranges of rows with saved results, in row order.
+
+    Each segment is saved after its rows are committed, so segments
+    act as checkpoints when a task is redelivered.
     """
-    # Process job
-    job = QueryCsvUploadJob.objects.find_by_id(job_id)
-    success, failed = QueryCsvService.upload_from_job(job)
-    job.status = CsvUploadStatus.SUCCESS
 
-    # Create report
+    try:
+        _, files = default_storage.listdir(get_job_results_dir(job))
+    except FileNotFoundError:
+        return []
+
+    segments = []
+    for name in files:
+        match = re.fullmatch(r"results-(\d+)-(\d+)\.jsonl", name)
+
+        if match:
+            segments.append((int(match.group(1)), int(match.group(2))))
+
+    return sorted(segments)
+
+
+def get_job_segment_name(job: QueryCsvUploadJob, start: int, stop: int):
+    """Storage name of the results file for a range of rows."""
+
+    return get_job_results_dir(job) + f"results-{start}-{stop}.jsonl"
+
+
+def get_job_resume_row(
+    job: QueryCsvUploadJob, start=0, stop=None, segments=None
+) -> int:
+    """Get first row in the range that doesn't have saved results."""
+
+    if segments is None:
+        segments = get_job_segments(job)
+
+    for seg_start, seg_stop in segments:
+        if seg_start == start and (stop is None or seg_stop <= stop):
+            start = seg_stop
+
+    return start
+
+
+def upload_job_rows(job: QueryCsvUploadJob, start=0, stop=None):
+    """
+    Process a range of rows for an upload job.
+
+    Results are saved to default storage after each chunk of rows is
+    committed, so they can be collected by whichever worker creates
+    the report. If results already exist for the start of the range,
+    processing resumes after them. The boundaries of each transaction
+    are saved with the results, with the "batch" status.
+    """
+
+    start = get_job_resume_row(job, start, stop)
+
+    if stop is not None and start >= stop:
+        return
+
+    batches = []
+
+    for chunk_success, chunk_failed in QueryCsvService.upload_chunks_from_job(
+        job,
+        start=start,
+        stop=stop,
+        skip_unchanged=job.skip_unchanged,
+        dry_run=job.dry_run,
+        row_offset=job.get_row_offset(start),
+        on_batch=batches.append,
+    ):
+        lines = []
+        for status, rows in (
+            ("success", chunk_success),
+            ("failed", chunk_failed),
+            ("batch", batches),
+        ):
+            for row in rows:
+                result = {"status": status, "row": row}
+                lines.append(json.dumps(result, cls=DjangoJSONEncoder) + "\n")
+
+        chunk_stop = start + len(chunk_success) + len(chunk_failed)
+        batches.clear()
+        name = get_job_segment_name(job, start, chunk_stop)
+
+        if default_storage.exists(name):
+            default_storage.delete(name)
+
+        default_storage.save(name, ContentFile("".join(lines).encode()))
+        job.add_progress(succeeded=len(chunk_success), failed=len(chunk_failed))
+
+        start = chunk_stop
+
+
+def iter_job_results(job: QueryCsvUploadJob, status: str):
+    """Read saved rows with a status, in row order, one line at a time."""
+
+    for start, stop in get_job_segments(job):
+        name = get_job_segment_name(job, start, stop)
+
+        # Rows are read twice when writing the report, so remote files are cached
+        with open(staging_cache.get_path(default_storage, name), mode="rb") as f:
+            for line in f:
+                result = json.loads(line)
+
+                if result["status"] == status:
+                    yield result["row"]
+
+
+def delete_job_results(job: QueryCsvUploadJob):
+    """Remove saved results once the report is created."""
+
+    for start, stop in get_job_segments(job):
+        name = get_job_segment_name(job, start, stop)
+        default_storage.delete(name)
+        staging_cache.discard(name)
+
+
+def report_job(job: QueryCsvUploadJob):
+    """
+    Create report for a processed upload job, and notify admin.
+
+    Jobs that already have a report are skipped, so redelivered
+    tasks don't send the email again.
+    """
+
+    job.refresh_from_db()
+    if job.status == CsvUploadStatus.SUCCESS:
+        return
+
+    # Create report, rows are streamed from saved results
     report_file_path = get_media_path(
         QUERYCSV_MEDIA_SUBDIR + f"reports/{job.model_class.__name__}/",
         fileprefix=str(timezone.now().strftime("%d-%m-%Y_%H:%M:%S")),
         fileext="xlsx",
     )
 
-    success_report = pd.json_normalize(success)
-    failed_report = pd.json_normalize(failed)
+    counts = write_xlsx_sheets(
+        report_file_path,
+        {
+            "Successful": lambda: iter_job_results(job, "success"),
+            "Failed": lambda: iter_job_results(job, "failed"),
+            "Batches": lambda: iter_job_results(job, "batch"),
+        },
+    )
+    success_count = counts["Successful"]
+    failed_count = counts["Failed"]
 
-    with pd.ExcelWriter(report_file_path) as writer:
-        success_report.to_excel(writer, sheet_name="Successful", index=False)
-        failed_report.to_excel(writer, sheet_name="Failed", index=False)
+    # Counters are set from saved results, in case a task was interrupted
+    # between committing rows and updating progress
+    job.status = CsvUploadStatus.SUCCESS
+    job.rows_succeeded = success_count
+    job.rows_failed = failed_count
+    job.rows_processed = success_count + failed_count
+
+    if job.dry_run:
+        # Shown with the header mappings, the full list is in the report
+        job.failed_preview = list(
+            islice(iter_job_results(job, "failed"), QUERYCSV_DRY_RUN_PREVIEW_SIZE)
+        )
 
     save_file_to_model(job, report_file_path, field="report")
     job.refresh_from_db()
 
+    delete_job_results(job)
+
     # Send admin email
     if job.notify_email:
         model_name = job.model_class._meta.verbose_name_plural
@@ -57,17 +219,286 @@ def process_csv_job_task(job_id: int):
             to=[job.notify_email],
             body=mark_safe(
                 f"Your {model_name} csv has finished processing. "
-                f"Objects processed successfully: {len(success)}. "
-                f"Objects unsuccessfully processed: {len(failed)}."
+                f"Objects processed successfully: {success_count}. "
+                f"Objects unsuccessfully processed: {failed_count}."
             ),
         )
         mail.attach_alternative(
             (
                 f"Your {model_name} csv has finished processing.<br><br>"
-                f"Objects processed successfully: {len(success)}<br>"
-                f"Objects unsuccessfully processed: {len(failed)}"
+                f"Objects processed successfully: {success_count}<br>"
+                f"Objects unsuccessfully processed: {failed_count}"
             ),
             "text/html",
         )
         mail.attach_file(report_file_path)
         mail.send()
+
+
+@shared_task
+def process_csv_job_chunk_task(job_id: int, start: int, stop: int):
+    """Process a range of rows for an upload job."""
+
+    job = QueryCsvUploadJob.objects.find_by_id(job_id)
+
+    try:
+        upload_job_rows(job, start=start, stop=stop)
+    except Exception:
+        job.set_status(CsvUploadStatus.FAILED)
+        raise
+
+
+@shared_task
+def report_csv_job_task(job_id: int):
+    """Merge results from all chunks of an upload job into a single report."""
+
+    job = QueryCsvUploadJob.objects.find_by_id(job_id)
+
+    try:
+        report_job(job)
+    except Exception:
+        job.set_status(CsvUploadStatus.FAILED)
+        raise
+
+
+@shared_task
+def process_csv_job_task(job_id: int):
+    """
+    Processes a predefined upload job.
+    Used for larger uploads.
+
+    If the job has a chunk size, the rows are split into ranges that are
+    processed by separate tasks. Ranges are grouped into ``max_concurrency``
+    chains of consecutive ranges, and the report is created once all
+    chains finish.
+
+    If the task is redelivered, rows with saved results are skipped,
+    and finished jobs are not processed again.
+    """
+    job = QueryCsvUploadJob.objects.find_by_id(job_id)
+
+    if job.status == CsvUploadStatus.SUCCESS:
+        return
+
+    try:
+        job.set_status(CsvUploadStatus.PROCESSING)
+
+        if job.row_count is None or job.file_hash is None:
+            job.load_file_info()
+
+        ranges = job.get_row_ranges(job.row_count)
+
+        if not job.chunk_size or len(ranges) <= 1:
+            upload_job_rows(job, stop=job.row_count)
+            report_job(job)
+            return
+
+        if job.row_offsets is None:
+            job.load_row_offsets()
+
+        lane_count = min(max(job.max_concurrency, 1), len(ranges))
+        lane_size = math.ceil(len(ranges) / lane_count)
+        segments = get_job_segments(job)
+
+        lanes = []
+        for i in range(0, len(ranges), lane_size):
+            end = i + lane_size
+            tasks = [
+                process_csv_job_chunk_task.si(job.id, start, stop)
+                for start, stop in ranges[i:end]
+                if get_job_resume_row(job, start, stop, segments=segments) < stop
+            ]
+
+            if len(tasks) > 0:
+                lanes.append(chain(*tasks))
+
+        if len(lanes) == 0:
+            report_job(job)
+            return
+
+        chord(group(lanes))(report_csv_job_task.si(job.id))
+    except Exception:
+        job.set_status(CsvUploadStatus.FAILED)
+        raise
+
+
+@shared_task
+def assemble_upload_session_task(session_id: int):
+    """
+    Assemble the parts of a completed upload session into an upload job.
+
+    Sessions with files that don't match their checksum are marked as
+    failed, redelivered tasks return the job that was already created.
+    """
+
+    session = QueryCsvUploadSession.objects.find_by_id(session_id)
+
+    try:
+        session.assemble()
+    except ValidationError:
+        return
+    except Exception as e:
+        # Parts may be deleted by a task that already created the job
+        QueryCsvUploadSession.objects.filter(id=session.id, job__isnull=True).update(
+            status=CsvUploadStatus.FAILED, error=str(e)
+        )
+        raise
+
+
+@shared_task
+def process_download_job_task(job_id: int):
+    """
+    Export the queryset of a download job to a file, and notify admin.
+
+    Redelivered tasks export the file again, unless the job already finished.
+    """
+
+    job = QueryCsvDownloadJob.objects.find_by_id(job_id)
+
+    if job.status == CsvUploadStatus.SUCCESS:
+        return
+
+    try:
+        queryset = job.queryset
+        job.set_status(CsvUploadStatus.PROCESSING)
+        QueryCsvDownloadJob.objects.filter(id=job.id).update(
+            row_count=queryset.count(), rows_processed=0
+        )
+        job.refresh_from_db()
+
+        svc = QueryCsvService(serializer_class=job.serializer_class)
+        filepath = svc.download(
+            queryset, file_format=job.file_format, on_progress=job.add_progress
+        )
+
+        job.status = CsvUploadStatus.SUCCESS
+        save_file_to_model(job, filepath, field="file")
+    except Exception:
+        job.set_status(CsvUploadStatus.FAILED)
+        raise
+
+    # Send admin email
+    if job.notify_email:
+        model_name = job.model_class._meta.verbose_name_plural
+        url = get_full_url(job.file.url)
+        mail = EmailMultiAlternatives(
+            subject=f"Download {model_name} ready",
+            to=[job.notify_email],
+            body=mark_safe(
+                f"Your {model_name} export has finished processing. "
+                f"Objects exported: {job.rows_processed}. "
+                f"Download: {url}"
+            ),
+        )
+        mail.attach_alternative(
+            (
+                f"Your {model_name} export has finished processing.<br><br>"
+                f"Objects exported: {job.rows_processed}<br>"
+                f'<a href="{url}">Download file</a>'
+            ),
+            "text/html",
+        )
+        mail.send()
+
+
+@shared_task
+def process_bundle_job_task(job_id: int):
+    """
+    Export every sheet of a bundle job to one file, and notify admin.
+
+    Sheets are exported one after another, so only one chunk of objects
+    is held in memory. Redelivered tasks export the file again, unless
+    the job already finished.
+    """
+
+    job = QueryCsvBundleJob.objects.find_by_id(job_id)
+
+    if job.status == CsvUploadStatus.SUCCESS:
+        return
+
+    try:
+        sheets = [
+            (sheet.name, sheet.serializer_class, sheet.queryset)
+            for sheet in job.sheets.all()
+        ]
+        job.set_status(CsvUploadStatus.PROCESSING)
+        QueryCsvBundleJob.objects.filter(id=job.id).update(
+            row_count=sum(queryset.count() for _, _, queryset in sheets),
+            rows_processed=0,
+        )
+        job.refresh_from_db()
+
+        filepath = QueryCsvService.download_bundle(
+            sheets,
+            file_format=job.file_format,
+            name=job.name,
+            on_progress=job.add_progress,
+        )
+
+        job.status = CsvUploadStatus.SUCCESS
+        save_file_to_model(job, filepath, field="file")
+    except Exception:
+        job.set_status(CsvUploadStatus.FAILED)
+        raise
+
+    # Send admin email
+    if job.notify_email:
+        url = get_full_url(job.file.url)
+        mail = EmailMultiAlternatives(
+            subject=f"Download {job.name} ready",
+            to=[job.notify_email],
+            body=mark_safe(
+                f"Your {job.name} export has finished processing. "
+                f"Objects exported: {job.rows_processed}. "
+                f"Download: {url}"
+            ),
+        )
+        mail.attach_alternative(
+            (
+                f"Your {job.name} export has finished processing.<br><br>"
+                f"Objects exported: {job.rows_processed}<br>"
+                f'<a href="{url}">Download file</a>'
+            ),
+            "text/html",
+        )
+        mail.send()
+
+
+def export_profile_changes(profile: QueryCsvExportProfile):
+    """
+    Export objects changed and deleted since the profile's watermark.
+
+    Changes are exported up to the time the export starts, which becomes
+    the new watermark once both files are saved. Tombstones that every
+    profile for the model has exported are removed.
+    """
+
+    until = timezone.now()
+    svc = QueryCsvService(serializer_class=profile.serializer_class)
+    tombstones = profile.get_tombstones(until)
+    exported = []
+
+    filepath = svc.download(
+        profile.get_changed_queryset(until),
+        file_format=profile.file_format,
+        on_progress=exported.append,
+    )
+    deleted_filepath = svc.download_tombstones(
+        tombstones, file_format=profile.file_format
+    )
+    save_file_to_model(profile, deleted_filepath, field="deleted_file")
+
+    profile.watermark = until
+    profile.rows_exported = sum(exported)
+    profile.rows_deleted = tombstones.count()
+    save_file_to_model(profile, filepath, field="file")
+
+    QueryCsvTombstone.objects.prune(profile.content_type)
+
+
+@shared_task
+def export_profile_task(profile_id: int):
+    """Export changes for an incremental export profile."""
+
+    profile = QueryCsvExportProfile.objects.find_by_id(profile_id)
+    export_profile_changes(profile)
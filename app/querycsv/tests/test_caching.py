@@ -0,0 +1,122 @@
+"""
+Export cache tests.
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from core.abstracts.tests import TestsBase
+from querycsv.caching import ExportCache
+
+
+class ExportCacheTests(TestsBase):
+    """Test keeping finished exports on local disk."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache = ExportCache(
+            directory=self.cache_dir.name, max_size=1024, max_age=60
+        )
+
+        return super().setUp()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+        return super().tearDown()
+
+    def create_export(self, content: bytes) -> str:
+        fd, path = tempfile.mkstemp(dir=self.cache_dir.name, suffix=".tmp")
+
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+
+        return path
+
+    def test_put_and_get(self):
+        """Should move exports into the cache, and find them by fingerprint."""
+
+        path = self.cache.put("abc", "buster", "csv", self.create_export(b"id\n1\n"))
+
+        self.assertEqual(self.cache.get("abc", "buster", "csv"), path)
+        self.assertEqual(Path(path).read_bytes(), b"id\n1\n")
+        self.assertIsNone(self.cache.get("def", "buster", "csv"))
+        self.assertIsNone(self.cache.get("abc", "buster", "parquet"))
+
+    def test_open(self):
+        """Should open cached exports, which stay readable once evicted."""
+
+        path = self.cache.put("abc", "buster", "csv", self.create_export(b"id\n1\n"))
+        self.assertIsNone(self.cache.open("def", "buster", "csv"))
+
+        with self.cache.open("abc", "buster", "csv") as f:
+            os.unlink(path)
+            self.assertEqual(f.read(), b"id\n1\n")
+
+        self.assertIsNone(self.cache.open("abc", "buster", "csv"))
+
+        path = self.cache.put("abc", "buster", "csv", self.create_export(b"id\n"))
+        expired = time.time() - 61
+        os.utime(path, (expired, expired))
+
+        self.assertIsNone(self.cache.open("abc", "buster", "csv"))
+        self.assertFalse(os.path.exists(path))
+
+    def test_expired(self):
+        """Should remove exports that haven't been used for max age."""
+
+        path = self.cache.put("abc", "buster", "csv", self.create_export(b"id\n"))
+        expired = time.time() - 61
+        os.utime(path, (expired, expired))
+
+        self.assertIsNone(self.cache.get("abc", "buster", "csv"))
+        self.assertFalse(os.path.exists(path))
+
+    def test_evict_least_recently_used(self):
+        """Should remove least recently used exports once the cache is too large."""
+
+        old_path = self.cache.put("a", "buster", "csv", self.create_export(b"a" * 600))
+        old = time.time() - 10
+        os.utime(old_path, (old, old))
+
+        new_path = self.cache.put("b", "buster", "csv", self.create_export(b"b" * 600))
+
+        self.assertFalse(os.path.exists(old_path))
+        self.assertEqual(self.cache.get("b", "buster", "csv"), new_path)
+
+    def test_evict_abandoned_exports(self):
+        """Should remove exports that stopped being written, but keep recent ones."""
+
+        abandoned = self.create_export(b"a" * 100)
+        old = time.time() - self.cache.temp_max_age - 1
+        os.utime(abandoned, (old, old))
+        writing = self.create_export(b"b" * 2000)
+
+        self.cache.put("abc", "buster", "csv", self.create_export(b"id\n"))
+
+        self.assertFalse(os.path.exists(abandoned))
+        self.assertTrue(os.path.exists(writing))
+        self.assertIsNotNone(self.cache.get("abc", "buster", "csv"))
+
+    def test_write_through(self):
+        """Should cache streamed exports once they are finished."""
+
+        lines = self.cache.write_through("abc", "buster", "csv", iter(["id\n", "1\n"]))
+
+        self.assertIsNone(self.cache.get("abc", "buster", "csv"))
+        self.assertListEqual(list(lines), ["id\n", "1\n"])
+        self.assertEqual(
+            Path(self.cache.get("abc", "buster", "csv")).read_text(), "id\n1\n"
+        )
+
+    def test_write_through_cancelled(self):
+        """Should not cache exports that weren't fully streamed."""
+
+        lines = self.cache.write_through("abc", "buster", "csv", iter(["id\n", "1\n"]))
+        next(lines)
+        lines.close()
+
+        self.assertIsNone(self.cache.get("abc", "buster", "csv"))
+        self.assertListEqual(os.listdir(self.cache_dir.name), [])
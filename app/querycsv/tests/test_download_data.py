@@ -2,12 +2,77 @@
 CSV Download Tests
 """
 
+import io
+import math
+import zipfile
+from datetime import timedelta
+from unittest.mock import patch
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.contrib.admin import AdminSite
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core import mail, signing
+from django.http import FileResponse, QueryDict, StreamingHttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+
+from core.abstracts.admin import ModelAdminBase
+from core.mock.models import Buster, BusterTag
+from core.mock.serializers import BusterCsvSerializer
+from querycsv.models import (
+    BundleFormat,
+    CsvUploadStatus,
+    ExportFormat,
+    QueryCsvBundleJob,
+    QueryCsvDownloadJob,
+    QueryCsvExportProfile,
+    QueryCsvTombstone,
+    dump_query,
+)
+from querycsv.serializers import CsvModelSerializer
+from querycsv.services import QueryCsvService
+from querycsv.signals import (
+    clear_profiled_content_types,
+    get_profiled_content_type_ids,
+)
+from querycsv.tasks import (
+    export_profile_task,
+    process_bundle_job_task,
+    process_download_job_task,
+)
 from querycsv.tests.utils import (
     CsvDataM2MTestsBase,
     CsvDataM2OTestsBase,
     DownloadCsvTestsBase,
 )
-from utils.helpers import clean_list
+from users.tests.utils import create_test_adminuser
+from utils.helpers import clean_list, get_import_path
+
+
+class BusterAdmin(ModelAdminBase):
+    """Admin used to test csv actions."""
+
+    csv_serializer_class = BusterCsvSerializer
+
+
+class BusterTagNestedSerializer(CsvModelSerializer):
+    """Nested tag, used to test exporting nested objects."""
+
+    class Meta:
+        model = BusterTag
+        fields = ["id", "name"]
+
+
+class BusterNestedCsvSerializer(BusterCsvSerializer):
+    """Buster with its tag as a nested object."""
+
+    one_tag_detail = BusterTagNestedSerializer(source="one_tag", read_only=True)
+
+    class Meta(BusterCsvSerializer.Meta):
+        fields = [*BusterCsvSerializer.Meta.fields, "one_tag_detail"]
 
 
 class DownloadDataTests(DownloadCsvTestsBase):
@@ -38,6 +103,503 @@ class DownloadDataTests(DownloadCsvTestsBase):
         # Verify contact fields in csv
         self.assertCsvHasFields(df)
 
+    def test_stream_model_csv(self):
+        """Should stream csv lines for queryset, loading objects in chunks."""
+
+        self.initialize_dataset()
+        qs = self.repo.all()
+
+        lines = list(self.service.stream_csv(queryset=qs, chunk_size=2))
+        self.assertLength(lines, self.dataset_size + 1)
+
+        df = pd.read_csv(io.StringIO("".join(lines)), dtype=str).fillna("")
+        self.assertEqual(len(df.index), self.dataset_size)
+        self.assertCountEqual(list(df.columns), self.serializer.readable_fields)
+        self.assertCsvHasFields(df)
+
+    def test_export_plan(self):
+        """Should join single relations, and prefetch many relations."""
+
+        select, prefetch = self.service.get_export_plan()
+
+        self.assertListEqual(select, ["one_tag"])
+        self.assertListEqual(prefetch, ["many_tags"])
+
+    def test_download_cached(self):
+        """Should serve identical exports from the cache until objects change."""
+
+        self.initialize_dataset()
+        qs = self.repo.all()
+
+        filepath = self.service.download(qs)
+
+        with patch.object(self.service, "download_csv", side_effect=AssertionError):
+            self.assertEqual(self.service.download(qs), filepath)
+            self.assertEqual(self.service.get_cached_download(qs), filepath)
+
+        self.assertNotEqual(self.service.download(qs.filter(id__gt=1)), filepath)
+        self.assertNotEqual(
+            self.service.download(qs, file_format=ExportFormat.PARQUET), filepath
+        )
+
+        obj = self.repo.first()
+        obj.name = "Changed"
+        obj.save()
+        self.assertIsNone(self.service.get_cached_download(qs))
+
+        changed_filepath = self.service.download(qs)
+        self.repo.filter(id=obj.id).delete()
+        self.assertIsNone(self.service.get_cached_download(qs))
+        self.assertNotEqual(self.service.download(qs), changed_filepath)
+
+    def test_admin_download_csv_cached(self):
+        """Admin action should cache streamed csvs, and serve them after."""
+
+        self.initialize_dataset()
+        model_admin = BusterAdmin(Buster, AdminSite())
+        request = RequestFactory().get("/")
+
+        res = model_admin.download_csv(request, self.repo.all())
+        self.assertIsInstance(res, StreamingHttpResponse)
+        content = b"".join(res.streaming_content)
+
+        # Cache hits only query the fingerprint
+        with self.assertNumQueries(1):
+            res = model_admin.download_csv(request, self.repo.all())
+
+        self.assertIsInstance(res, FileResponse)
+        self.assertEqual(b"".join(res.streaming_content), content)
+
+    def test_admin_download_evicted(self):
+        """Admin action should export again if the file is evicted before it's opened."""
+
+        self.initialize_dataset()
+        model_admin = BusterAdmin(Buster, AdminSite())
+        request = RequestFactory().get("/")
+
+        with patch(
+            "querycsv.services.export_cache.put", return_value="/missing.parquet"
+        ):
+            res = model_admin.download_parquet(request, self.repo.all())
+
+        self.assertIsInstance(res, FileResponse)
+        table = pq.read_table(io.BytesIO(b"".join(res.streaming_content)))
+        self.assertEqual(table.num_rows, self.dataset_size)
+
+    def test_export_columns(self):
+        """Columns should come from the serializer, not the first exported row."""
+
+        untagged = self.repo.create(name="Untagged")
+        tagged = self.repo.create(
+            name="Tagged", one_tag=BusterTag.objects.create(name="Tag")
+        )
+        qs = self.repo.filter(id__in=[untagged.id, tagged.id]).order_by("id")
+        svc = QueryCsvService(BusterNestedCsvSerializer)
+
+        columns = svc.get_export_columns()
+        self.assertIn("one_tag_detail.id", columns)
+        self.assertIn("one_tag_detail.name", columns)
+
+        lines = list(svc.stream_csv(queryset=qs))
+        df = pd.read_csv(io.StringIO("".join(lines)), dtype=str).fillna("")
+        self.assertListEqual(list(df.columns), columns)
+        self.assertListEqual(list(df["one_tag_detail.name"]), ["", "Tag"])
+
+        schema, batches = svc.iter_record_batches(qs)
+        self.assertListEqual(schema.names, columns)
+        table = pa.Table.from_batches(list(batches), schema=schema)
+        self.assertListEqual(
+            table.column("one_tag_detail.name").to_pylist(), [None, "Tag"]
+        )
+
+    def test_stream_empty_csv(self):
+        """Should only include header if queryset is empty."""
+
+        lines = list(self.service.stream_csv(queryset=self.repo.none()))
+
+        self.assertLength(lines, 1)
+        self.assertEqual(lines[0].strip(), ",".join(self.service.get_export_columns()))
+
+    def test_admin_download_csv(self):
+        """Admin action should return a streaming csv response."""
+
+        self.initialize_dataset()
+        model_admin = BusterAdmin(Buster, AdminSite())
+        request = RequestFactory().get("/")
+
+        res = model_admin.download_csv(request, self.repo.all())
+
+        self.assertIsInstance(res, StreamingHttpResponse)
+        self.assertEqual(res["Content-Type"], "text/csv")
+
+        content = b"".join(res.streaming_content).decode()
+        df = pd.read_csv(io.StringIO(content), dtype=str).fillna("")
+        self.assertEqual(len(df.index), self.dataset_size)
+        self.assertCsvHasFields(df)
+
+    def test_download_parquet(self):
+        """Should write queryset to parquet in row groups, keeping types."""
+
+        self.initialize_dataset()
+        qs = self.repo.all()
+
+        filepath = self.service.download_parquet(queryset=qs, chunk_size=2)
+
+        parquet_file = pq.ParquetFile(filepath)
+        self.assertEqual(
+            parquet_file.metadata.num_row_groups, math.ceil(self.dataset_size / 2)
+        )
+
+        table = parquet_file.read()
+        self.assertEqual(table.num_rows, self.dataset_size)
+        self.assertEqual(table.schema.field("id").type, pa.int64())
+        self.assertEqual(table.schema.field("created_at").type, pa.timestamp("us"))
+        self.assertCountEqual(
+            table.column("id").to_pylist(), qs.values_list("id", flat=True)
+        )
+
+    def test_download_arrow(self):
+        """Should write queryset to an arrow ipc file."""
+
+        self.initialize_dataset()
+        qs = self.repo.all()
+
+        filepath = self.service.download_arrow(queryset=qs, chunk_size=2)
+
+        with pa.memory_map(filepath) as source:
+            table = pa.ipc.open_file(source).read_all()
+
+        self.assertEqual(table.num_rows, self.dataset_size)
+        self.assertCountEqual(table.column_names, self.serializer.readable_fields)
+
+    def test_download_empty_parquet(self):
+        """Should write schema with all fields if queryset is empty."""
+
+        filepath = self.service.download_parquet(queryset=self.repo.none())
+        table = pq.read_table(filepath)
+
+        self.assertEqual(table.num_rows, 0)
+        self.assertListEqual(table.column_names, self.service.all_fields)
+
+    def test_admin_download_parquet(self):
+        """Admin action should return parquet file as an attachment."""
+
+        self.initialize_dataset()
+        model_admin = BusterAdmin(Buster, AdminSite())
+        request = RequestFactory().get("/")
+
+        res = model_admin.download_parquet(request, self.repo.all())
+
+        self.assertIsInstance(res, FileResponse)
+        self.assertIn("buster.parquet", res["Content-Disposition"])
+
+        table = pq.read_table(io.BytesIO(b"".join(res.streaming_content)))
+        self.assertEqual(table.num_rows, self.dataset_size)
+
+    def test_download_job(self):
+        """Should export queryset saved on a download job, and notify admin."""
+
+        self.initialize_dataset()
+        qs = self.repo.filter(id__in=self.repo.values("id")[:3]).order_by("-id")
+
+        job = QueryCsvDownloadJob.objects.create(
+            serializer_class=self.serializer_class,
+            queryset=qs,
+            file_format=ExportFormat.PARQUET,
+            notify_email="admin@example.com",
+        )
+
+        # Filters are saved instead of loading every object
+        job.refresh_from_db()
+        self.assertNotIn("pks", job.query)
+        self.assertListEqual(list(job.queryset), list(qs))
+
+        # Queries that weren't signed by the app aren't loaded
+        job.query["query"] = job.query["query"][:-1]
+        with self.assertRaises(signing.BadSignature):
+            job.queryset
+
+        job.query = dump_query(qs, pks=[obj.id for obj in qs])
+        job.save()
+        self.assertListEqual(list(job.queryset), list(qs))
+
+        process_download_job_task.delay(job.id)
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, CsvUploadStatus.SUCCESS)
+        self.assertEqual(job.row_count, 3)
+        self.assertEqual(job.rows_processed, 3)
+        self.assertEqual(pq.read_table(job.file.path).num_rows, 3)
+        self.assertLength(mail.outbox, 1)
+        self.assertIn(job.file.url, mail.outbox[0].body)
+
+    def test_admin_download_enqueues_job(self):
+        """Admin action should create a download job for large selections."""
+
+        self.initialize_dataset()
+        model_admin = BusterAdmin(Buster, AdminSite())
+        request = RequestFactory().get("/")
+        request.user = create_test_adminuser()
+        request.session = {}
+        request._messages = FallbackStorage(request)
+
+        with patch("core.abstracts.admin.QUERYCSV_EXPORT_ASYNC_THRESHOLD", 1):
+            res = model_admin.download_csv(request, self.repo.all())
+
+        self.assertIsNone(res)
+
+        job = QueryCsvDownloadJob.objects.get()
+        self.assertIn("query", job.query)
+        self.assertEqual(job.notify_email, request.user.email)
+        self.assertEqual(job.file_format, ExportFormat.CSV)
+        self.assertEqual(job.status, CsvUploadStatus.SUCCESS)
+
+        # Checked objects are saved by id
+        ids = [str(obj.id) for obj in self.repo.all()[:3]]
+        request.POST = QueryDict(mutable=True)
+        request.POST.setlist("_selected_action", ids)
+
+        with patch("core.abstracts.admin.QUERYCSV_EXPORT_ASYNC_THRESHOLD", 1):
+            model_admin.download_csv(request, self.repo.filter(id__in=ids))
+
+        job = QueryCsvDownloadJob.objects.latest("id")
+        self.assertListEqual(job.query["pks"], ids)
+        self.assertEqual(job.row_count, 3)
+
+
+class BundleExportTests(DownloadCsvTestsBase):
+    """Unit tests for exporting several querysets to one file."""
+
+    def get_sheets(self):
+        first_ids = self.repo.order_by("id").values("id")[:3]
+
+        return [
+            ("All", self.serializer_class, self.repo.all()),
+            ("First/Three", self.serializer_class, self.repo.filter(id__in=first_ids)),
+            ("Empty", self.serializer_class, self.repo.none()),
+        ]
+
+    def test_download_bundle_xlsx(self):
+        """Should write each queryset to its own sheet of a workbook."""
+
+        self.initialize_dataset()
+
+        filepath = QueryCsvService.download_bundle(self.get_sheets())
+        sheets = pd.read_excel(
+            filepath, sheet_name=None, dtype=str, keep_default_na=False
+        )
+
+        self.assertListEqual(list(sheets.keys()), ["All", "FirstThree", "Empty"])
+        self.assertEqual(len(sheets["All"].index), self.dataset_size)
+        self.assertEqual(len(sheets["FirstThree"].index), 3)
+        self.assertEqual(len(sheets["Empty"].index), 0)
+        self.assertCountEqual(sheets["Empty"].columns, self.serializer.readable_fields)
+        self.assertListEqual(list(sheets["All"].columns), list(sheets["Empty"].columns))
+        self.assertCsvHasFields(sheets["All"])
+
+    def test_download_bundle_zip(self):
+        """Should write each queryset to its own csv in a zip file."""
+
+        self.initialize_dataset()
+
+        filepath = QueryCsvService.download_bundle(
+            self.get_sheets(), file_format=BundleFormat.ZIP
+        )
+
+        with zipfile.ZipFile(filepath) as zf:
+            self.assertListEqual(
+                zf.namelist(), ["All.csv", "FirstThree.csv", "Empty.csv"]
+            )
+            df = pd.read_csv(zf.open("All.csv"), dtype=str, keep_default_na=False)
+
+        self.assertEqual(len(df.index), self.dataset_size)
+        self.assertCsvHasFields(df)
+
+    def test_bundle_job(self):
+        """Should export every sheet of a bundle job, and notify admin."""
+
+        self.initialize_dataset()
+
+        job = QueryCsvBundleJob.objects.create(
+            name="busters",
+            sheets=self.get_sheets(),
+            notify_email="admin@example.com",
+        )
+        self.assertListEqual(
+            [sheet.name for sheet in job.sheets.all()], ["All", "First/Three", "Empty"]
+        )
+
+        process_bundle_job_task.delay(job.id)
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, CsvUploadStatus.SUCCESS)
+        self.assertEqual(job.row_count, self.dataset_size + 3)
+        self.assertEqual(job.rows_processed, self.dataset_size + 3)
+        self.assertLength(
+            pd.read_excel(job.file.path, sheet_name=None).keys(), len(self.get_sheets())
+        )
+        self.assertLength(mail.outbox, 1)
+        self.assertIn(job.file.url, mail.outbox[0].body)
+
+
+class IncrementalExportTests(DownloadCsvTestsBase):
+    """Unit tests for exporting objects changed since the last export."""
+
+    def tearDown(self):
+        # Disconnects tombstone receivers, which aren't reset between tests
+        QueryCsvExportProfile.objects.all().delete()
+
+        return super().tearDown()
+
+    @patch("querycsv.models.QUERYCSV_EXPORT_WATERMARK_OVERLAP", 0)
+    def test_export_profile_changes(self):
+        """Should export changed objects and deletions after the watermark."""
+
+        self.initialize_dataset()
+        profile = QueryCsvExportProfile.objects.create(
+            name="nightly", serializer_class=self.serializer_class
+        )
+        self.assertEqual(profile.content_type.model_class(), Buster)
+
+        export_profile_task.delay(profile.id)
+        profile.refresh_from_db()
+
+        self.assertEqual(profile.rows_exported, self.dataset_size)
+        self.assertEqual(len(pd.read_csv(profile.file.path).index), self.dataset_size)
+        self.assertIsNotNone(profile.watermark)
+
+        # Change one object, and delete another
+        changed, deleted = self.repo.all()[:2]
+        changed.name = "Changed"
+        changed.save()
+        deleted_id = deleted.id
+        deleted.delete()
+        self.assertEqual(QueryCsvTombstone.objects.count(), 1)
+
+        export_profile_task.delay(profile.id)
+        profile.refresh_from_db()
+
+        df = pd.read_csv(profile.file.path)
+        self.assertListEqual(list(df["id"]), [changed.id])
+        self.assertListEqual(list(df["name"]), ["Changed"])
+
+        deleted_df = pd.read_csv(profile.deleted_file.path)
+        self.assertListEqual(list(deleted_df["id"]), [deleted_id])
+        self.assertEqual(profile.rows_deleted, 1)
+
+        # Tombstones exported by every profile are removed
+        self.assertEqual(QueryCsvTombstone.objects.count(), 0)
+
+    @patch("querycsv.models.QUERYCSV_EXPORT_WATERMARK_OVERLAP", 0)
+    def test_export_profile_parquet(self):
+        """Should export deletions in the profile's format."""
+
+        self.initialize_dataset()
+        profile = QueryCsvExportProfile.objects.create(
+            name="lake",
+            serializer_class=self.serializer_class,
+            file_format=ExportFormat.PARQUET,
+            watermark=timezone.now(),
+        )
+        self.repo.first().delete()
+
+        export_profile_task.delay(profile.id)
+        profile.refresh_from_db()
+
+        self.assertEqual(pq.read_table(profile.file.path).num_rows, 0)
+        self.assertEqual(pq.read_table(profile.deleted_file.path).num_rows, 1)
+
+    def test_changed_queryset_uses_updated_at(self):
+        """Changed objects should be filtered and ordered by indexed updated_at."""
+
+        profile = QueryCsvExportProfile.objects.create(
+            name="sync",
+            serializer_class=self.serializer_class,
+            watermark=timezone.now(),
+        )
+        sql = str(profile.get_changed_queryset(timezone.now()).query)
+
+        self.assertTrue(Buster._meta.get_field("updated_at").db_index)
+        self.assertIn('"updated_at" >', sql)
+        table = Buster._meta.db_table
+        self.assertIn(f'ORDER BY "{table}"."updated_at" ASC', sql)
+
+    def test_export_profile_overlap(self):
+        """Should export changes committed late, with times before the watermark."""
+
+        self.initialize_dataset()
+        profile = QueryCsvExportProfile.objects.create(
+            name="nightly", serializer_class=self.serializer_class
+        )
+        export_profile_task.delay(profile.id)
+        profile.refresh_from_db()
+
+        # Saved before the last export started, but committed after
+        late = self.repo.first()
+        self.repo.filter(id=late.id).update(
+            name="Late", updated_at=profile.watermark - timedelta(seconds=1)
+        )
+        self.repo.exclude(id=late.id).update(
+            updated_at=profile.watermark - timedelta(days=1)
+        )
+
+        export_profile_task.delay(profile.id)
+        profile.refresh_from_db()
+
+        df = pd.read_csv(profile.file.path)
+        self.assertListEqual(list(df["id"]), [late.id])
+        self.assertListEqual(list(df["name"]), ["Late"])
+
+    def test_delete_without_profile(self):
+        """Deleting objects without export profiles should not record tombstones."""
+
+        self.initialize_dataset()
+        self.repo.first().delete()
+        self.assertEqual(QueryCsvTombstone.objects.count(), 0)
+
+        # Tombstones stop once the model's last profile is removed
+        profile = QueryCsvExportProfile.objects.create(
+            name="nightly", serializer_class=self.serializer_class
+        )
+        self.repo.first().delete()
+        self.assertEqual(QueryCsvTombstone.objects.count(), 1)
+
+        profile.delete()
+        self.repo.first().delete()
+        self.assertEqual(QueryCsvTombstone.objects.count(), 1)
+
+    def test_profile_cache_expires(self):
+        """Profiles saved by other processes should be found once the cache expires."""
+
+        self.initialize_dataset()
+        clear_profiled_content_types()
+
+        # Queried once in a savepoint, then cached
+        with self.assertNumQueries(3):
+            self.assertSetEqual(get_profiled_content_type_ids(), set())
+            self.assertSetEqual(get_profiled_content_type_ids(), set())
+
+        # Saved without signals, like a profile saved by another process
+        QueryCsvExportProfile.objects.bulk_create(
+            [
+                QueryCsvExportProfile(
+                    name="other",
+                    serializer=get_import_path(self.serializer_class),
+                    content_type=ContentType.objects.get_for_model(Buster),
+                )
+            ]
+        )
+
+        self.repo.first().delete()
+        self.assertEqual(QueryCsvTombstone.objects.count(), 0)
+
+        with patch("querycsv.signals.QUERYCSV_PROFILE_CACHE_TTL", 0):
+            clear_profiled_content_types()
+            get_profiled_content_type_ids()
+
+        self.repo.first().delete()
+        self.assertEqual(QueryCsvTombstone.objects.count(), 1)
+
 
 class DownloadCsvM2OFieldsTests(DownloadCsvTestsBase, CsvDataM2OTestsBase):
     """Unit tests for testing downloaded csv many-to-one fields."""
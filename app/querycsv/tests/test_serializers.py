@@ -0,0 +1,104 @@
+"""
+Flat serializer tests.
+"""
+
+from unittest.mock import patch
+
+from core.abstracts.tests import TestsBase
+from core.mock.serializers import BusterCsvSerializer
+from querycsv.serializers import CsvModelSerializer, FlatSchema
+
+
+class FlatSchemaTests(TestsBase):
+    """Test compiled flat schema for serializers."""
+
+    serializer_class = BusterCsvSerializer
+
+    def test_schema_cached_per_class(self):
+        """Should build schema once for each serializer class."""
+
+        schema = self.serializer_class.get_schema()
+
+        self.assertIsInstance(schema, FlatSchema)
+        self.assertIs(self.serializer_class.get_schema(), schema)
+        self.assertNotIn("_flat_schema", CsvModelSerializer.__dict__)
+
+    def test_schema_fields(self):
+        """Should match fields computed from the serializer's DRF fields."""
+
+        serializer = self.serializer_class()
+        fields = serializer.get_fields()
+
+        self.assertListEqual(serializer.all_fields, list(fields.keys()))
+        self.assertIn("unique_name", serializer.unique_fields)
+        self.assertIn("name", serializer.required_fields)
+        self.assertNotIn("id", serializer.writable_fields)
+        self.assertListEqual(
+            sorted(serializer.writable_many_related_fields),
+            ["many_tags", "many_tags_int"],
+        )
+
+    def test_flat_to_json_uses_schema(self):
+        """Should convert rows without building new serializers."""
+
+        self.serializer_class.get_schema()
+
+        with patch.object(
+            self.serializer_class, "get_fields", side_effect=AssertionError
+        ):
+            parsed = self.serializer_class.flat_to_json(
+                {"name": "John", "many_tags": "one, two", "items[1].name": "Doe"}
+            )
+
+        self.assertEqual(parsed["name"], "John")
+        self.assertListEqual(parsed["many_tags"], ["one", "two"])
+        self.assertListEqual(parsed["items"], [{"name": "Doe"}])
+
+    def test_flat_fields_copied(self):
+        """Changes to flat fields should not change the cached schema."""
+
+        serializer = self.serializer_class()
+        flat_fields = serializer.get_flat_fields()
+        flat_fields["name"].key = "changed"
+
+        self.assertEqual(serializer.get_flat_fields()["name"].key, "name")
+
+
+class PrevalidateRecordsTests(TestsBase):
+    """Test validating rows without the database."""
+
+    serializer_class = BusterCsvSerializer
+
+    def test_prevalidate_records(self):
+        """Should validate local fields, and skip related and unique fields."""
+
+        records = [
+            {"name": "John", "unique_name": "john", "many_tags": "one, two"},
+            {"unique_name": "jane"},
+        ]
+
+        with self.assertNumQueries(0):
+            results = self.serializer_class.prevalidate_records(records)
+
+        data, validated, errors = results[0]
+        self.assertListEqual(data["many_tags"], ["one", "two"])
+        self.assertEqual(validated["name"], "John")
+        self.assertNotIn("unique_name", validated)
+        self.assertNotIn("many_tags", validated)
+        self.assertEqual(len(errors), 0)
+
+        _, _, errors = results[1]
+        self.assertIn("name", errors)
+
+    def test_prevalidated_serializer(self):
+        """Should use prevalidated values instead of validating fields again."""
+
+        data, validated, _ = self.serializer_class.prevalidate_records(
+            [{"name": "John", "unique_name": "john"}]
+        )[0]
+        validated["name"] = "Prevalidated"
+
+        serializer = self.serializer_class(data=data, prevalidated=validated)
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data["name"], "Prevalidated")
@@ -0,0 +1,141 @@
+"""
+Staging cache tests.
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+from core.abstracts.tests import TestsBase
+from querycsv.models import CsvUploadStatus, QueryCsvUploadJob
+from querycsv.staging import StagingCache
+from querycsv.tasks import process_csv_job_task
+from querycsv.tests.utils import RemoteStorage, UploadCsvTestsBase
+
+
+class StagingCacheTests(TestsBase):
+    """Test caching remote files on local disk."""
+
+    def setUp(self):
+        self.storage_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.storage = RemoteStorage(location=self.storage_dir.name)
+        self.cache = StagingCache(directory=self.cache_dir.name, max_size=1024)
+
+        return super().setUp()
+
+    def tearDown(self):
+        self.storage_dir.cleanup()
+        self.cache_dir.cleanup()
+
+        return super().tearDown()
+
+    def test_download_once(self):
+        """Should download a file once, and read it from disk after."""
+
+        name = self.storage.save("data.csv", ContentFile(b"name\nJohn\n"))
+
+        with patch.object(self.storage, "_open", wraps=self.storage._open) as mock:
+            path = self.cache.get_path(self.storage, name)
+            self.assertEqual(self.cache.get_path(self.storage, name), path)
+
+        self.assertEqual(mock.call_count, 1)
+        self.assertTrue(path.endswith(".csv"))
+        self.assertEqual(Path(path).read_bytes(), b"name\nJohn\n")
+
+    def test_changed_file(self):
+        """Should download a file again if it changed in storage."""
+
+        name = self.storage.save("data.csv", ContentFile(b"name\nJohn\n"))
+        path = self.cache.get_path(self.storage, name)
+
+        self.storage.delete(name)
+        self.storage.save(name, ContentFile(b"name\nJane Doe\n"))
+        new_path = self.cache.get_path(self.storage, name)
+
+        self.assertNotEqual(new_path, path)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(Path(new_path).read_bytes(), b"name\nJane Doe\n")
+
+    def test_evict_least_recently_used(self):
+        """Should remove least recently used files when the cache is full."""
+
+        names = [
+            self.storage.save(f"data-{i}.csv", ContentFile(b"x" * 400))
+            for i in range(3)
+        ]
+        first = self.cache.get_path(self.storage, names[0])
+        second = self.cache.get_path(self.storage, names[1])
+        os.utime(first, (1, 1))
+        os.utime(second, (2, 2))
+
+        # Using the first file makes the second the least recently used
+        self.cache.get_path(self.storage, names[0])
+        third = self.cache.get_path(self.storage, names[2])
+
+        self.assertTrue(os.path.exists(first))
+        self.assertFalse(os.path.exists(second))
+        self.assertTrue(os.path.exists(third))
+
+    def test_evict_keeps_downloads_in_progress(self):
+        """Should not remove files that another process is still downloading."""
+
+        fd, downloading = tempfile.mkstemp(dir=self.cache_dir.name, suffix=".tmp")
+        os.write(fd, b"x" * 2000)
+        os.close(fd)
+
+        fd, abandoned = tempfile.mkstemp(dir=self.cache_dir.name, suffix=".tmp")
+        os.close(fd)
+        old = time.time() - self.cache.temp_max_age - 1
+        os.utime(abandoned, (old, old))
+
+        name = self.storage.save("data.csv", ContentFile(b"x" * 400))
+        path = self.cache.get_path(self.storage, name)
+
+        self.assertTrue(os.path.exists(downloading))
+        self.assertFalse(os.path.exists(abandoned))
+        self.assertTrue(os.path.exists(path))
+
+    def test_local_storage(self):
+        """Should use the path of files in local storage, without copying them."""
+
+        storage = FileSystemStorage(location=self.storage_dir.name)
+        name = storage.save("data.csv", ContentFile(b"name\n"))
+
+        self.assertEqual(self.cache.get_path(storage, name), storage.path(name))
+        self.assertListEqual(os.listdir(self.cache_dir.name), [])
+
+
+class StagedUploadJobTests(UploadCsvTestsBase):
+    """Test processing upload jobs with files in remote storage."""
+
+    def test_process_remote_job(self):
+        """Should download the job's file once while processing it."""
+
+        self.initialize_csv_data()
+
+        with tempfile.TemporaryDirectory() as storage_dir:
+            storage = RemoteStorage(location=storage_dir)
+            field = QueryCsvUploadJob._meta.get_field("file")
+
+            with (
+                patch.object(field, "storage", storage),
+                patch.object(storage, "_open", wraps=storage._open) as mock,
+            ):
+                job = QueryCsvUploadJob.objects.create(
+                    serializer_class=self.serializer_class, filepath=self.filepath
+                )
+                self.assertIsNone(job.row_count)
+
+                process_csv_job_task.delay(job.id)
+
+            job.refresh_from_db()
+            self.assertEqual(job.row_count, self.dataset_size)
+            self.assertEqual(mock.call_count, 1)
+            self.assertEqual(job.status, CsvUploadStatus.SUCCESS)
+            self.assertEqual(job.rows_succeeded, self.dataset_size)
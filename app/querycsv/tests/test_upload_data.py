@@ -2,11 +2,27 @@
 Import/upload data tests.
 """
 
-from django.contrib.postgres.aggregates import StringAgg
-from django.db import models
+import math
+import multiprocessing
+from unittest.mock import patch
 
-from querycsv.models import QueryCsvUploadJob
-from querycsv.services import QueryCsvService
+import pandas as pd
+import pyarrow as pa
+from django.contrib.postgres.aggregates import StringAgg
+from django.core import mail
+from django.db import connection, connections, models
+from django.test.utils import CaptureQueriesContext
+
+from core.mock.models import BusterTag
+from lib.spreadsheets import (
+    count_spreadsheet_rows,
+    index_spreadsheet_rows,
+    read_spreadsheet,
+    read_spreadsheet_chunks,
+)
+from querycsv.models import CsvUploadStatus, QueryCsvRowHash, QueryCsvUploadJob
+from querycsv.services import QueryCsvService, _get_validation_pool
+from querycsv.tasks import process_csv_job_task, upload_job_rows
 from querycsv.tests.utils import (
     CsvDataM2MTestsBase,
     CsvDataM2OTestsBase,
@@ -289,3 +305,821 @@ class UploadCsvM2MFieldsTests(UploadCsvTestsBase, CsvDataM2MTestsBase):
         )
 
         self.assertObjectsM2MValidFields(self.df, objects_before)
+
+
+class UploadCsvBulkTests(UploadCsvTestsBase, CsvDataM2MTestsBase):
+    """Test uploading csvs using bulk upsert mode."""
+
+    def test_bulk_create_objects(self):
+        """Should create objects from csv in bulk."""
+
+        objects_before = self.initialize_csv_data()
+
+        success, failed = self.service.upload_csv(path=self.filepath, bulk=True)
+
+        self.assertLength(success, self.dataset_size)
+        self.assertLength(failed, 0)
+        self.assertObjectsExist(objects_before, failed)
+        self.assertObjectsHaveFields(objects_before)
+        self.assertObjectsM2MValidFields(self.df)
+
+    def test_bulk_update_objects(self):
+        """Should update existing objects from csv in bulk."""
+
+        objects_before = self.initialize_csv_data(clear_db=False)
+
+        for obj in self.repo.all():
+            self.update_mock_object(obj)
+
+        self.service.upload_csv(path=self.filepath, bulk=True)
+
+        self.assertObjectsExist(objects_before)
+        self.assertObjectsHaveFields(objects_before)
+        self.assertObjectsM2MValidFields(self.df)
+
+    def test_bulk_upload_batches_queries(self):
+        """Should insert objects with one query per batch."""
+
+        self.initialize_csv_data()
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.service.upload_csv(path=self.filepath, bulk=True, batch_size=2)
+
+        table = self.model_class._meta.db_table
+        inserts = [
+            q for q in ctx.captured_queries if f'INSERT INTO "{table}" ' in q["sql"]
+        ]
+        lookups = [
+            q
+            for q in ctx.captured_queries
+            if q["sql"].startswith("SELECT") and f'FROM "{table}" ' in q["sql"]
+        ]
+
+        batch_count = math.ceil(self.dataset_size / 2)
+        self.assertLength(inserts, batch_count)
+        max_lookups = batch_count * (len(self.service.unique_fields) + 1)
+        self.assertTrue(len(lookups) <= max_lookups)
+
+    def test_bulk_duplicate_rows(self):
+        """Rows with the same unique value should update the same object."""
+
+        unique_name = "duplicate-name"
+        self.data_to_csv(
+            [
+                {"name": "First", "unique_name": unique_name},
+                {"name": "Second", "unique_name": unique_name},
+            ]
+        )
+
+        success, failed = self.service.upload_csv(path=self.filepath, bulk=True)
+
+        self.assertLength(success, 2)
+        self.assertLength(failed, 0)
+        self.assertObjectsCount(1)
+        self.assertEqual(self.repo.get(unique_name=unique_name).name, "Second")
+
+    def test_bulk_upload_errors(self):
+        """Invalid rows should be reported without stopping the upload."""
+
+        self.data_to_csv(
+            [
+                {"name": "Valid", "unique_name": "valid-name"},
+                {"name": "", "unique_name": "invalid-name"},
+            ]
+        )
+
+        success, failed = self.service.upload_csv(path=self.filepath, bulk=True)
+
+        self.assertLength(success, 1)
+        self.assertLength(failed, 1)
+        self.assertIn("errors", failed[0].keys())
+        self.assertIn("name", failed[0]["errors"].keys())
+        self.assertObjectsCount(1)
+
+    def test_bulk_upload_conflict(self):
+        """Rows that fail the bulk write should be reported, and the others saved."""
+
+        self.repo.create(name="Existing", unique_name="taken-name")
+        self.data_to_csv(
+            [
+                {"name": "Valid", "unique_name": "valid-name"},
+                {"name": "Conflict", "unique_name": "taken-name"},
+            ]
+        )
+
+        # Object is created by another upload after rows are resolved
+        with patch.object(
+            QueryCsvService, "_resolve_instances", return_value=([[], []], {})
+        ):
+            success, failed = self.service.upload_csv(path=self.filepath, bulk=True)
+
+        self.assertLength(success, 1)
+        self.assertLength(failed, 1)
+        self.assertEqual(failed[0]["unique_name"], "taken-name")
+        self.assertIn("unique_name", failed[0]["errors"].keys())
+        self.assertEqual(self.repo.get(unique_name="taken-name").name, "Existing")
+        self.assertTrue(self.repo.filter(unique_name="valid-name").exists())
+
+
+class UploadCsvChunksTests(UploadCsvTestsBase):
+    """Test uploading spreadsheets in chunks of rows."""
+
+    dataset_size = 7
+    chunk_size = 3
+
+    def test_upload_csv_chunks(self):
+        """Should process csv in chunks, and create all objects."""
+
+        objects_before = self.initialize_csv_data()
+
+        results = list(
+            self.service.upload_csv_chunks(
+                path=self.filepath, chunk_size=self.chunk_size
+            )
+        )
+
+        self.assertLength(results, math.ceil(self.dataset_size / self.chunk_size))
+
+        for chunk_success, _ in results[:-1]:
+            self.assertLength(chunk_success, self.chunk_size)
+
+        self.assertObjectsExist(objects_before)
+        self.assertObjectsHaveFields(objects_before)
+
+    def test_upload_xlsx_chunks(self):
+        """Should process excel spreadsheet in chunks."""
+
+        objects_before = self.initialize_csv_data()
+        self.filepath = self.filepath.replace(".csv", ".xlsx")
+        self.df.to_excel(self.filepath, index=False)
+
+        chunks = list(read_spreadsheet_chunks(self.filepath, self.chunk_size))
+        self.assertLength(chunks, math.ceil(self.dataset_size / self.chunk_size))
+        self.assertListEqual(list(chunks[0].columns), list(self.df.columns))
+
+        success, failed = self.service.upload_csv(
+            path=self.filepath, chunk_size=self.chunk_size, bulk=True
+        )
+
+        self.assertLength(success, self.dataset_size)
+        self.assertLength(failed, 0)
+        self.assertObjectsExist(objects_before)
+        self.assertObjectsHaveFields(objects_before)
+
+    def test_read_typed_chunks(self):
+        """Should cast columns with a dtype, and keep invalid columns as strings."""
+
+        path = self.filepath
+        pd.DataFrame(
+            {
+                "name": ["Alpha", "Beta", "", "Delta"],
+                "count": ["1", " 2 ", "", "4"],
+                "active": ["true", "false", "", "true"],
+                "bad": ["1", "x", "3", "4"],
+            }
+        ).to_csv(path, index=False)
+        dtypes = {"count": pa.int64(), "active": pa.bool_(), "bad": pa.int64()}
+
+        chunks = list(read_spreadsheet_chunks(path, 3, start=1, dtypes=dtypes))
+        self.assertListEqual([len(df.index) for df in chunks], [3])
+
+        df = chunks[0]
+        self.assertEqual(df["name"].dtype, object)
+        self.assertEqual(df["count"].dtype, pd.ArrowDtype(pa.int64()))
+        self.assertEqual(df["bad"].dtype, object)
+
+        records = self.service.get_records(df)
+        self.assertListEqual(
+            records,
+            [
+                {"name": "Beta", "count": 2, "active": False, "bad": "x"},
+                {"bad": "3"},
+                {"name": "Delta", "count": 4, "active": True, "bad": "4"},
+            ],
+        )
+
+    def test_read_chunks_blank_lines(self):
+        """Should count rows and split ranges by data rows, skipping blank lines."""
+
+        path = self.filepath
+        with open(path, "w") as f:
+            f.write(
+                "name,count\n\nAlpha,1\nBeta,2\n\n\nGamma,3\nDelta,4\n\nEpsilon,5\n"
+            )
+
+        names = ["Alpha", "Beta", "Gamma", "Delta", "Epsilon"]
+        self.assertEqual(count_spreadsheet_rows(path), len(names))
+
+        for dtypes in [None, {"count": pa.int64()}]:
+            ranges = [(0, 2), (2, 4), (4, None)]
+            chunks = [
+                df
+                for start, stop in ranges
+                for df in read_spreadsheet_chunks(
+                    path, 1, start=start, stop=stop, dtypes=dtypes
+                )
+            ]
+
+            self.assertListEqual([name for df in chunks for name in df["name"]], names)
+
+    def test_read_chunks_from_offsets(self):
+        """Should read ranges from the offset of their first row."""
+
+        path = self.filepath
+        with open(path, "w") as f:
+            f.write(
+                'name,count\n\nAlpha,1\n"Be\n\nta",2\n\n\nGamma,3\n"""Delta""",4\n\n'
+                "Epsilon,5\n"
+            )
+
+        names = ["Alpha", "Be\n\nta", "Gamma", '"Delta"', "Epsilon"]
+        offsets = index_spreadsheet_rows(path, 2)
+        self.assertListEqual([row for row, _ in offsets], [0, 2, 4])
+
+        with open(path, "rb") as f:
+            f.seek(offsets[1][1])
+            self.assertEqual(f.readline(), b"Gamma,3\n")
+
+        xlsx_path = path.replace(".csv", ".xlsx")
+        read_spreadsheet(path).to_excel(xlsx_path, index=False)
+        self.assertListEqual(
+            index_spreadsheet_rows(xlsx_path, 2), [(0, 2), (2, 4), (4, 6)]
+        )
+
+        for path, dtypes in [
+            (path, None),
+            (path, {"count": pa.int64()}),
+            (xlsx_path, None),
+        ]:
+            offsets = index_spreadsheet_rows(path, 2)
+            chunks = [
+                df
+                for (start, position), stop in zip(offsets, [2, 4, None])
+                for df in read_spreadsheet_chunks(
+                    path,
+                    1,
+                    start=start,
+                    stop=stop,
+                    dtypes=dtypes,
+                    row_offset=(start, position),
+                )
+            ]
+
+            self.assertListEqual([name for df in chunks for name in df["name"]], names)
+
+        # Rows after the offset are skipped, like without one
+        row_offset = index_spreadsheet_rows(self.filepath, 2)[1]
+        chunks = list(
+            read_spreadsheet_chunks(self.filepath, 5, start=3, row_offset=row_offset)
+        )
+        self.assertListEqual(list(chunks[0]["name"]), names[3:])
+
+    def test_process_job_in_chunks(self):
+        """Should split upload job into ranges of rows, and report all results."""
+
+        objects_before = self.initialize_csv_data()
+
+        job = QueryCsvUploadJob.objects.create(
+            filepath=self.filepath,
+            serializer_class=self.serializer_class,
+            chunk_size=self.chunk_size,
+            max_concurrency=2,
+        )
+        self.assertListEqual(
+            job.get_row_ranges(self.dataset_size), [(0, 3), (3, 6), (6, 7)]
+        )
+
+        process_csv_job_task.delay(job.id)
+
+        job.refresh_from_db()
+        self.assertTrue(job.report)
+
+        # Ranges are read from the offset of their first row
+        self.assertListEqual([row for row, _ in job.row_offsets], [0, 3, 6])
+        self.assertEqual(job.get_row_offset(4), tuple(job.row_offsets[1]))
+        self.assertObjectsExist(objects_before)
+        self.assertObjectsHaveFields(objects_before)
+
+        report = pd.read_excel(job.report.path, sheet_name="Successful")
+        self.assertEqual(len(report.index), self.dataset_size)
+
+    def test_process_job_progress(self):
+        """Should record progress, and only notify once when job is redelivered."""
+
+        self.initialize_csv_data()
+
+        job = QueryCsvUploadJob.objects.create(
+            filepath=self.filepath,
+            serializer_class=self.serializer_class,
+            notify_email="admin@example.com",
+            chunk_size=self.chunk_size,
+        )
+        self.assertEqual(job.status, CsvUploadStatus.PENDING)
+
+        process_csv_job_task.delay(job.id)
+        process_csv_job_task.delay(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, CsvUploadStatus.SUCCESS)
+        self.assertEqual(job.row_count, self.dataset_size)
+        self.assertEqual(job.rows_processed, self.dataset_size)
+        self.assertEqual(job.rows_succeeded, self.dataset_size)
+        self.assertEqual(job.rows_failed, 0)
+        self.assertEqual(job.progress["percent"], 100)
+        self.assertLength(mail.outbox, 1)
+
+    def test_process_job_resume(self):
+        """Should skip rows committed before the task was redelivered."""
+
+        self.initialize_csv_data()
+
+        job = QueryCsvUploadJob.objects.create(
+            filepath=self.filepath,
+            serializer_class=self.serializer_class,
+            chunk_size=self.chunk_size,
+        )
+
+        # Simulate worker crashing after the first range was committed
+        upload_job_rows(job, start=0, stop=self.chunk_size)
+        self.assertEqual(job.rows_processed, self.chunk_size)
+        self.repo.all().delete()
+
+        process_csv_job_task.delay(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, CsvUploadStatus.SUCCESS)
+        self.assertEqual(job.rows_processed, self.dataset_size)
+        self.assertObjectsCount(self.dataset_size - self.chunk_size)
+
+        report = pd.read_excel(job.report.path, sheet_name="Successful")
+        self.assertEqual(len(report.index), self.dataset_size)
+
+    def test_process_job_report(self):
+        """Should stream successful and failed rows into the job report."""
+
+        self.data_to_csv(
+            [
+                {"name": "Valid", "unique_name": "valid-name"},
+                {"name": "", "unique_name": "invalid-name"},
+            ]
+        )
+
+        job = QueryCsvUploadJob.objects.create(
+            filepath=self.filepath,
+            serializer_class=self.serializer_class,
+        )
+        process_csv_job_task.delay(job.id)
+        job.refresh_from_db()
+
+        report = pd.read_excel(job.report.path, sheet_name=None)
+        self.assertListEqual(list(report.keys()), ["Successful", "Failed", "Batches"])
+        self.assertListEqual(list(report["Successful"]["name"]), ["Valid"])
+        self.assertListEqual(list(report["Failed"]["unique_name"]), ["invalid-name"])
+        self.assertIn("errors.name", report["Failed"].columns)
+        self.assertEqual(job.rows_failed, 1)
+
+        batch = report["Batches"].iloc[0]
+        self.assertEqual((batch["start"], batch["stop"]), (0, 2))
+        self.assertEqual((batch["succeeded"], batch["failed"]), (1, 1))
+
+    def test_upload_commits_in_batches(self):
+        """Should commit rows in transactions, and report their boundaries."""
+
+        self.initialize_csv_data()
+        batches = []
+
+        for _ in self.service.upload_csv_chunks(
+            path=self.filepath,
+            chunk_size=self.chunk_size,
+            commit_every=2,
+            on_batch=batches.append,
+        ):
+            pass
+
+        self.assertListEqual(
+            [(batch["start"], batch["stop"]) for batch in batches],
+            [(0, 2), (2, 3), (3, 5), (5, 6), (6, 7)],
+        )
+        self.assertEqual(sum(batch["succeeded"] for batch in batches), 7)
+        self.assertObjectsCount(self.dataset_size)
+
+    def test_upload_failed_row_savepoint(self):
+        """A row that fails in the database should not abort its batch."""
+
+        self.data_to_csv(
+            [
+                {"name": "First", "unique_name": "first"},
+                {"name": "Bad", "unique_name": "bad"},
+                {"name": "Last", "unique_name": "last"},
+            ]
+        )
+        save = self.model_class.save
+
+        def save_or_fail(obj, *args, **kwargs):
+            if obj.name == "Bad":
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1 / 0")
+
+            return save(obj, *args, **kwargs)
+
+        with patch.object(self.model_class, "save", save_or_fail):
+            success, failed = self.service.upload_csv(
+                path=self.filepath, commit_every=3
+            )
+
+        self.assertLength(success, 2)
+        self.assertLength(failed, 1)
+        self.assertEqual(failed[0]["unique_name"], "bad")
+        self.assertIn("non_field_errors", failed[0]["errors"])
+        self.assertObjectsCount(2)
+
+
+class UploadCsvSlugLookupTests(UploadCsvTestsBase):
+    """Test resolving slug related fields once per upload."""
+
+    dataset_size = 20
+
+    def get_payload(self):
+        return [
+            {
+                "name": f"Buster {i}",
+                "unique_name": f"buster-{i}",
+                "one_tag": "Gamma" if i % 2 else "Alpha",
+                "many_tags": "Alpha, Beta",
+            }
+            for i in range(self.dataset_size)
+        ]
+
+    def assertTagQueries(self, queries):
+        table = BusterTag._meta.db_table
+        lookups = [
+            query["sql"]
+            for query in queries
+            if f'"{table}"."name" = ' in query["sql"]
+            or query["sql"].startswith(f'INSERT INTO "{table}" ')
+        ]
+
+        # Tags are created with one query, and rows don't look them up again
+        self.assertLength(lookups, 1)
+        self.assertEqual(BusterTag.objects.count(), 3)
+
+        for obj in self.repo.all():
+            self.assertListEqual(
+                sorted(obj.many_tags.values_list("name", flat=True)),
+                ["Alpha", "Beta"],
+            )
+            self.assertIn(obj.one_tag.name, ["Alpha", "Gamma"])
+
+    def test_upload_resolves_slugs_once(self):
+        """Should preload and create slug related objects for all rows at once."""
+
+        self.data_to_csv(self.get_payload())
+
+        with CaptureQueriesContext(connection) as queries:
+            success, failed = self.service.upload_csv(path=self.filepath)
+
+        self.assertLength(success, self.dataset_size, failed)
+        self.assertTagQueries(queries.captured_queries)
+
+    def test_bulk_upload_resolves_slugs_once(self):
+        """Should share resolved slug objects between rows when uploading in bulk."""
+
+        self.data_to_csv(self.get_payload())
+
+        with CaptureQueriesContext(connection) as queries:
+            success, failed = self.service.upload_csv(path=self.filepath, bulk=True)
+
+        self.assertLength(success, self.dataset_size, failed)
+        self.assertTagQueries(queries.captured_queries)
+
+
+class UploadCsvDryRunTests(UploadCsvTestsBase):
+    """Test validating csvs without writing to the database."""
+
+    dataset_size = 20
+    get_payload = UploadCsvSlugLookupTests.get_payload
+
+    def test_dry_run_writes_nothing(self):
+        """Should report valid and invalid rows without saving objects."""
+
+        payload = self.get_payload()
+        payload[0]["name"] = ""
+        self.data_to_csv(payload)
+
+        with CaptureQueriesContext(connection) as queries:
+            success, failed = self.service.upload_csv(path=self.filepath, dry_run=True)
+
+        self.assertLength(success, self.dataset_size - 1)
+        self.assertLength(failed, 1)
+        self.assertIn("name", failed[0]["errors"].keys())
+        self.assertEqual(success[0]["unique_name"], "buster-1")
+
+        writes = [
+            query["sql"]
+            for query in queries.captured_queries
+            if query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+        ]
+        self.assertLength(writes, 0)
+        self.assertObjectsCount(0)
+        self.assertEqual(BusterTag.objects.count(), 0)
+
+        # Tags are looked up once for all rows
+        table = BusterTag._meta.db_table
+        lookups = [
+            query["sql"]
+            for query in queries.captured_queries
+            if f'FROM "{table}"' in query["sql"]
+        ]
+        self.assertLength(lookups, 1)
+
+    def test_dry_run_existing_objects(self):
+        """Should validate updates to existing objects without changing them."""
+
+        self.data_to_csv(self.get_payload())
+        self.service.upload_csv(path=self.filepath, bulk=True)
+
+        payload = self.get_payload()
+        for row in payload:
+            row["name"] = "Changed"
+            row["many_tags"] = "Delta"
+        self.data_to_csv(payload)
+
+        success, failed = self.service.upload_csv(path=self.filepath, dry_run=True)
+
+        self.assertLength(success, self.dataset_size, failed)
+        self.assertObjectsCount(self.dataset_size)
+        self.assertFalse(self.repo.filter(name="Changed").exists())
+        self.assertFalse(BusterTag.objects.filter(name="Delta").exists())
+
+
+class UploadCsvRowHashTests(UploadCsvTestsBase):
+    """Test skipping rows that haven't changed since the last upload."""
+
+    dataset_size = 20
+    get_payload = UploadCsvSlugLookupTests.get_payload
+
+    def get_model_writes(self, queries):
+        table = self.model_class._meta.db_table
+
+        return [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith(f'UPDATE "{table}" ')
+            or query["sql"].startswith(f'INSERT INTO "{table}" ')
+        ]
+
+    def assertReuploadSkipsRows(self, bulk=False):
+        payload = self.get_payload()
+        self.data_to_csv(payload)
+        saved, _ = self.service.upload_csv(
+            path=self.filepath, bulk=bulk, skip_unchanged=True
+        )
+
+        updated_before = dict(self.repo.values_list("unique_name", "updated_at"))
+        self.assertEqual(QueryCsvRowHash.objects.count(), self.dataset_size)
+
+        payload[3]["name"] = "Changed"
+        self.data_to_csv(payload)
+
+        with CaptureQueriesContext(connection) as queries:
+            success, failed = self.service.upload_csv(
+                path=self.filepath, bulk=bulk, skip_unchanged=True
+            )
+
+        self.assertLength(success, self.dataset_size, failed)
+        self.assertEqual(self.repo.get(unique_name="buster-3").name, "Changed")
+
+        # Skipped rows are reported with the fields of uploaded columns
+        def get_fields(row):
+            return {**row, "many_tags": sorted(row["many_tags"])}
+
+        skipped = [
+            get_fields(row) for row in success if row["unique_name"] != "buster-3"
+        ]
+        self.assertCountEqual(
+            skipped,
+            [
+                get_fields({key: row[key] for key in payload[0].keys()})
+                for row in saved
+                if row["unique_name"] != "buster-3"
+            ],
+        )
+
+        # Only the changed row and field are written
+        writes = self.get_model_writes(queries.captured_queries)
+        self.assertLength(writes, 1)
+        self.assertNotIn('"one_tag_id"', writes[0])
+
+        for unique_name, updated_at in self.repo.values_list(
+            "unique_name", "updated_at"
+        ):
+            if unique_name != "buster-3":
+                self.assertEqual(updated_at, updated_before[unique_name])
+
+    def test_reupload_skips_unchanged_rows(self):
+        """Should only save rows that changed since the last upload."""
+
+        self.assertReuploadSkipsRows()
+
+    def test_bulk_reupload_skips_unchanged_rows(self):
+        """Should only save rows that changed since the last bulk upload."""
+
+        self.assertReuploadSkipsRows(bulk=True)
+
+    def test_reupload_after_object_changed(self):
+        """Should apply a row again if its object was changed outside of uploads."""
+
+        self.data_to_csv(self.get_payload())
+        self.service.upload_csv(path=self.filepath, skip_unchanged=True)
+
+        obj = self.repo.get(unique_name="buster-1")
+        obj.name = "Edited"
+        obj.save()
+
+        success, failed = self.service.upload_csv(
+            path=self.filepath, skip_unchanged=True
+        )
+
+        self.assertLength(success, self.dataset_size, failed)
+        obj.refresh_from_db()
+        self.assertEqual(obj.name, "Buster 1")
+
+    def test_reupload_after_many_related_changed(self):
+        """Should apply a row again if its many-to-many values were changed."""
+
+        self.data_to_csv(self.get_payload())
+        self.service.upload_csv(path=self.filepath, skip_unchanged=True)
+
+        # Doesn't change the object's updated_at
+        obj = self.repo.get(unique_name="buster-1")
+        obj.many_tags.clear()
+
+        success, failed = self.service.upload_csv(
+            path=self.filepath, skip_unchanged=True
+        )
+
+        self.assertLength(success, self.dataset_size, failed)
+        self.assertListEqual(
+            sorted(obj.many_tags.values_list("name", flat=True)), ["Alpha", "Beta"]
+        )
+
+    def test_reupload_compares_uploaded_columns(self):
+        """Should only serialize fields of uploaded columns to compare objects."""
+
+        payload = self.get_payload()
+        for row in payload:
+            row.pop("many_tags")
+
+        self.data_to_csv(payload)
+        self.service.upload_csv(path=self.filepath, skip_unchanged=True)
+
+        # Field isn't in the spreadsheet, so the row is still skipped
+        obj = self.repo.get(unique_name="buster-1")
+        obj.many_tags.set(BusterTag.objects.all())
+        table = self.model_class.many_tags.through._meta.db_table
+
+        with CaptureQueriesContext(connection) as queries:
+            success, failed = self.service.upload_csv(
+                path=self.filepath, skip_unchanged=True
+            )
+
+        self.assertLength(success, self.dataset_size, failed)
+        self.assertLength(self.get_model_writes(queries.captured_queries), 0)
+        self.assertFalse(
+            any(table in query["sql"] for query in queries.captured_queries)
+        )
+        self.assertCountEqual(success[0].keys(), ["name", "unique_name", "one_tag"])
+
+    def test_job_skips_unchanged_rows(self):
+        """Should pass the job's option to every chunk task."""
+
+        self.data_to_csv(self.get_payload())
+        job = QueryCsvUploadJob.objects.create(
+            filepath=self.filepath,
+            serializer_class=self.serializer_class,
+            chunk_size=7,
+            skip_unchanged=True,
+        )
+        process_csv_job_task.delay(job.id)
+
+        self.assertEqual(QueryCsvRowHash.objects.count(), self.dataset_size)
+
+        job = QueryCsvUploadJob.objects.create(
+            filepath=self.filepath,
+            serializer_class=self.serializer_class,
+            chunk_size=7,
+            skip_unchanged=True,
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            process_csv_job_task.delay(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.rows_succeeded, self.dataset_size)
+        self.assertLength(self.get_model_writes(queries.captured_queries), 0)
+
+    def test_reupload_without_skip_unchanged(self):
+        """Should apply every row again unless skipping unchanged rows is enabled."""
+
+        self.data_to_csv(self.get_payload())
+        self.service.upload_csv(path=self.filepath)
+
+        self.assertEqual(QueryCsvRowHash.objects.count(), 0)
+
+    def test_update_unchanged_fields(self):
+        """Rows that don't change any fields should not save the object."""
+
+        self.data_to_csv(self.get_payload())
+        self.service.upload_csv(path=self.filepath)
+
+        with CaptureQueriesContext(connection) as queries:
+            success, failed = self.service.upload_csv(
+                path=self.filepath, skip_unchanged=False
+            )
+
+        self.assertLength(success, self.dataset_size, failed)
+        self.assertLength(self.get_model_writes(queries.captured_queries), 0)
+
+
+def dry_run_in_worker(serializer_class, path: str, results):
+    """Validate rows in a daemonic process, like a Celery prefork worker."""
+
+    # Connections are shared with the test process, so they're left open
+    inherited = []
+    for conn in connections.all():
+        inherited.append(conn.connection)
+        conn.connection = None
+        del connections[conn.alias]
+
+    try:
+        with patch("querycsv.services.logging.warning") as warning:
+            success, failed = QueryCsvService(serializer_class).upload_csv(
+                path=path, dry_run=True, processes=2
+            )
+
+        results.put((len(success), len(failed), warning.called))
+    finally:
+        connections.close_all()
+
+
+class UploadCsvProcessesTests(UploadCsvTestsBase):
+    """Test validating rows in worker processes."""
+
+    dataset_size = 20
+    get_payload = UploadCsvSlugLookupTests.get_payload
+
+    def test_upload_with_processes(self):
+        """Should create the same objects as uploading in one process."""
+
+        payload = self.get_payload()
+        payload[0]["name"] = ""
+        self.data_to_csv(payload)
+
+        success, failed = self.service.upload_csv(path=self.filepath, processes=2)
+
+        self.assertLength(success, self.dataset_size - 1, failed)
+        self.assertLength(failed, 1)
+        self.assertIn("name", failed[0]["errors"].keys())
+        self.assertObjectsCount(self.dataset_size - 1)
+
+        obj = self.repo.get(unique_name="buster-1")
+        self.assertEqual(obj.name, "Buster 1")
+        self.assertEqual(obj.one_tag.name, "Gamma")
+        self.assertListEqual(
+            sorted(obj.many_tags.values_list("name", flat=True)), ["Alpha", "Beta"]
+        )
+
+    def test_bulk_upload_with_processes(self):
+        """Should use prevalidated rows when uploading in bulk."""
+
+        self.data_to_csv(self.get_payload())
+
+        success, failed = self.service.upload_csv(
+            path=self.filepath, bulk=True, processes=2
+        )
+
+        self.assertLength(success, self.dataset_size, failed)
+        self.assertObjectsCount(self.dataset_size)
+
+    def test_upload_in_daemonic_worker(self):
+        """Should validate rows in the worker itself, since it can't start processes."""
+
+        self.data_to_csv(self.get_payload())
+
+        # Workers outside of Celery are spawned, so connections aren't inherited
+        pool = _get_validation_pool(2)
+        self.assertEqual(pool._mp_context.get_start_method(), "spawn")
+        pool.shutdown()
+
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        worker = context.Process(
+            target=dry_run_in_worker,
+            args=(self.serializer_class, self.filepath, results),
+            daemon=True,
+        )
+        worker.start()
+        worker.join(timeout=60)
+
+        self.assertEqual(worker.exitcode, 0)
+        self.assertEqual(results.get(timeout=1), (self.dataset_size, 0, True))
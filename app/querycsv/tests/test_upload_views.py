@@ -1,14 +1,28 @@
+import hashlib
+import json
+from unittest.mock import patch
+
 import pandas as pd
 from django.template.response import TemplateResponse
 from django.test import RequestFactory
+from django.urls import reverse
 from rest_framework import status
 
+from clubs.models import Club
+from clubs.serializers import ClubCsvSerializer
 from core.mock.models import Buster
 from core.mock.serializers import BusterCsvSerializer
 from querycsv.forms import CsvHeaderMappingFormSet, CsvUploadForm
-from querycsv.models import QueryCsvUploadJob
+from querycsv.models import (
+    CsvUploadStatus,
+    QueryCsvUploadJob,
+    QueryCsvUploadSession,
+)
+from querycsv.services import QueryCsvService
+from querycsv.tasks import process_csv_job_task
 from querycsv.tests.test_upload_data import UploadCsvTestsBase
 from querycsv.views import QueryCsvViewSet
+from users.tests.utils import create_test_adminuser
 
 
 class UploadCsvViewsTests(UploadCsvTestsBase):
@@ -106,3 +120,331 @@ class UploadCsvViewsTests(UploadCsvTestsBase):
 
         self.assertEqual(job.custom_fields[0]["column_name"], "Test Name")
         self.assertEqual(job.custom_fields[0]["field_name"], "name")
+
+    def test_map_upload_csv_headers_dry_run(self):
+        """Should validate rows with header associations, without saving anything."""
+
+        self.initialize_csv_data()
+        df = pd.read_csv(self.filepath)
+        df.rename(columns={"name": "Test Name"}, inplace=True)
+        df.loc[0, "Test Name"] = None
+        self.df_to_csv(df, self.filepath)
+
+        job = QueryCsvUploadJob.objects.create(
+            serializer_class=self.serializer_class, filepath=self.filepath
+        )
+        data = {
+            "form-TOTAL_FORMS": "1",
+            "form-INITIAL_FORMS": "0",
+            "form-0-csv_header": "Test Name",
+            "form-0-object_field": "name",
+            "dry_run": "",
+        }
+
+        req = self.req_factory.post("/", data=data)
+        res = self.views.map_upload_csv_headers(request=req, id=job.id)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        # Rows are validated by a task, run eagerly in tests
+        report = res.context_data["dry_run_report"]
+        self.assertTrue(report["finished"])
+        self.assertEqual(report["success_count"], self.dataset_size - 1)
+        self.assertEqual(report["failed_count"], 1)
+        self.assertIn("name", report["failed"][0]["errors"])
+        self.assertTrue(report["job"].report)
+
+        # Every row is validated, split into chunks like uploads
+        job.chunk_size = 3
+        job.save()
+
+        with patch("querycsv.views.send_process_csv_job_signal"):
+            res = self.views.map_upload_csv_headers(request=req, id=job.id)
+
+        report = res.context_data["dry_run_report"]
+        self.assertFalse(report["finished"])
+        self.assertContains(res.render(), "Validating rows")
+
+        process_csv_job_task(report["job"].id)
+
+        # Report and last validated mappings are shown when the page is reloaded
+        res = self.views.map_upload_csv_headers(
+            request=self.req_factory.get("/"), id=job.id
+        )
+        report = res.context_data["dry_run_report"]
+        self.assertTrue(report["finished"])
+        self.assertEqual(
+            report["success_count"] + report["failed_count"], self.dataset_size
+        )
+        self.assertIn(
+            {"csv_header": "Test Name", "object_field": "name"},
+            res.context_data["formset"].initial,
+        )
+
+        # Job and objects are unchanged
+        job.refresh_from_db()
+        self.assertEqual(len(job.custom_fields), 0)
+        self.assertEqual(job.status, CsvUploadStatus.PENDING)
+        self.assertObjectsCount(0)
+
+    def test_map_upload_csv_headers_cached(self):
+        """Should cache file info on the job, and read the whole file in the task."""
+
+        self.initialize_csv_data()
+        job = QueryCsvUploadJob.objects.create(
+            serializer_class=self.serializer_class, filepath=self.filepath
+        )
+
+        # File isn't hashed or counted in the request that creates the job
+        self.assertIsNone(job.file_hash)
+        self.assertIsNone(job.row_count)
+
+        req = self.req_factory.get("/")
+        res = self.views.map_upload_csv_headers(request=req, id=job.id)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        job.refresh_from_db()
+        self.assertListEqual(job.headers, list(pd.read_csv(self.filepath).columns))
+
+        with (
+            patch("querycsv.models.read_spreadsheet", side_effect=AssertionError),
+            patch(
+                "querycsv.models.read_spreadsheet_headers",
+                side_effect=AssertionError,
+            ),
+        ):
+            res = self.views.map_upload_csv_headers(request=req, id=job.id)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+            job.add_field_mapping(column_name="name", field_name="name")
+
+        process_csv_job_task(job.id)
+
+        with open(self.filepath, "rb") as f:
+            file_hash = hashlib.sha256(f.read()).hexdigest()
+
+        job.refresh_from_db()
+        self.assertEqual(job.file_hash, file_hash)
+        self.assertEqual(job.row_count, self.dataset_size)
+
+    def test_csv_template_cached(self):
+        """Should build csv template once, without writing to media."""
+
+        content, etag = self.service.get_csv_template_content("writable")
+        self.assertListEqual(
+            content.decode().strip().split(","), list(self.service.writable_fields)
+        )
+
+        with patch("querycsv.services.pd.DataFrame", side_effect=AssertionError):
+            svc = QueryCsvService(self.serializer_class)
+            self.assertEqual(svc.get_csv_template_content("writable"), (content, etag))
+
+        _, all_etag = self.service.get_csv_template_content("all")
+        self.assertNotEqual(all_etag, etag)
+
+
+class UploadSessionViewsTests(UploadCsvViewsTests):
+    """Test uploading spreadsheets in parts."""
+
+    def setUp(self):
+        super().setUp()
+
+        self.initialize_csv_data()
+        with open(self.filepath, "rb") as f:
+            self.content = f.read()
+
+        self.part_size = len(self.content) // 3 + 1
+
+    def tearDown(self):
+        for session in QueryCsvUploadSession.objects.all():
+            session.delete_parts()
+
+        return super().tearDown()
+
+    def start_session(self, **options):
+        req = self.req_factory.post(
+            "/",
+            data={"filename": "data.csv", "size": len(self.content), **options},
+            content_type="application/json",
+        )
+        req.user = create_test_adminuser()
+        res = self.views.start_upload_session(request=req)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        session = QueryCsvUploadSession.objects.get(id=json.loads(res.content)["id"])
+        session.part_size = self.part_size
+        session.save()
+
+        return session
+
+    def get_part(self, number):
+        start = number * self.part_size
+        end = start + self.part_size
+
+        return self.content[start:end]
+
+    def send_part(self, session, number, content=None, checksum=None):
+        content = content or self.get_part(number)
+        checksum = checksum or hashlib.sha256(content).hexdigest()
+
+        req = self.req_factory.put(
+            "/",
+            data=content,
+            content_type="application/octet-stream",
+            HTTP_X_CHECKSUM_SHA256=checksum,
+        )
+        return self.views.upload_session_part(request=req, id=session.id, number=number)
+
+    def get_checksum(self):
+        checksums = [
+            hashlib.sha256(self.get_part(number)).hexdigest() for number in range(3)
+        ]
+        return hashlib.sha256("".join(checksums).encode()).hexdigest()
+
+    def complete_session(self, session, checksum):
+        req = self.req_factory.post(
+            "/", data={"checksum": checksum}, content_type="application/json"
+        )
+
+        with patch("querycsv.views.reverse", return_value="/headermapping/"):
+            return self.views.complete_upload_session(request=req, id=session.id)
+
+    def test_upload_session(self):
+        """Should accept parts in any order, and create a job from them."""
+
+        session = self.start_session(skip_unchanged=True)
+        self.assertEqual(session.part_count, 3)
+
+        for number in (2, 0, 0):
+            res = self.send_part(session, number)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        # Resume with parts that weren't received
+        res = self.views.upload_session(
+            request=self.req_factory.get("/"), id=session.id
+        )
+        self.assertListEqual(json.loads(res.content)["received_parts"], [0, 2])
+
+        res = self.complete_session(session, self.get_checksum())
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Missing parts: 1.", json.loads(res.content)["detail"])
+
+        self.send_part(session, 1)
+
+        # Parts are assembled by a task, run eagerly in tests
+        res = self.complete_session(session, self.get_checksum())
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(json.loads(res.content)["status"], CsvUploadStatus.SUCCESS)
+        self.assertEqual(json.loads(res.content)["redirect"], "/headermapping/")
+
+        job = QueryCsvUploadJob.objects.get(id=json.loads(res.content)["job"])
+        self.assertListEqual(job.csv_headers, list(pd.read_csv(self.filepath).columns))
+        self.assertTrue(job.skip_unchanged)
+
+        process_csv_job_task(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.file_hash, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(job.row_count, self.dataset_size)
+
+        session.refresh_from_db()
+        self.assertEqual(session.job, job)
+        self.assertListEqual(session.received_parts, [])
+
+        # Completing again returns the same job, without assembling it again
+        with patch.object(QueryCsvUploadSession, "assemble") as mock:
+            res = self.complete_session(session, self.get_checksum())
+
+        mock.assert_not_called()
+        self.assertEqual(json.loads(res.content)["job"], job.id)
+        self.assertEqual(QueryCsvUploadJob.objects.count(), 1)
+
+    def test_upload_session_processing(self):
+        """Should not assemble a session that is already being assembled."""
+
+        session = self.start_session()
+
+        for number in range(3):
+            self.send_part(session, number)
+
+        with patch("querycsv.views.send_assemble_upload_session_signal") as mock:
+            res = self.complete_session(session, self.get_checksum())
+            self.assertEqual(
+                json.loads(res.content)["status"], CsvUploadStatus.PROCESSING
+            )
+
+            res = self.complete_session(session, self.get_checksum())
+            self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+
+        mock.assert_called_once()
+
+        # Parts can't be replaced while they're assembled
+        res = self.send_part(session, 0)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Tasks assembling at the same time only create one job
+        session.refresh_from_db()
+        stale = QueryCsvUploadSession.objects.get(id=session.id)
+
+        with patch.object(QueryCsvUploadSession, "delete_parts"):
+            job = session.assemble()
+
+        self.assertEqual(stale.assemble(), job)
+        self.assertEqual(QueryCsvUploadJob.objects.count(), 1)
+        self.assertEqual(stale.status, CsvUploadStatus.SUCCESS)
+
+    def test_upload_session_invalid_parts(self):
+        """Should reject parts with the wrong checksum or size."""
+
+        session = self.start_session()
+
+        res = self.send_part(session, 0, checksum="0" * 64)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.send_part(session, 0, content=self.content[:10])
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.send_part(session, 3, content=b"a")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertListEqual(session.received_parts, [])
+
+        for number in range(3):
+            self.send_part(session, number)
+
+        res = self.complete_session(session, "0" * 64)
+        self.assertEqual(json.loads(res.content)["status"], CsvUploadStatus.FAILED)
+        self.assertEqual(
+            json.loads(res.content)["error"], "Checksum of file doesn't match."
+        )
+        self.assertFalse(QueryCsvUploadJob.objects.exists())
+
+
+class CsvTemplateAdminTests(UploadCsvTestsBase):
+    """Test downloading csv templates from admin."""
+
+    model_class = Club
+    serializer_class = ClubCsvSerializer
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(create_test_adminuser())
+
+    def test_download_csv_template(self):
+        """Should serve template from memory, and revalidate with its ETag."""
+
+        url = reverse("admin:clubs_club_csv_template")
+        res = self.client.get(url, {"fields": "required"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        self.assertIn("no-cache", res["Cache-Control"])
+        self.assertNotIn("no-store", res["Cache-Control"])
+        content, etag = self.service.get_csv_template_content("required")
+        self.assertEqual(res.content, content)
+        self.assertEqual(res["ETag"], f'"{etag}"')
+
+        res = self.client.get(
+            url, {"fields": "required"}, HTTP_IF_NONE_MATCH=res["ETag"]
+        )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
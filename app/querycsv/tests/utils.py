@@ -8,6 +8,7 @@ from typing import Optional
 
 import numpy as np
 import pandas as pd
+from django.core.files.storage import FileSystemStorage, Storage
 from django.db import models
 
 from app.settings import MEDIA_ROOT
@@ -20,6 +21,41 @@ from utils.files import get_media_path
 from utils.helpers import clean_list
 
 
+class RemoteStorage(Storage):
+    """
+    Stand-in for remote storage, like S3, backed by a local directory.
+
+    Files can be read and written, but don't have a local path.
+    """
+
+    def __init__(self, location: str):
+        self.local = FileSystemStorage(location=location)
+
+    def _open(self, name, mode="rb"):
+        return self.local._open(name, mode)
+
+    def _save(self, name, content):
+        return self.local._save(name, content)
+
+    def delete(self, name):
+        return self.local.delete(name)
+
+    def exists(self, name):
+        return self.local.exists(name)
+
+    def listdir(self, path):
+        return self.local.listdir(path)
+
+    def size(self, name):
+        return self.local.size(name)
+
+    def url(self, name):
+        return self.local.url(name)
+
+    def get_modified_time(self, name):
+        return self.local.get_modified_time(name)
+
+
 class CsvDataTestsBase(TestsBase):
     """
     Base tests for Csv data services.
@@ -1,15 +1,23 @@
+import json
 import logging
-from typing import Type
+from typing import Optional, Type
 
-from django.http import HttpRequest
+from django.core.exceptions import ValidationError
+from django.http import HttpRequest, HttpResponseNotAllowed, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
+from django.urls import reverse
 
 from core.abstracts.serializers import ModelSerializerBase
+from querycsv.consts import QUERYCSV_UPLOAD_PART_SIZE
 from querycsv.forms import CsvHeaderMappingFormSet, CsvUploadForm
-from querycsv.models import QueryCsvUploadJob
+from querycsv.models import CsvUploadStatus, QueryCsvUploadJob, QueryCsvUploadSession
 from querycsv.services import QueryCsvService
-from querycsv.signals import send_process_csv_job_signal
+from querycsv.signals import (
+    send_assemble_upload_session_signal,
+    send_process_csv_job_signal,
+)
+from utils.helpers import get_import_path
 
 
 class QueryCsvViewSet:
@@ -38,6 +46,8 @@ class QueryCsvViewSet:
         context = extra_context if extra_context else {}
 
         context["template_url"] = self.get_reverse("csv_template")
+        context["upload_session_url"] = self.get_reverse("upload_session_start")
+        context["upload_part_size"] = QUERYCSV_UPLOAD_PART_SIZE
         context["all_fields"] = self.service.flat_fields.values()
         context["unique_together_fields"] = (
             self.serializer_class().unique_together_fields
@@ -58,6 +68,9 @@ class QueryCsvViewSet:
                     serializer_class=self.serializer_class,
                     notify_email=request.user.email,
                     file=request.FILES["file"],
+                    chunk_size=form.cleaned_data["chunk_size"],
+                    max_concurrency=form.cleaned_data["max_concurrency"] or 1,
+                    skip_unchanged=form.cleaned_data["skip_unchanged"],
                 )
 
                 return redirect(self.get_reverse("upload_headermapping"), id=job.id)
@@ -74,6 +87,135 @@ class QueryCsvViewSet:
             request, "admin/querycsv/upload_csv.html", context=context
         )
 
+    def _get_upload_session(self, id: int) -> QueryCsvUploadSession:
+        return get_object_or_404(
+            QueryCsvUploadSession,
+            id=id,
+            serializer=get_import_path(self.serializer_class),
+        )
+
+    def start_upload_session(self, request: HttpRequest):
+        """
+        Start an upload sent in parts, for files too large for one request.
+
+        Expects json with the file's name and size in bytes, and optionally
+        the job's chunk size, max concurrency, and whether to skip unchanged
+        rows. Returns the session as json, with the size and number of parts
+        to send.
+        """
+
+        if request.method != "POST":
+            return HttpResponseNotAllowed(["POST"])
+
+        try:
+            data = json.loads(request.body)
+            session = QueryCsvUploadSession.objects.create(
+                serializer_class=self.serializer_class,
+                filename=data["filename"],
+                size=data["size"],
+                notify_email=request.user.email,
+                chunk_size=data.get("chunk_size", None) or None,
+                max_concurrency=data.get("max_concurrency", None) or 1,
+                skip_unchanged=bool(data.get("skip_unchanged", False)),
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            return JsonResponse({"detail": f"Invalid request: {e}"}, status=400)
+        except ValidationError as e:
+            return JsonResponse({"detail": e.messages}, status=400)
+
+        return JsonResponse(session.progress, status=201)
+
+    def _get_upload_session_progress(self, session: QueryCsvUploadSession) -> dict:
+        """Session progress, and where to map headers once its job is created."""
+
+        progress = session.progress
+
+        if session.job_id is not None:
+            progress["redirect"] = reverse(
+                self.get_reverse("upload_headermapping"), kwargs={"id": session.job_id}
+            )
+
+        return progress
+
+    def upload_session(self, request: HttpRequest, id: int):
+        """
+        Get parts received for an upload session, used to resume an upload.
+
+        Once a completed upload is assembled, includes the job and where
+        to map its headers.
+        """
+
+        session = self._get_upload_session(id)
+
+        return JsonResponse(self._get_upload_session_progress(session))
+
+    def upload_session_part(self, request: HttpRequest, id: int, number: int):
+        """
+        Save a part of an upload session, sent as the request body.
+
+        The part's SHA-256 is sent as hex in the ``X-Checksum-Sha256`` header.
+        Parts that were already received are replaced.
+        """
+
+        if request.method != "PUT":
+            return HttpResponseNotAllowed(["PUT"])
+
+        session = self._get_upload_session(id)
+        checksum = request.headers.get("X-Checksum-Sha256", "")
+
+        try:
+            session.save_part(number, request.body, checksum)
+        except ValidationError as e:
+            return JsonResponse({"detail": e.messages}, status=400)
+
+        return JsonResponse(session.progress)
+
+    def complete_upload_session(self, request: HttpRequest, id: int):
+        """
+        Complete an upload session, once all parts are sent.
+
+        Expects json with the checksum of all parts, see
+        ``QueryCsvUploadSession.complete``. Parts are assembled into an
+        upload job in the background, so clients poll the session until
+        it has a job, or fails.
+        """
+
+        if request.method != "POST":
+            return HttpResponseNotAllowed(["POST"])
+
+        session = self._get_upload_session(id)
+
+        try:
+            data = json.loads(request.body)
+            started = session.complete(data["checksum"])
+        except (ValueError, KeyError, TypeError) as e:
+            return JsonResponse({"detail": f"Invalid request: {e}"}, status=400)
+        except ValidationError as e:
+            return JsonResponse({"detail": e.messages}, status=400)
+
+        if started:
+            send_assemble_upload_session_signal(session)
+            session.refresh_from_db()
+
+        return JsonResponse(self._get_upload_session_progress(session), status=202)
+
+    def _get_dry_run_report(self, job: QueryCsvUploadJob) -> Optional[dict]:
+        """Progress of the job's last dry run, and its results once it's finished."""
+
+        dry_run_job = QueryCsvUploadJob.objects.filter(id=job.dry_run_job_id).first()
+
+        if dry_run_job is None:
+            return None
+
+        return {
+            "job": dry_run_job,
+            "finished": dry_run_job.status
+            in (CsvUploadStatus.SUCCESS, CsvUploadStatus.FAILED),
+            "success_count": dry_run_job.rows_succeeded,
+            "failed_count": dry_run_job.rows_failed,
+            "failed": dry_run_job.failed_preview or [],
+        }
+
     def map_upload_csv_headers(self, request: HttpRequest, id: int, extra_context=None):
         """Given a csv upload job, define custom mappings between csv headers and object fields."""
 
@@ -103,6 +245,20 @@ class QueryCsvViewSet:
                         commit=False,
                     )
 
+                if "dry_run" in request.POST:
+                    # Validate all rows with the new mappings in the background,
+                    # the mappings are only saved to the dry run job
+                    send_process_csv_job_signal(job.start_dry_run())
+
+                    context["formset"] = formset
+                    context["dry_run_report"] = self._get_dry_run_report(job)
+
+                    return TemplateResponse(
+                        request,
+                        "admin/querycsv/upload_csv_headermapping.html",
+                        context=context,
+                    )
+
                 job.save()
 
                 send_process_csv_job_signal(job)
@@ -112,11 +268,24 @@ class QueryCsvViewSet:
 
         else:
             initial_data = []
+            dry_run_mappings = {}
+
+            if job.dry_run_job is not None:
+                # Show the mappings that were last validated
+                dry_run_mappings = {
+                    mapping["column_name"]: mapping["field_name"]
+                    for mapping in job.dry_run_job.custom_fields
+                }
 
             for header in job.csv_headers:
                 cleaned_header = header.strip().lower().replace(" ", "_")
                 # if cleaned_header in self.serializer.all_field_names:
-                if cleaned_header in self.service.flat_fields.keys():
+                if header in dry_run_mappings:
+                    initial_mapping = {
+                        "csv_header": header,
+                        "object_field": dry_run_mappings[header],
+                    }
+                elif cleaned_header in self.service.flat_fields.keys():
                     initial_mapping = {
                         "csv_header": header,
                         "object_field": cleaned_header,
@@ -127,6 +296,7 @@ class QueryCsvViewSet:
                 initial_data.append(initial_mapping)
 
             formset = CsvHeaderMappingFormSet(initial=initial_data, upload_job=job)
+            context["dry_run_report"] = self._get_dry_run_report(job)
 
         context["formset"] = formset
 
@@ -1,3 +1,4 @@
+import time
 import uuid
 from pathlib import Path
 from typing import Optional
@@ -71,3 +72,63 @@ def get_file_path(file: models.FileField):
         return file.url
     else:
         return file.path
+
+
+def evict_files(
+    directory: Path,
+    max_size: int,
+    temp_max_age: int,
+    max_age: Optional[int] = None,
+    keep: Optional[Path] = None,
+    temp_suffix=".tmp",
+):
+    """
+    Remove least recently used files in a directory until they fit in ``max_size``.
+
+    Files are ordered by modified time, so caches mark files as used with
+    ``os.utime``. Files with ``temp_suffix`` are still being written, so
+    they aren't counted, and are only removed once they haven't been
+    modified for ``temp_max_age`` seconds, in case their writer crashed.
+
+    Parameters
+    ----------
+        - directory (Path): Directory of cached files.
+        - max_size (int): Max number of bytes of finished files to keep.
+        - temp_max_age (int): Seconds before an unmodified temp file is removed.
+        - max_age (int): If given, seconds before an unused finished file is removed.
+        - keep (Path): File that is never removed, like one that was just added.
+        - temp_suffix (str): Suffix of files that are still being written.
+    """
+
+    entries = []
+    now = time.time()
+
+    for path in directory.iterdir():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+
+        age = now - stat.st_mtime
+
+        if path.suffix == temp_suffix:
+            if age > temp_max_age:
+                path.unlink(missing_ok=True)
+
+            continue
+        elif max_age is not None and age > max_age and path != keep:
+            path.unlink(missing_ok=True)
+            continue
+
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+
+    for _, size, path in sorted(entries):
+        if total <= max_size:
+            break
+        elif path == keep:
+            continue
+
+        path.unlink(missing_ok=True)
+        total -= size
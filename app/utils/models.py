@@ -1,13 +1,17 @@
 import os
 import uuid
 from pathlib import Path
+from typing import Optional
 
+from django.core.exceptions import FieldDoesNotExist
 from django.core.files import File
 from django.db import models
 from django.db.models.fields.related_descriptors import ReverseOneToOneDescriptor
+from django.db.models.signals import m2m_changed, post_save, pre_save
 from django.utils.deconstruct import deconstructible
 from rest_framework.fields import ObjectDoesNotExist
 
+from core.abstracts.models import ManagerBase, ModelBase
 from utils.helpers import import_from_path
 from utils.types import T
 
@@ -95,3 +99,67 @@ def save_file_to_model(model: models.Model, filepath, field="file"):
         file = File(f, name=path.name)
         setattr(model, field, file)
         model.save()
+
+
+def supports_bulk_save(model: type[models.Model]) -> bool:
+    """
+    Check if objects for a model can be written with ``bulk_create``/``bulk_update``.
+
+    Bulk queries skip ``Model.save``, custom manager ``create`` methods,
+    and save signals. If a model relies on any of these, it must be
+    saved one object at a time.
+    """
+    manager_create = type(model._default_manager).create
+
+    if manager_create not in (ManagerBase.create, models.Manager.create):
+        return False
+
+    if model.save not in (ModelBase.save, models.Model.save):
+        return False
+
+    if pre_save.has_listeners(model) or post_save.has_listeners(model):
+        return False
+
+    for field in model._meta.many_to_many:
+        if m2m_changed.has_listeners(field.remote_field.through):
+            return False
+
+    return True
+
+
+def get_changed_fields(
+    before: models.Model, after: models.Model, field_names: list[str]
+) -> Optional[list[str]]:
+    """
+    Get names of fields that have different values on two copies of an object.
+
+    Column values are compared, so related objects aren't fetched. Returns
+    None if a name isn't a concrete field, since it can't be used in
+    ``update_fields``.
+    """
+
+    changed = []
+
+    for name in field_names:
+        try:
+            field = after._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+        if not field.concrete or field.many_to_many:
+            return None
+
+        if getattr(before, field.attname) != getattr(after, field.attname):
+            changed.append(name)
+
+    return changed
+
+
+def get_auto_now_fields(model: type[models.Model]) -> list[str]:
+    """Names of fields that are set on every save, like ``updated_at``."""
+
+    return [
+        field.name
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) is True
+    ]